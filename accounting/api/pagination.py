@@ -1,4 +1,17 @@
+import base64
+import datetime
+import json
+from dataclasses import dataclass
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class StandardListPagination(PageNumberPagination):
@@ -11,3 +24,180 @@ class StandardListPagination(PageNumberPagination):
         if request.query_params.get(self.page_query_param) in (None, ""):
             return None
         return super().paginate_queryset(queryset, request, view=view)
+
+
+@dataclass(frozen=True)
+class KeysetField:
+    """One ordering column: the filter path, the attribute path and its direction."""
+
+    lookup: str
+    attrs: tuple[str, ...]
+    descending: bool
+
+    def order_by(self):
+        # NULLs sort last ascending and first descending on every backend, so
+        # the keyset conditions below do not depend on database defaults.
+        if self.descending:
+            return F(self.lookup).desc(nulls_first=True)
+        return F(self.lookup).asc(nulls_last=True)
+
+    def value(self, instance):
+        value = instance
+        for attr in self.attrs:
+            if value is None:
+                return None
+            value = getattr(value, attr)
+        return value
+
+    def after(self, value) -> Q:
+        if value is None:
+            # NULLs are at the end ascending; descending, everything non-null follows.
+            return Q(**{f"{self.lookup}__isnull": False}) if self.descending else Q(pk__in=[])
+        lookup = "lt" if self.descending else "gt"
+        condition = Q(**{f"{self.lookup}__{lookup}": value})
+        if not self.descending:
+            condition |= Q(**{f"{self.lookup}__isnull": True})
+        return condition
+
+    def equal(self, value) -> Q:
+        if value is None:
+            return Q(**{f"{self.lookup}__isnull": True})
+        return Q(**{self.lookup: value})
+
+
+def _resolve_keyset_field(queryset, name: str) -> KeysetField:
+    descending = name.startswith("-")
+    name = name.lstrip("-+")
+    if name == "pk":
+        name = queryset.model._meta.pk.name
+    if name in queryset.query.annotations:
+        return KeysetField(lookup=name, attrs=(name,), descending=descending)
+
+    model = queryset.model
+    parts = name.split(LOOKUP_SEP)
+    attrs = []
+    for index, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist as exc:
+            raise ValueError(f"Cannot paginate on '{name}'.") from exc
+        is_last = index == len(parts) - 1
+        if field.is_relation:
+            if field.many_to_many or field.one_to_many or not field.concrete:
+                raise ValueError(f"Cannot paginate on '{name}'.")
+            if is_last:
+                # Order by the key itself, not the related model's Meta.ordering.
+                attrs.append(field.attname)
+                parts[index] = field.attname
+                break
+            attrs.append(field.name)
+            model = field.related_model
+        else:
+            if not is_last:
+                raise ValueError(f"Cannot paginate on '{name}'.")
+            attrs.append(field.attname)
+    return KeysetField(lookup=LOOKUP_SEP.join(parts), attrs=tuple(attrs), descending=descending)
+
+
+def get_keyset_fields(queryset) -> list[KeysetField]:
+    """Return the queryset ordering as keyset columns, ending on the primary key."""
+    ordering = [item for item in (queryset.query.order_by or queryset.model._meta.ordering) if isinstance(item, str)]
+    fields = [_resolve_keyset_field(queryset, name) for name in ordering if name != "?"]
+    pk_name = queryset.model._meta.pk.attname
+    if not any(field.lookup in {pk_name, queryset.model._meta.pk.name} for field in fields):
+        descending = fields[-1].descending if fields else False
+        fields.append(KeysetField(lookup=pk_name, attrs=(pk_name,), descending=descending))
+    return fields
+
+
+def keyset_filter(fields: list[KeysetField], values: list) -> Q:
+    """Rows strictly after ``values`` in the order given by ``fields``."""
+    condition = Q(pk__in=[])
+    prefix = Q()
+    for field, value in zip(fields, values):
+        condition |= prefix & field.after(value)
+        prefix &= field.equal(value)
+    return condition
+
+
+def iter_keyset_chunks(queryset, chunk_size: int):
+    """Yield lists of at most ``chunk_size`` rows, one keyset query per chunk."""
+    fields = get_keyset_fields(queryset)
+    queryset = queryset.order_by(*(field.order_by() for field in fields))
+    values = None
+    while True:
+        chunk_queryset = queryset.filter(keyset_filter(fields, values)) if values is not None else queryset
+        chunk = list(chunk_queryset[:chunk_size])
+        if chunk:
+            yield chunk
+        if len(chunk) < chunk_size:
+            return
+        values = [field.value(chunk[-1]) for field in fields]
+
+
+def _cursor_default(value):
+    # Full precision on purpose: DjangoJSONEncoder truncates microseconds.
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor.")
+
+
+class KeysetListPagination(StandardListPagination):
+    """Keyset pagination by default; ``?page=`` keeps the page-number behaviour.
+
+    The cursor holds the ordering values of the last row of a page, so each
+    page is an indexed range query whatever its depth.
+    """
+
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = request.query_params.get(self.page_query_param) in (None, "")
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            fields = get_keyset_fields(queryset)
+        except ValueError as exc:
+            raise NotFound(str(exc)) from exc
+        queryset = queryset.order_by(*(field.order_by() for field in fields))
+        values = self._decode_cursor(request, len(fields))
+        if values is not None:
+            queryset = queryset.filter(keyset_filter(fields, values))
+
+        rows = list(queryset[: page_size + 1])
+        self.next_values = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_values = [field.value(rows[-1]) for field in fields]
+        return rows
+
+    def _decode_cursor(self, request, size: int):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+        except (TypeError, ValueError, UnicodeError) as exc:
+            raise NotFound("Invalid cursor.") from exc
+        if not isinstance(values, list) or len(values) != size:
+            raise NotFound("Invalid cursor.")
+        return values
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_values is None:
+            return None
+        encoded = base64.urlsafe_b64encode(json.dumps(self.next_values, default=_cursor_default).encode("utf-8"))
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded.decode("ascii"))
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({"next": self.get_next_link(), "results": data})
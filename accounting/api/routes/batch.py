@@ -0,0 +1,7 @@
+from django.urls import path
+
+from accounting.api.viewsets import BatchView
+
+urlpatterns = [
+    path("batch/", BatchView.as_view(), name="batch"),
+]
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from accounting.api.viewsets import MetricsView, ProfileView, QueryStatsView
+
+urlpatterns = [
+    path("debug/query-stats/", QueryStatsView.as_view(), name="query-stats"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("debug/profiles/<str:profile_id>/", ProfileView.as_view(), name="profile-detail"),
+]
@@ -1,7 +1,10 @@
 from django.urls import path
 
 from accounting.api.viewsets import (
+    AnalyticReportView,
+    AssetRegisterReportView,
     BalanceSheetReportView,
+    DepreciationForecastReportView,
     GeneralLedgerReportView,
     ProfitAndLossReportView,
     TrialBalanceReportView,
@@ -12,4 +15,11 @@ urlpatterns = [
     path("reports/profit-and-loss/", ProfitAndLossReportView.as_view(), name="profit-and-loss-report"),
     path("reports/trial-balance/", TrialBalanceReportView.as_view(), name="trial-balance-report"),
     path("reports/general-ledger/", GeneralLedgerReportView.as_view(), name="general-ledger-report"),
+    path("reports/asset-register/", AssetRegisterReportView.as_view(), name="asset-register-report"),
+    path(
+        "reports/depreciation-forecast/",
+        DepreciationForecastReportView.as_view(),
+        name="depreciation-forecast-report",
+    ),
+    path("reports/analytic/", AnalyticReportView.as_view(), name="analytic-report"),
 ]
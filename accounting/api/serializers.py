@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 
 from accounting.models import (
@@ -56,70 +57,180 @@ from accounting.models import (
 )
 
 
-class NameAwareModelSerializer(serializers.ModelSerializer):
-    """Auto-append related name fields for FK/M2M without changing write payloads."""
+RELATED_OBJECTS_CONTEXT_KEY = "related_objects"
 
-    RELATED_NAME_ATTRS = ("name", "code", "username", "title")
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        model = getattr(self.Meta, "model", None)
-        if not model:
-            return data
-
-        relation_fields = list(model._meta.fields) + list(model._meta.many_to_many)
-        for field in relation_fields:
-            if field.many_to_many:
-                key = f"{field.name}_names"
-                if key in data:
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field that reads objects preloaded in the serializer context.
+
+    Bulk endpoints put ``{model: {pk: obj}}`` under ``RELATED_OBJECTS_CONTEXT_KEY``
+    (see ``collect_related_objects``) so validating N rows costs one query per
+    related model instead of one per row and field.
+    """
+
+    def to_internal_value(self, data):
+        related_objects = self.context.get(RELATED_OBJECTS_CONTEXT_KEY)
+        queryset = self.get_queryset()
+        if (
+            related_objects is None
+            or queryset is None
+            or queryset.query.where  # restricted choices are checked by the database
+            or queryset.model not in related_objects
+        ):
+            return super().to_internal_value(data)
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = queryset.model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        obj = related_objects[queryset.model].get(pk)
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
+        return obj
+
+
+def _prefetched_relations(serializer):
+    for field in serializer.fields.values():
+        if field.read_only:
+            continue
+        if isinstance(field, serializers.ManyRelatedField):
+            if isinstance(field.child_relation, PrefetchedPrimaryKeyRelatedField):
+                yield field.field_name, field.child_relation, True
+        elif isinstance(field, PrefetchedPrimaryKeyRelatedField):
+            yield field.field_name, field, False
+
+
+def collect_related_objects(serializer, rows) -> dict:
+    """Load every object referenced by ``rows`` with one query per related model."""
+    wanted: dict = {}
+    for field_name, field, many in _prefetched_relations(serializer):
+        queryset = field.get_queryset()
+        if queryset is None or queryset.query.where:
+            continue
+        pk_field = queryset.model._meta.pk
+        bucket = wanted.setdefault(queryset.model, set())
+        for row in rows:
+            if not isinstance(row, dict) or row.get(field_name) in (None, ""):
+                continue
+            values = row[field_name] if many and isinstance(row[field_name], list) else [row[field_name]]
+            for value in values:
+                if isinstance(value, bool):
                     continue
-                values = []
                 try:
-                    related_items = getattr(instance, field.name).all()
-                except Exception:
-                    related_items = []
-                for rel in related_items:
-                    label = None
-                    for attr in self.RELATED_NAME_ATTRS:
-                        if hasattr(rel, attr):
-                            label = getattr(rel, attr)
-                            if label:
-                                break
-                    if label is None:
-                        label = str(rel)
-                    values.append(label)
-                data[key] = values
-                continue
+                    bucket.add(pk_field.to_python(value))
+                except DjangoValidationError:
+                    continue
+    return {model: model._default_manager.in_bulk(list(pks)) for model, pks in wanted.items()}
 
-            if not (field.many_to_one or field.one_to_one):
-                continue
 
-            rel_key = field.name
-            id_key = f"{rel_key}_id"
+class NameAwareModelSerializer(serializers.ModelSerializer):
+    """Auto-append related name fields for FK/M2M without changing write payloads.
+
+    The relations to label and the attributes to read on each related model
+    are resolved once per serializer class (see ``get_representation_plan``),
+    and ``get_related_lookups`` gives viewsets the matching
+    ``select_related``/``prefetch_related`` names.
+    """
 
-            out_key = f"{rel_key}_name"
-            if out_key in data:
+    RELATED_NAME_ATTRS = ("name", "code", "username", "title")
+    SPARSE_FIELDS_PARAM = "fields"
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
+    _representation_plans: dict[type, tuple] = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse_fields = None
+        request = self.context.get("request")
+        if request is None or self.parent is not None or request.method != "GET":
+            return
+        requested = self.parse_sparse_fields(request)
+        if requested is None:
+            return
+        plan_keys = {entry[0] for entry in self.get_representation_plan()}
+        unknown = sorted(requested - set(self.fields) - plan_keys)
+        if unknown:
+            raise serializers.ValidationError({self.SPARSE_FIELDS_PARAM: f"Unknown field(s): {', '.join(unknown)}."})
+        for name in set(self.fields) - requested:
+            self.fields.pop(name)
+        self.sparse_fields = requested
+
+    @classmethod
+    def parse_sparse_fields(cls, request) -> set[str] | None:
+        """Return the ``?fields=`` names of a request, or ``None`` when absent."""
+        raw = request.query_params.get(cls.SPARSE_FIELDS_PARAM)
+        if not raw:
+            return None
+        return {name.strip() for name in raw.split(",") if name.strip()}
+
+    @classmethod
+    def get_representation_plan(cls) -> tuple:
+        """Return ``(out_key, field_name, id_attname, label_attrs, many)`` per relation."""
+        plan = NameAwareModelSerializer._representation_plans.get(cls)
+        if plan is not None:
+            return plan
+        model = getattr(getattr(cls, "Meta", None), "model", None)
+        entries = []
+        if model is not None:
+            for field in list(model._meta.fields) + list(model._meta.many_to_many):
+                if not (field.many_to_many or field.many_to_one or field.one_to_one):
+                    continue
+                label_attrs = tuple(attr for attr in cls.RELATED_NAME_ATTRS if hasattr(field.related_model, attr))
+                if field.many_to_many:
+                    entries.append((f"{field.name}_names", field.name, None, label_attrs, True))
+                else:
+                    entries.append((f"{field.name}_name", field.name, field.attname, label_attrs, False))
+        plan = tuple(entries)
+        NameAwareModelSerializer._representation_plans[cls] = plan
+        return plan
+
+    @classmethod
+    def get_related_lookups(cls, fields: set[str] | None = None) -> tuple[list[str], list[str]]:
+        """Return the ``(select_related, prefetch_related)`` names the name fields read.
+
+        With a sparse fieldset only the relations of requested keys are returned.
+        """
+        select_related = []
+        prefetch_related = []
+        for out_key, field_name, _, _, many in cls.get_representation_plan():
+            if fields is not None and out_key not in fields:
                 continue
+            (prefetch_related if many else select_related).append(field_name)
+        return select_related, prefetch_related
+
+    @staticmethod
+    def _related_label(rel_obj, label_attrs):
+        label = None
+        for attr in label_attrs:
+            label = getattr(rel_obj, attr)
+            if label:
+                break
+        if label is None:
+            label = str(rel_obj)
+        return label
 
-            rel_id = getattr(instance, id_key, None)
-            if rel_id is None:
-                data[out_key] = None
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        sparse_fields = getattr(self, "sparse_fields", None)
+        for out_key, field_name, id_attname, label_attrs, many in self.get_representation_plan():
+            if out_key in data or (sparse_fields is not None and out_key not in sparse_fields):
+                continue
+            if many:
+                try:
+                    related_items = getattr(instance, field_name).all()
+                except Exception:
+                    related_items = []
+                data[out_key] = [self._related_label(rel, label_attrs) for rel in related_items]
                 continue
 
-            rel_obj = getattr(instance, rel_key, None)
-            if rel_obj is None:
+            if getattr(instance, id_attname, None) is None:
                 data[out_key] = None
                 continue
-
-            label = None
-            for attr in self.RELATED_NAME_ATTRS:
-                if hasattr(rel_obj, attr):
-                    label = getattr(rel_obj, attr)
-                    if label:
-                        break
-            if label is None:
-                label = str(rel_obj)
-            data[out_key] = label
+            rel_obj = getattr(instance, field_name, None)
+            data[out_key] = None if rel_obj is None else self._related_label(rel_obj, label_attrs)
 
         return data
 
@@ -366,6 +477,11 @@ class ApplyChartTemplateSerializer(serializers.Serializer):
     country_id = serializers.IntegerField()
 
 
+class CloneCompanySerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255)
+    code = serializers.CharField(max_length=32, required=False, allow_blank=True)
+
+
 class ReverseInvoiceSerializer(serializers.Serializer):
     date = serializers.DateField(required=False)
     reason = serializers.CharField(required=False, allow_blank=True, max_length=255)
@@ -663,6 +779,8 @@ class InvoiceLineSerializer(NameAwareModelSerializer):
             "move",
             "account",
             "tax",
+            "product",
+            "analytic_distribution",
             "name",
             "quantity",
             "unit_price",
@@ -679,6 +797,12 @@ class InvoiceLineSerializer(NameAwareModelSerializer):
         move = attrs.get("move") or getattr(self.instance, "move", None)
         account = attrs.get("account") if "account" in attrs else getattr(self.instance, "account", None)
         tax = attrs.get("tax") if "tax" in attrs else getattr(self.instance, "tax", None)
+        product = attrs.get("product") if "product" in attrs else getattr(self.instance, "product", None)
+        analytic_distribution = (
+            attrs.get("analytic_distribution")
+            if "analytic_distribution" in attrs
+            else getattr(self.instance, "analytic_distribution", None)
+        )
 
         if move and move.state != "draft":
             raise serializers.ValidationError({"move": "Cannot add or modify lines on a posted/cancelled invoice."})
@@ -688,6 +812,10 @@ class InvoiceLineSerializer(NameAwareModelSerializer):
             raise serializers.ValidationError({"account": "Account company must match invoice company."})
         if move and tax and move.company_id != tax.company_id:
             raise serializers.ValidationError({"tax": "Tax company must match invoice company."})
+        if move and product and move.company_id != product.company_id:
+            raise serializers.ValidationError({"product": "Product company must match invoice company."})
+        if analytic_distribution is not None and not isinstance(analytic_distribution, dict):
+            raise serializers.ValidationError({"analytic_distribution": "Analytic distribution must be an object."})
         return attrs
 
 
@@ -835,6 +963,7 @@ class AssetSerializer(NameAwareModelSerializer):
             "depreciation_account",
             "expense_account",
             "journal",
+            "model",
             "acquisition_date",
             "first_depreciation_date",
             "original_value",
@@ -855,6 +984,7 @@ class AssetSerializer(NameAwareModelSerializer):
         company = attrs.get("company") or getattr(self.instance, "company", None)
         partner = attrs.get("partner") if "partner" in attrs else getattr(self.instance, "partner", None)
         journal = attrs.get("journal") if "journal" in attrs else getattr(self.instance, "journal", None)
+        asset_model = attrs.get("model") if "model" in attrs else getattr(self.instance, "model", None)
         asset_account = (
             attrs.get("asset_account")
             if "asset_account" in attrs
@@ -890,6 +1020,8 @@ class AssetSerializer(NameAwareModelSerializer):
             )
         if company and expense_account and expense_account.company_id != company.id:
             raise serializers.ValidationError({"expense_account": "Expense account company must match asset company."})
+        if company and asset_model and asset_model.company_id != company.id:
+            raise serializers.ValidationError({"model": "Asset model company must match asset company."})
 
         if original_value is not None and original_value <= 0:
             raise serializers.ValidationError({"original_value": "Original value must be greater than zero."})
@@ -1378,13 +1510,13 @@ class AnalyticDistributionModelLineSerializer(NameAwareModelSerializer):
 
 
 class AccountingSettingsSerializer(NameAwareModelSerializer):
-    sale_tax = serializers.PrimaryKeyRelatedField(
+    sale_tax = PrefetchedPrimaryKeyRelatedField(
         source="default_sales_tax",
         queryset=Tax.objects.all(),
         required=False,
         allow_null=True,
     )
-    purchase_tax = serializers.PrimaryKeyRelatedField(
+    purchase_tax = PrefetchedPrimaryKeyRelatedField(
         source="default_purchase_tax",
         queryset=Tax.objects.all(),
         required=False,
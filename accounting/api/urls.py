@@ -14,4 +14,6 @@ urlpatterns = [
     path("", include("accounting.api.routes.entries")),
     path("", include("accounting.api.routes.invoicing")),
     path("", include("accounting.api.routes.reports")),
+    path("", include("accounting.api.routes.batch")),
+    path("", include("accounting.api.routes.diagnostics")),
 ]
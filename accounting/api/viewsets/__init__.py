@@ -1,4 +1,6 @@
 from .base import BaseModelViewSet, StandardListPagination
+from .batch import BatchView
+from .diagnostics import MetricsView, ProfileView, QueryStatsView
 from .company import CompanyViewSet, CurrencyViewSet
 from .entries import JournalEntryLineViewSet, JournalEntryViewSet, MoveViewSet, MoveLineViewSet
 from .invoicing import (
@@ -58,7 +60,15 @@ from .settings import (
 from .localization import CountryCityViewSet, CountryCurrencyViewSet, CountryStateViewSet, CountryViewSet
 from .products import ProductCategoryViewSet, ProductViewSet, VendorProductViewSet
 from .templates import AccountGroupTemplateViewSet, AccountTemplateViewSet
-from .reports import BalanceSheetReportView, GeneralLedgerReportView, ProfitAndLossReportView, TrialBalanceReportView
+from .reports import (
+    AnalyticReportView,
+    AssetRegisterReportView,
+    BalanceSheetReportView,
+    DepreciationForecastReportView,
+    GeneralLedgerReportView,
+    ProfitAndLossReportView,
+    TrialBalanceReportView,
+)
 try:
     from .session import SessionViewSet
 except ImportError:
@@ -135,6 +145,13 @@ __all__ = [
     "ProfitAndLossReportView",
     "TrialBalanceReportView",
     "GeneralLedgerReportView",
+    "AssetRegisterReportView",
+    "DepreciationForecastReportView",
+    "AnalyticReportView",
+    "BatchView",
+    "QueryStatsView",
+    "MetricsView",
+    "ProfileView",
 ]
 if SessionViewSet is not None:
     __all__.append("SessionViewSet")
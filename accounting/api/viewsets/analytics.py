@@ -1,7 +1,7 @@
 from .shared import *
 
 
-class AnalyticItemViewSet(viewsets.ModelViewSet):
+class AnalyticItemViewSet(KeysetListMixin, RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = AnalyticLine.objects.select_related(
         "company",
         "partner",
@@ -14,6 +14,8 @@ class AnalyticItemViewSet(viewsets.ModelViewSet):
     ).all().order_by("-date", "-id")
     serializer_class = AnalyticLineSerializer
 
+    bulk_max_rows = 10000
+
     def get_queryset(self):
         queryset = super().get_queryset()
         analytic_account_id = self.request.query_params.get("analytic_account_id")
@@ -49,8 +51,29 @@ class AnalyticItemViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(task__icontains=task)
         return queryset
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        rows = request.data if isinstance(request.data, list) else request.data.get("rows")
+        if not isinstance(rows, list) or not rows:
+            raise DRFValidationError({"rows": "Provide a non-empty list of analytic items."})
+        if len(rows) > self.bulk_max_rows:
+            raise DRFValidationError({"rows": f"At most {self.bulk_max_rows} analytic items per request."})
+        atomic = str(request.query_params.get("atomic", "")).lower() in {"1", "true", "yes"}
+
+        summary = bulk_save_analytic_lines(
+            rows,
+            updatable=apply_company_filter(AnalyticLine.objects.all(), request, "company_id"),
+            companies=apply_company_filter(Company.objects.all(), request, "id"),
+            atomic=atomic,
+        )
+        response_status = status.HTTP_201_CREATED
+        if summary["errors"]:
+            written = summary["created"] or summary["updated"]
+            response_status = status.HTTP_207_MULTI_STATUS if written else status.HTTP_400_BAD_REQUEST
+        return Response(summary, status=response_status)
+
 
-class AnalyticPlanViewSet(viewsets.ModelViewSet):
+class AnalyticPlanViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = AnalyticPlan.objects.select_related("company", "parent").all().order_by("company_id", "name")
     serializer_class = AnalyticPlanSerializer
 
@@ -69,7 +92,7 @@ class AnalyticPlanViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class AnalyticAccountViewSet(viewsets.ModelViewSet):
+class AnalyticAccountViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = AnalyticAccount.objects.select_related("company", "plan", "partner").all().order_by("company_id", "name")
     serializer_class = AnalyticAccountSerializer
 
@@ -88,7 +111,7 @@ class AnalyticAccountViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class AnalyticDistributionModelViewSet(viewsets.ModelViewSet):
+class AnalyticDistributionModelViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = AnalyticDistributionModel.objects.select_related("company", "partner", "product_category").all().order_by(
         "company_id", "name"
     )
@@ -109,7 +132,7 @@ class AnalyticDistributionModelViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class AnalyticDistributionModelLineViewSet(viewsets.ModelViewSet):
+class AnalyticDistributionModelLineViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = AnalyticDistributionModelLine.objects.select_related("model", "analytic_account").all().order_by("model_id", "id")
     serializer_class = AnalyticDistributionModelLineSerializer
 
@@ -11,6 +11,7 @@ class AssetViewSet(BaseModelViewSet):
         "depreciation_account",
         "expense_account",
         "journal",
+        "model",
     ).all().order_by("company_id", "-acquisition_date", "id")
     serializer_class = AssetSerializer
     pagination_class = StandardListPagination
@@ -24,6 +25,7 @@ class AssetViewSet(BaseModelViewSet):
         method = self.request.query_params.get("method")
         active = self.request.query_params.get("active")
         asset_account_id = self.request.query_params.get("asset_account_id")
+        model_id = self.request.query_params.get("model_id")
         queryset = apply_company_filter(queryset, self.request, "company_id")
         if state:
             queryset = queryset.filter(state=state)
@@ -33,16 +35,10 @@ class AssetViewSet(BaseModelViewSet):
             queryset = queryset.filter(active=active.lower() in {"1", "true", "yes"})
         if asset_account_id:
             queryset = queryset.filter(asset_account_id=asset_account_id)
+        if model_id:
+            queryset = queryset.filter(model_id=model_id)
         return queryset
 
-    def perform_create(self, serializer):
-        instance = serializer.save()
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
-
     def perform_update(self, serializer):
         current = self.get_object()
         if current.state in {"closed", "cancelled"}:
@@ -59,6 +55,32 @@ class AssetViewSet(BaseModelViewSet):
             raise DRFValidationError("Running/closed assets cannot be deleted.")
         instance.delete()
 
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_rows(self, request):
+        company_ids = get_company_ids_from_request(request, required=True)
+        company = apply_company_filter(Company.objects.filter(id=company_ids[0]), request, "id").first()
+        if not company:
+            raise DRFValidationError({"company_id": "Company not found."})
+        generate_boards = str(request.query_params.get("generate_boards", "")).lower() in {"1", "true", "yes"}
+
+        upload = request.FILES.get("file")
+        try:
+            if upload is not None:
+                fmt = request.query_params.get("format") or upload.name.rsplit(".", 1)[-1].lower()
+                rows = read_asset_rows(open_text_stream(upload), fmt)
+            elif isinstance(request.data, list):
+                rows = iter_json_asset_rows(request.data)
+            else:
+                rows = iter_json_asset_rows(request.data.get("rows"))
+            summary = import_assets(company=company, rows=rows, generate_boards=generate_boards)
+        except ValueError as exc:
+            raise DRFValidationError({"detail": str(exc)}) from exc
+
+        response_status = status.HTTP_201_CREATED
+        if summary["errors"]:
+            response_status = status.HTTP_207_MULTI_STATUS if summary["created"] else status.HTTP_400_BAD_REQUEST
+        return Response(summary, status=response_status)
+
     @action(detail=True, methods=["post"], url_path="compute-depreciation")
     def compute_depreciation(self, request, pk=None):
         asset = self.get_object()
@@ -136,12 +158,8 @@ class AssetDepreciationLineViewSet(BaseModelViewSet):
         return queryset
 
     def perform_create(self, serializer):
-        instance = serializer.save()
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
+        instance = save_validated(serializer)
+        invalidate_depreciation_forecast(instance.asset.company_id)
 
     def perform_update(self, serializer):
         current = self.get_object()
@@ -153,11 +171,14 @@ class AssetDepreciationLineViewSet(BaseModelViewSet):
         except DjangoValidationError as exc:
             raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
         instance.save()
+        invalidate_depreciation_forecast(instance.asset.company_id)
 
     def perform_destroy(self, instance):
         if instance.state == "posted":
             raise DRFValidationError("Posted depreciation lines cannot be deleted.")
+        company_id = instance.asset.company_id
         instance.delete()
+        invalidate_depreciation_forecast(company_id)
 
     @action(detail=True, methods=["post"], url_path="post")
     def post_line(self, request, pk=None):
@@ -0,0 +1,182 @@
+import io
+import json
+import time
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounting.services.company_access_service import share_company_access
+from accounting.services.instrumentation_service import QueryCounter, record_request, resolve_route_name
+from accounting.services.metrics_service import observe_request
+
+BATCH_MAX_REQUESTS = 50
+BATCH_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"}
+# Request headers that belong to the batch call itself, not to its operations.
+_OUTER_ONLY_META = {"CONTENT_TYPE", "CONTENT_LENGTH", "HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE", "HTTP_IF_MATCH"}
+
+
+def _parse_bool(value, default: bool = False) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in {"1", "true", "yes"}
+
+
+class BatchView(APIView):
+    """Run several API operations in one round trip.
+
+    ``POST /api/batch/`` with ``{"atomic": false, "requests": [{"id", "method",
+    "path", "body", "headers"}, ...]}``. Operations run in order, in-process,
+    on the same database connection and with the caller's authentication.
+    With ``atomic`` they share one transaction: the first operation answering
+    400 or more rolls everything back and the remaining ones are skipped.
+
+    Operations call the view directly and skip the middleware stack; their
+    query counts and latency are recorded per route here instead.
+    """
+
+    max_requests = BATCH_MAX_REQUESTS
+
+    def post(self, request):
+        operations = request.data.get("requests") if isinstance(request.data, dict) else None
+        if not isinstance(operations, list) or not operations:
+            raise DRFValidationError({"requests": "Provide a non-empty list of requests."})
+        if len(operations) > self.max_requests:
+            raise DRFValidationError({"requests": f"At most {self.max_requests} requests per batch."})
+        atomic = _parse_bool(request.data.get("atomic"))
+        api_root = request.path.rsplit("batch/", 1)[0]
+
+        responses = []
+        if not atomic:
+            for index, operation in enumerate(operations):
+                responses.append(self._run(request, api_root, index, operation))
+            return Response({"atomic": False, "committed": True, "responses": responses}, status=status.HTTP_200_OK)
+
+        failed = False
+        with transaction.atomic():
+            for index, operation in enumerate(operations):
+                if failed:
+                    responses.append(self._entry(index, operation, status.HTTP_424_FAILED_DEPENDENCY, {}, None))
+                    continue
+                entry = self._run(request, api_root, index, operation)
+                responses.append(entry)
+                if entry["status"] >= 400:
+                    failed = True
+                    transaction.set_rollback(True)
+        return Response({"atomic": True, "committed": not failed, "responses": responses}, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def _entry(index, operation, status_code, headers, body) -> dict:
+        operation_id = operation.get("id", index) if isinstance(operation, dict) else index
+        return {"id": operation_id, "status": status_code, "headers": headers, "body": body}
+
+    def _error(self, index, operation, status_code, detail: str) -> dict:
+        return self._entry(index, operation, status_code, {}, {"detail": detail})
+
+    def _run(self, request, api_root: str, index: int, operation) -> dict:
+        if not isinstance(operation, dict):
+            return self._error(index, operation, status.HTTP_400_BAD_REQUEST, "Each request must be an object.")
+        method = str(operation.get("method") or "GET").upper()
+        if method not in BATCH_METHODS:
+            return self._error(index, operation, status.HTTP_405_METHOD_NOT_ALLOWED, f"Method {method} is not allowed.")
+        raw_path = str(operation.get("path") or "")
+        parts = urlsplit(raw_path)
+        path = parts.path if parts.path.startswith("/") else f"{api_root}{parts.path}"
+        if not path.startswith(api_root):
+            return self._error(index, operation, status.HTTP_400_BAD_REQUEST, f"Path must be under {api_root}.")
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return self._error(index, operation, status.HTTP_404_NOT_FOUND, "Not found.")
+        if getattr(match.func, "view_class", None) is type(self):
+            return self._error(index, operation, status.HTTP_400_BAD_REQUEST, "Batches cannot be nested.")
+
+        sub_request = self._build_request(request, method, path, parts.query, operation)
+        sub_request.resolver_match = match
+        started = time.perf_counter()
+        with QueryCounter() as counter:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+            body = self._response_body(response)
+        total_seconds = time.perf_counter() - started
+        route = resolve_route_name(sub_request)
+        record_request(
+            route,
+            queries=counter.queries,
+            db_seconds=counter.db_seconds,
+            total_seconds=total_seconds,
+            status_code=response.status_code,
+        )
+        observe_request(route, method, response.status_code, total_seconds, counter.queries)
+        return self._entry(index, operation, response.status_code, self._response_headers(response), body)
+
+    @staticmethod
+    def _response_headers(response) -> dict:
+        headers = dict(response.items())
+        renderer = getattr(response, "accepted_renderer", None)
+        if renderer is None or getattr(response, "is_rendered", True):
+            return headers
+        # DRF sets Content-Type while rendering, and the body is returned as
+        # data unrendered: apply the negotiated type the way rendering would.
+        headers.pop("Content-Type", None)
+        if response.data is not None:
+            media_type = response.accepted_media_type or renderer.media_type
+            charset = renderer.charset
+            headers["Content-Type"] = response.content_type or (
+                f"{media_type}; charset={charset}" if charset else media_type
+            )
+        return headers
+
+    @staticmethod
+    def _build_request(request, method: str, path: str, query: str, operation: dict) -> WSGIRequest:
+        body = b""
+        if "body" in operation and method not in {"GET", "HEAD"}:
+            body = json.dumps(operation["body"]).encode("utf-8")
+        environ = {key: value for key, value in request.META.items() if key not in _OUTER_ONLY_META}
+        headers = operation.get("headers") if isinstance(operation.get("headers"), dict) else {}
+        for name, value in headers.items():
+            environ[f"HTTP_{str(name).upper().replace('-', '_')}"] = str(value)
+        environ.update(
+            {
+                "REQUEST_METHOD": method,
+                "PATH_INFO": path,
+                "SCRIPT_NAME": "",
+                "QUERY_STRING": query,
+                "CONTENT_TYPE": "application/json",
+                "CONTENT_LENGTH": str(len(body)),
+                "wsgi.input": io.BytesIO(body),
+            }
+        )
+        sub_request = WSGIRequest(environ)
+        if request.user is not None and request.user.is_authenticated:
+            # Reuse the batch caller's authentication instead of re-validating
+            # the token once per operation.
+            sub_request._force_auth_user = request.user
+            sub_request._force_auth_token = request.auth
+            sub_request.user = request.user
+        share_company_access(request, sub_request)
+        return sub_request
+
+    @staticmethod
+    def _response_body(response):
+        if hasattr(response, "data"):
+            return response.data
+        if response.streaming:
+            content = b"".join(response.streaming_content)
+        else:
+            content = response.content
+        if not content:
+            return None
+        text = content.decode(response.charset or "utf-8", errors="replace")
+        if response.get("Content-Type", "").startswith("application/json"):
+            try:
+                return json.loads(text)
+            except ValueError:
+                pass
+        return text
@@ -99,3 +99,30 @@ class CompanyViewSet(BaseModelViewSet):
 
         stats = apply_chart_template_to_company(company=company, country=country)
         return Response(stats, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"], url_path="clone")
+    def clone(self, request, pk=None):
+        if not request.user or not request.user.is_authenticated:
+            return Response({"detail": "Authentication required."}, status=status.HTTP_401_UNAUTHORIZED)
+
+        source = self.get_object()
+        serializer = CloneCompanySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            with transaction.atomic():
+                company, stats = clone_company(
+                    source,
+                    name=serializer.validated_data["name"],
+                    code=(serializer.validated_data.get("code") or "").strip() or None,
+                )
+                access, _ = UserCompanyAccess.objects.get_or_create(user=request.user)
+                access.allowed_companies.add(company)
+        except ValueError as exc:
+            return Response({"code": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        invalidate_company_access(request.user.id, request=request)
+        return Response(
+            {"company": self.get_serializer(company).data, "cloned": stats},
+            status=status.HTTP_201_CREATED,
+        )
@@ -29,9 +29,11 @@ class AccountGroupViewSet(BaseModelViewSet):
         return queryset
 
 
-class AccountViewSet(BaseModelViewSet):
+class AccountViewSet(SearchMixin, BaseModelViewSet):
     queryset = Account.objects.select_related("company", "root", "group", "currency").all().order_by("company_id", "code")
     serializer_class = AccountSerializer
+    search_source = "accounts"
+    search_fields = ("id", "company_id", "code", "name")
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -68,14 +70,6 @@ class AccountViewSet(BaseModelViewSet):
             queryset = queryset.filter(Q(code__icontains=q) | Q(name__icontains=q))
         return queryset
 
-    def perform_create(self, serializer):
-        instance = serializer.save()
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
-
     def perform_update(self, serializer):
         current = self.get_object()
         if current.move_lines.exists():
@@ -323,7 +317,7 @@ class TransferModelViewSet(BaseModelViewSet):
     def perform_auto_transfer(self, request, pk=None):
         instance = self.get_object()
         try:
-            instance.action_perform_auto_transfer()
+            perform_auto_transfer(transfer_model=instance)
         except DjangoValidationError as exc:
             payload = exc.message_dict if hasattr(exc, "message_dict") else {"detail": exc.messages}
             return Response(payload, status=status.HTTP_400_BAD_REQUEST)
@@ -331,7 +325,7 @@ class TransferModelViewSet(BaseModelViewSet):
 
     @action(detail=False, methods=["post"], url_path="cron-auto-transfer")
     def cron_auto_transfer(self, request):
-        TransferModel.action_cron_auto_transfer()
+        run_auto_transfers()
         return Response({"detail": "Auto transfer cron executed."}, status=status.HTTP_200_OK)
 
 
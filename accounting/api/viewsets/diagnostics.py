@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounting.services.instrumentation_service import get_request_stats, reset_request_stats
+from accounting.services.metrics_service import render_prometheus
+from accounting.services.profiling_service import get_profile
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class IsLocalOrStaff(permissions.BasePermission):
+    """Staff users, or scrapers on ``ACCOUNTING_METRICS_ALLOWED_IPS`` (empty by default).
+
+    IP access is opt-in: behind a reverse proxy every request comes from the
+    proxy's address, so only list addresses that reach the app directly.
+    """
+
+    def has_permission(self, request, view):
+        allowed = getattr(settings, "ACCOUNTING_METRICS_ALLOWED_IPS", ())
+        if allowed and request.META.get("REMOTE_ADDR") in allowed:
+            return True
+        return bool(request.user and request.user.is_staff)
+
+
+class QueryStatsView(APIView):
+    """Per-route query count and latency recorded by this process (staff only)."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({"routes": get_request_stats()})
+
+    def delete(self, request):
+        reset_request_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MetricsView(APIView):
+    """Counters and histograms of this process in the Prometheus text format."""
+
+    permission_classes = [IsLocalOrStaff]
+
+    def get(self, request):
+        return HttpResponse(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+class ProfileView(APIView):
+    """A stored request profile: summary, ``?sort=`` top functions, or ``?download=1`` for the ``.prof`` file."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, profile_id):
+        artifact = get_profile(profile_id)
+        if artifact is None:
+            return Response({"detail": "Profile not found or expired."}, status=status.HTTP_404_NOT_FOUND)
+        if request.query_params.get("download", "").lower() in {"1", "true", "yes"}:
+            response = HttpResponse(artifact.stats, content_type="application/octet-stream")
+            response["Content-Disposition"] = f'attachment; filename="{artifact.profile_id}.prof"'
+            return response
+        sort = request.query_params.get("sort") or "cumulative"
+        if sort not in {"cumulative", "tottime", "calls", "ncalls"}:
+            return Response({"sort": "Use cumulative, tottime or calls."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({**artifact.as_dict(), "top": artifact.summary(sort=sort)})
@@ -1,11 +1,13 @@
 from .shared import *
 
 
-class MoveViewSet(BaseModelViewSet):
-    queryset = Move.objects.select_related(
+class MoveViewSet(KeysetListMixin, BaseModelViewSet):
+    queryset = Move.objects.with_balance().select_related(
         "company", "journal", "partner", "currency", "payment_term", "incoterm",
-    ).all().order_by("-date", "-id")
+    ).order_by("-date", "-id")
     serializer_class = MoveSerializer
+    # ``balance`` is summed from the lines.
+    conditional_related = ("lines",)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -27,14 +29,6 @@ class MoveViewSet(BaseModelViewSet):
             queryset = queryset.filter(date__lte=date_to)
         return queryset
 
-    def perform_create(self, serializer):
-        instance = serializer.save()
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
-
     def perform_update(self, serializer):
         if self.get_object().state != "draft":
             raise DRFValidationError("Only draft moves can be updated.")
@@ -61,7 +55,7 @@ class MoveViewSet(BaseModelViewSet):
         return Response(stats, status=status.HTTP_200_OK)
 
 
-class MoveLineViewSet(BaseModelViewSet):
+class MoveLineViewSet(KeysetListMixin, BaseModelViewSet):
     queryset = MoveLine.objects.select_related(
         "move", "account", "partner", "currency", "tax", "tax_repartition_line",
     ).all().order_by("-date", "-id")
@@ -71,6 +65,7 @@ class MoveLineViewSet(BaseModelViewSet):
         queryset = super().get_queryset()
         move_id = self.request.query_params.get("move_id")
         account_id = self.request.query_params.get("account_id")
+        analytic_account_id = self.request.query_params.get("analytic_account_id")
         date_from = self.request.query_params.get("date_from")
         date_to = self.request.query_params.get("date_to")
         if move_id:
@@ -78,20 +73,19 @@ class MoveLineViewSet(BaseModelViewSet):
         queryset = apply_company_filter(queryset, self.request, "move__company_id")
         if account_id:
             queryset = queryset.filter(account_id=account_id)
+        if analytic_account_id:
+            queryset = queryset.filter(
+                Q(analytic_account_id=analytic_account_id)
+                | Q(id__in=MoveLineAnalyticDistribution.objects.filter(
+                    analytic_account_id=analytic_account_id,
+                ).values("move_line_id"))
+            )
         if date_from:
             queryset = queryset.filter(date__gte=date_from)
         if date_to:
             queryset = queryset.filter(date__lte=date_to)
         return queryset
 
-    def perform_create(self, serializer):
-        instance = serializer.save()
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
-
     def perform_update(self, serializer):
         if self.get_object().move.state != "draft":
             raise DRFValidationError("Cannot update lines of a posted/cancelled move.")
@@ -119,12 +113,7 @@ class JournalEntryViewSet(MoveViewSet):
         return queryset.filter(move_type="entry")
 
     def perform_create(self, serializer):
-        instance = serializer.save(move_type="entry")
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
+        save_validated(serializer, move_type="entry")
 
     @action(detail=True, methods=["post"], url_path="set-draft")
     def set_draft(self, request, pk=None):
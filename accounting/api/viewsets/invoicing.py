@@ -13,6 +13,8 @@ class InvoiceViewSet(BaseModelViewSet):
         .order_by("-date", "-id")
     )
     serializer_class = InvoiceSerializer
+    # ``amount_*`` are summed from the invoice lines.
+    conditional_related = ("invoice_lines",)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -35,12 +37,7 @@ class InvoiceViewSet(BaseModelViewSet):
         return queryset
 
     def perform_create(self, serializer):
-        instance = serializer.save(state="draft")
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
+        save_validated(serializer, state="draft")
 
     def perform_update(self, serializer):
         if self.get_object().state != "draft":
@@ -132,12 +129,7 @@ class VendorBillViewSet(InvoiceViewSet):
     )
 
     def perform_create(self, serializer):
-        instance = serializer.save(state="draft", move_type="in_invoice", is_debit_note=False)
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
+        save_validated(serializer, state="draft", move_type="in_invoice", is_debit_note=False)
 
     def perform_update(self, serializer):
         if self.get_object().state != "draft":
@@ -163,12 +155,7 @@ class VendorRefundViewSet(InvoiceViewSet):
     )
 
     def perform_create(self, serializer):
-        instance = serializer.save(state="draft", move_type="in_refund")
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
+        save_validated(serializer, state="draft", move_type="in_refund")
 
     def perform_update(self, serializer):
         if self.get_object().state != "draft":
@@ -243,12 +230,7 @@ class CreditNoteViewSet(InvoiceViewSet):
         move_type = serializer.validated_data.get("move_type") or "out_refund"
         if move_type not in {"out_refund", "in_refund"}:
             raise DRFValidationError({"move_type": "Credit note move_type must be out_refund or in_refund."})
-        instance = serializer.save(state="draft", move_type=move_type)
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
+        save_validated(serializer, state="draft", move_type=move_type)
 
     def perform_update(self, serializer):
         current = self.get_object()
@@ -292,12 +274,7 @@ class DebitNoteViewSet(InvoiceViewSet):
         move_type = serializer.validated_data.get("move_type") or "out_invoice"
         if move_type not in {"out_invoice", "in_invoice"}:
             raise DRFValidationError({"move_type": "Debit note move_type must be out_invoice or in_invoice."})
-        instance = serializer.save(state="draft", move_type=move_type, is_debit_note=True)
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
+        save_validated(serializer, state="draft", move_type=move_type, is_debit_note=True)
 
     def perform_update(self, serializer):
         current = self.get_object()
@@ -322,7 +299,7 @@ class DebitNoteViewSet(InvoiceViewSet):
         return Response({"detail": "Already a debit note."}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(KeysetListMixin, RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.select_related("company", "partner", "journal", "payment_method_line", "move", "currency").all().order_by(
         "-date", "-id"
     )
@@ -346,12 +323,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
         return queryset
 
     def perform_create(self, serializer):
-        payment = serializer.save(state="draft")
-        try:
-            payment.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        payment.save()
+        save_validated(serializer, state="draft")
 
     def perform_update(self, serializer):
         if self.get_object().state != "draft":
@@ -397,12 +369,7 @@ class VendorPaymentViewSet(PaymentViewSet):
         return queryset.filter(payment_type="outbound")
 
     def perform_create(self, serializer):
-        payment = serializer.save(state="draft", payment_type="outbound")
-        try:
-            payment.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        payment.save()
+        save_validated(serializer, state="draft", payment_type="outbound")
 
     def perform_update(self, serializer):
         if self.get_object().state != "draft":
@@ -436,14 +403,6 @@ class InvoiceLineViewSet(BaseModelViewSet):
         queryset = apply_company_filter(queryset, self.request, "move__company_id")
         return queryset
 
-    def perform_create(self, serializer):
-        instance = serializer.save()
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
-
     def perform_update(self, serializer):
         if self.get_object().move.state != "draft":
             raise DRFValidationError("Cannot update lines of a posted/cancelled invoice.")
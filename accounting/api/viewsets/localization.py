@@ -1,14 +1,79 @@
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from accounting.models import LocalizationSnapshot
+from accounting.services.localization_snapshot_service import build_localization_snapshots
+
 from .shared import *
 
+SNAPSHOT_MAX_AGE = 24 * 60 * 60
+
+
+class LocalizationSnapshotMixin:
+    """``GET snapshot/?country_id=`` serves the payload pre-rendered by ``import_localization_data``.
+
+    The body is the same list as ``?country_id=`` without pagination, stored
+    as JSON and gzip with a content-hash ETag, so a request costs one row fetch
+    (or a 304 from the ETag alone). Snapshots dropped by an edit are rebuilt
+    on the next request.
+    """
+
+    snapshot_kind = None
+
+    @action(detail=False, methods=["get"], url_path="snapshot")
+    def snapshot(self, request):
+        country_id = request.query_params.get("country_id")
+        if not country_id:
+            raise DRFValidationError({"country_id": "This query parameter is required."})
+        try:
+            country_id = int(country_id)
+        except ValueError as exc:
+            raise DRFValidationError({"country_id": "Must be an integer."}) from exc
+
+        snapshots = LocalizationSnapshot.objects.filter(country_id=country_id, kind=self.snapshot_kind)
+        validators = snapshots.values_list("etag", "updated_at").first()
+        if validators is None and Country.objects.filter(id=country_id).exists():
+            build_localization_snapshots(country_ids=[country_id], kinds=[self.snapshot_kind])
+            validators = snapshots.values_list("etag", "updated_at").first()
+        if validators is None:
+            return Response(
+                {"detail": "No snapshot for this country. Run import_localization_data."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        etag, updated_at = validators
+        use_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+        # Each encoding is its own representation, so it gets its own strong ETag.
+        etag = quote_etag(f"{etag}-gzip" if use_gzip else etag)
+        timestamp = int(updated_at.timestamp())
+        headers = {
+            "ETag": etag,
+            "Last-Modified": http_date(timestamp),
+            "Cache-Control": f"public, max-age={SNAPSHOT_MAX_AGE}",
+        }
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            field = "content_gzip" if use_gzip else "content"
+            content = snapshots.values_list(field, flat=True).first()
+            response = HttpResponse(bytes(content), content_type="application/json")
+            if use_gzip:
+                response["Content-Encoding"] = "gzip"
+        for name, value in headers.items():
+            response[name] = value
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
 
 class CountryViewSet(BaseModelViewSet):
     queryset = Country.objects.all().order_by("name")
     serializer_class = CountrySerializer
 
 
-class CountryStateViewSet(BaseModelViewSet):
+class CountryStateViewSet(LocalizationSnapshotMixin, BaseModelViewSet):
     queryset = CountryState.objects.select_related("country").all().order_by("country__name", "name")
     serializer_class = CountryStateSerializer
+    snapshot_kind = "states"
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -18,9 +83,10 @@ class CountryStateViewSet(BaseModelViewSet):
         return queryset
 
 
-class CountryCityViewSet(BaseModelViewSet):
+class CountryCityViewSet(LocalizationSnapshotMixin, KeysetListMixin, BaseModelViewSet):
     queryset = CountryCity.objects.select_related("country", "state").all().order_by("country__name", "name")
     serializer_class = CountryCitySerializer
+    snapshot_kind = "cities"
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -1,9 +1,11 @@
 from .shared import *
 
 
-class PartnerViewSet(BaseModelViewSet):
+class PartnerViewSet(SearchMixin, BaseModelViewSet):
     queryset = Partner.objects.select_related("company").all().order_by("company_id", "name")
     serializer_class = PartnerSerializer
+    search_source = "partners"
+    search_fields = ("id", "company_id", "name", "email", "vat")
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -14,7 +16,7 @@ class PartnerViewSet(BaseModelViewSet):
         return queryset
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = Partner.objects.select_related("company", "parent", "country", "state").filter(customer_rank__gt=0).order_by(
         "company_id", "name"
     )
@@ -34,15 +36,10 @@ class CustomerViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         payload = dict(serializer.validated_data)
         payload["customer_rank"] = max(1, int(payload.get("customer_rank") or 1))
-        instance = serializer.save(**payload)
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
+        save_validated(serializer, **payload)
 
 
-class VendorViewSet(viewsets.ModelViewSet):
+class VendorViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = Partner.objects.select_related("company").filter(supplier_rank__gt=0).order_by("-supplier_rank", "name", "id")
     serializer_class = VendorSerializer
     pagination_class = StandardListPagination
@@ -84,12 +81,7 @@ class VendorViewSet(viewsets.ModelViewSet):
             defaults["supplier_rank"] = 1
         if "is_company" not in self.request.data:
             defaults["is_company"] = True
-        instance = serializer.save(**defaults)
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
+        save_validated(serializer, **defaults)
 
     @action(detail=True, methods=["post"], url_path="increase-rank")
     def increase_rank(self, request, pk=None):
@@ -115,8 +107,10 @@ class VendorViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], url_path="vendor-bills")
     def vendor_bills(self, request, pk=None):
         partner = self.get_object()
+        select_related, _ = MoveSerializer.get_related_lookups()
         bills = (
-            Move.objects.select_related("company", "journal", "partner", "currency", "payment_term", "incoterm")
+            Move.objects.with_balance()
+            .select_related(*select_related)
             .filter(partner_id=partner.id, move_type__in=["in_invoice", "in_refund"])
             .order_by("-date", "-id")
         )
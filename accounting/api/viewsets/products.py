@@ -1,7 +1,7 @@
 from .shared import *
 
 
-class ProductViewSet(BaseModelViewSet):
+class ProductViewSet(SearchMixin, BaseModelViewSet):
     queryset = Product.objects.select_related(
         "company",
         "category",
@@ -11,6 +11,8 @@ class ProductViewSet(BaseModelViewSet):
         "purchase_tax",
     ).all().order_by("company_id", "name")
     serializer_class = ProductSerializer
+    search_source = "products"
+    search_fields = ("id", "company_id", "name", "default_code", "barcode")
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -32,14 +34,6 @@ class ProductViewSet(BaseModelViewSet):
             queryset = queryset.filter(active=active.lower() in {"1", "true", "yes"})
         return queryset
 
-    def perform_create(self, serializer):
-        instance = serializer.save()
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
-
     def perform_update(self, serializer):
         instance = serializer.save()
         try:
@@ -55,12 +49,7 @@ class VendorProductViewSet(ProductViewSet):
         return queryset.filter(purchase_ok=True)
 
     def perform_create(self, serializer):
-        instance = serializer.save(purchase_ok=True)
-        try:
-            instance.full_clean()
-        except DjangoValidationError as exc:
-            raise DRFValidationError(exc.message_dict if hasattr(exc, "message_dict") else exc.messages)
-        instance.save()
+        save_validated(serializer, purchase_ok=True)
 
     def perform_update(self, serializer):
         instance = serializer.save(purchase_ok=True)
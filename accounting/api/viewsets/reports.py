@@ -1,19 +1,29 @@
+import json
 from datetime import date
 
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from accounting.services.report_service import (
+    ANALYTIC_REPORT_PERIODS,
+    AnalyticReportOptions,
+    AssetRegisterOptions,
     BalanceSheetOptions,
+    DepreciationForecastOptions,
     GeneralLedgerOptions,
     ProfitAndLossOptions,
     TrialBalanceOptions,
+    build_analytic_report,
+    build_asset_register,
     build_balance_sheet,
+    build_depreciation_forecast,
     build_general_ledger,
     build_profit_and_loss,
     build_trial_balance,
+    iter_asset_register,
 )
 
 
@@ -127,3 +137,77 @@ class GeneralLedgerReportView(APIView):
         )
         payload = build_general_ledger(options)
         return Response(payload, status=status.HTTP_200_OK)
+
+
+class AssetRegisterReportView(APIView):
+    def get(self, request):
+        company_id = _parse_company_id(request.query_params.get("company_id"))
+        date_to = _parse_date(request.query_params.get("date_to"), "date_to", default=date.today())
+
+        options = AssetRegisterOptions(
+            company_id=company_id,
+            date_to=date_to,
+            posted_only=_parse_bool(request.query_params.get("posted_only"), default=True),
+            include_draft=_parse_bool(request.query_params.get("include_draft"), default=False),
+            totals_only=_parse_bool(request.query_params.get("totals_only"), default=False),
+        )
+        if _parse_bool(request.query_params.get("stream"), default=False):
+            # One JSON record per line so large registers never sit in memory.
+            lines = (json.dumps(record) + "\n" for record in iter_asset_register(options))
+            return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+
+        payload = build_asset_register(options)
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class DepreciationForecastReportView(APIView):
+    MAX_YEARS = 10
+
+    def get(self, request):
+        company_id = _parse_company_id(request.query_params.get("company_id"))
+        date_from = _parse_date(request.query_params.get("date_from"), "date_from", default=date.today())
+        raw_years = request.query_params.get("years") or "1"
+        try:
+            years = int(raw_years)
+        except ValueError as exc:
+            raise DRFValidationError({"years": "Must be an integer."}) from exc
+        if years < 1 or years > self.MAX_YEARS:
+            raise DRFValidationError({"years": f"Must be between 1 and {self.MAX_YEARS}."})
+
+        options = DepreciationForecastOptions(
+            company_id=company_id,
+            date_from=date_from.replace(day=1),
+            years=years,
+            include_draft=_parse_bool(request.query_params.get("include_draft"), default=True),
+        )
+        payload = build_depreciation_forecast(options)
+        return Response(payload, status=status.HTTP_200_OK)
+
+
+class AnalyticReportView(APIView):
+    def get(self, request):
+        company_id = _parse_company_id(request.query_params.get("company_id"))
+        date_to = _parse_date(request.query_params.get("date_to"), "date_to", default=date.today())
+        default_date_from = date(date_to.year, 1, 1)
+        date_from = _parse_date(request.query_params.get("date_from"), "date_from", default=default_date_from)
+        if date_from > date_to:
+            raise DRFValidationError({"date_from": "date_from must be <= date_to."})
+        period = request.query_params.get("period") or "month"
+        if period not in ANALYTIC_REPORT_PERIODS:
+            raise DRFValidationError({"period": f"Must be one of: {', '.join(ANALYTIC_REPORT_PERIODS)}."})
+        raw_plan_id = request.query_params.get("plan_id")
+        try:
+            plan_id = int(raw_plan_id) if raw_plan_id else None
+        except ValueError as exc:
+            raise DRFValidationError({"plan_id": "Must be an integer."}) from exc
+
+        options = AnalyticReportOptions(
+            company_id=company_id,
+            date_from=date_from,
+            date_to=date_to,
+            period=period,
+            plan_id=plan_id,
+            by_general_account=_parse_bool(request.query_params.get("by_general_account"), default=False),
+        )
+        payload = build_analytic_report(options)
+        return Response(payload, status=status.HTTP_200_OK)
@@ -8,6 +8,13 @@ from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from accounting.models import UserCompanyAccess
+from accounting.services.cache_service import shared_cache_configured
+from accounting.services.company_service import CompanySpec, provision_companies
+from accounting.services.session_cache_service import (
+    cache_session_info,
+    get_cached_session_info,
+    session_info_cache_key,
+)
 
 from .shared import *
 
@@ -22,46 +29,21 @@ class SessionViewSet(viewsets.ViewSet):
         }
         return payload
 
-    def _generate_unique_company_name(self, base_name):
-        name = (base_name or "").strip()
-        if not name:
-            name = "New Company"
-        if not Company.objects.filter(name=name).exists():
-            return name
-        index = 2
-        while True:
-            candidate = f"{name} {index}"
-            if not Company.objects.filter(name=candidate).exists():
-                return candidate
-            index += 1
-
-    def _generate_unique_company_code(self, company_name):
-        normalized = "".join(ch for ch in (company_name or "").upper() if ch.isalnum())
-        base = (normalized[:8] or "COMP")
-        code = base
-        index = 1
-        while Company.objects.filter(code=code).exists():
-            suffix = str(index)
-            code = f"{base[: max(1, 8 - len(suffix))]}{suffix}"
-            index += 1
-        return code
-
-    def _resolve_access(self, user):
-        return UserCompanyAccess.objects.select_related("current_company", "current_company__country").filter(
-            user_id=user.id
-        ).first()
-
-    def _resolve_company(self, request, user):
-        access = self._resolve_access(user)
-        if access:
-            if access.current_company_id:
-                return access.current_company
-            first_active = access.active_companies.select_related("country").order_by("id").first()
-            if first_active:
-                return first_active
-            first_allowed = access.allowed_companies.select_related("country").order_by("id").first()
-            if first_allowed:
-                return first_allowed
+    def _resolve_access(self, request, user):
+        return get_company_access(request, user)
+
+    def _resolve_company(self, request, user, access=None, known_companies=None):
+        access = access or self._resolve_access(request, user)
+        if access.exists:
+            company_id = (
+                access.current_company_id
+                or min(access.active_company_ids, default=None)
+                or min(access.allowed_company_ids, default=None)
+            )
+            if company_id:
+                if known_companies and company_id in known_companies:
+                    return known_companies[company_id]
+                return Company.objects.select_related("country").filter(id=company_id).first()
 
         if hasattr(user, "company_id") and user.company_id:
             return Company.objects.select_related("country").filter(id=user.company_id).first()
@@ -77,8 +59,36 @@ class SessionViewSet(viewsets.ViewSet):
         return None
 
     def _build_session_info(self, request, user):
-        company = self._resolve_company(request, user)
-        access = self._resolve_access(user)
+        access = self._resolve_access(request, user)
+        company_id = None
+        if access.exists:
+            company_id = (
+                access.current_company_id
+                or min(access.active_company_ids, default=None)
+                or min(access.allowed_company_ids, default=None)
+            )
+        if company_id is None or not shared_cache_configured():
+            # The company then depends on the user, headers or data, or other
+            # workers would not see invalidations: not cached.
+            return self._compute_session_info(request, user, access)
+
+        cache_key = session_info_cache_key(user.id, company_id, access)
+        payload = get_cached_session_info(cache_key)
+        if payload is None:
+            payload = self._compute_session_info(request, user, access)
+            cache_session_info(cache_key, payload)
+        return payload
+
+    def _compute_session_info(self, request, user, access):
+        allowed_by_id = {}
+        if access.exists and access.allowed_company_ids:
+            allowed_by_id = {
+                c.id: c
+                for c in Company.objects.select_related("country")
+                .filter(id__in=access.allowed_company_ids)
+                .order_by("name")
+            }
+        company = self._resolve_company(request, user, access, allowed_by_id)
         settings_obj = None
         settings_currency = None
         default_country_currency = None
@@ -101,9 +111,9 @@ class SessionViewSet(viewsets.ViewSet):
             default_country_currency.currency if default_country_currency else None
         )
 
-        if access:
-            allowed_companies_qs = access.allowed_companies.select_related("country").all().order_by("name")
-            active_company_ids = set(access.active_companies.values_list("id", flat=True))
+        if access.exists:
+            allowed_companies_qs = allowed_by_id.values()
+            active_company_ids = set(access.active_company_ids)
         elif company:
             allowed_companies_qs = Company.objects.select_related("country").filter(id=company.id).order_by("name")
             active_company_ids = {company.id}
@@ -203,35 +213,19 @@ class SessionViewSet(viewsets.ViewSet):
 
         return country, currency
 
-    def _create_signup_company(self, company_data):
+    def _signup_company_spec(self, company_data, resolved=None):
         company_name_raw = (company_data.get("name") or "").strip()
         if not company_name_raw:
             raise DRFValidationError({"companies": "Each company requires a non-empty name."})
 
-        country, currency = self._resolve_country_and_currency(
-            company_data.get("country_id"),
-            company_data.get("currency_id"),
-        )
-
-        company_name = self._generate_unique_company_name(company_name_raw)
-        company_code = self._generate_unique_company_code(company_name)
-
-        company = Company.objects.create(
-            name=company_name,
-            code=company_code,
-            legal_name=company_name,
-            country=country,
-        )
-
-        AccountingSettings.objects.create(
-            company=company,
-            country_code=(country.code if country else ""),
-            fiscal_localization_country=country,
-            chart_template_country=country,
-            account_fiscal_country=country,
-            currency=currency,
-        )
-        return company
+        # Many companies of one signup usually share a country/currency.
+        resolved = {} if resolved is None else resolved
+        country_id, currency_id = company_data.get("country_id"), company_data.get("currency_id")
+        key = (str(country_id), str(currency_id))
+        if key not in resolved:
+            resolved[key] = self._resolve_country_and_currency(country_id, currency_id)
+        country, currency = resolved[key]
+        return CompanySpec(name=company_name_raw, country=country, currency=currency)
 
     def _normalize_company_ids(self, company_ids):
         if not isinstance(company_ids, list) or not company_ids:
@@ -321,15 +315,20 @@ class SessionViewSet(viewsets.ViewSet):
                 last_name=last_name,
             )
 
-            created_companies = []
-            active_companies = []
+            specs = []
+            resolved = {}
             for item in companies_payload:
                 if not isinstance(item, dict):
                     raise DRFValidationError({"companies": "Each item must be an object."})
-                company = self._create_signup_company(item)
-                created_companies.append(company)
-                if item.get("is_active", True):
-                    active_companies.append(company)
+                specs.append(self._signup_company_spec(item, resolved))
+            created_companies = provision_companies(
+                specs, apply_chart_template=bool(request.data.get("apply_chart_template", False))
+            )
+            active_companies = [
+                company
+                for company, item in zip(created_companies, companies_payload)
+                if item.get("is_active", True)
+            ]
 
             if not created_companies:
                 raise DRFValidationError({"companies": "At least one company is required."})
@@ -392,6 +391,7 @@ class SessionViewSet(viewsets.ViewSet):
             access.active_companies.add(company_id)
         access.current_company_id = company_id
         access.save(update_fields=["current_company", "updated_at"])
+        invalidate_company_access(request.user.id, request=request)
         return Response(self._build_session_info(request, request.user), status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["post"], url_path="set-active-companies")
@@ -417,6 +417,7 @@ class SessionViewSet(viewsets.ViewSet):
         if not access.current_company_id or access.current_company_id not in normalized_ids:
             access.current_company_id = normalized_ids[0]
             access.save(update_fields=["current_company", "updated_at"])
+        invalidate_company_access(request.user.id, request=request)
         return Response(self._build_session_info(request, request.user), status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["patch"], url_path="update-profile")
@@ -507,6 +508,7 @@ class SessionViewSet(viewsets.ViewSet):
             else:
                 user.save()
 
+        invalidate_company_access(user.id, request=request)
         return Response(self._build_session_info(request, user), status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["post"], url_path="add-company")
@@ -519,7 +521,10 @@ class SessionViewSet(viewsets.ViewSet):
             return Response({"name": "This field is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         with transaction.atomic():
-            company = self._create_signup_company(company_data)
+            company = provision_companies(
+                [self._signup_company_spec(company_data)],
+                apply_chart_template=bool(company_data.get("apply_chart_template", False)),
+            )[0]
             access, _ = UserCompanyAccess.objects.get_or_create(user=request.user)
             access.allowed_companies.add(company)
 
@@ -532,6 +537,7 @@ class SessionViewSet(viewsets.ViewSet):
                 access.current_company = company
                 access.save(update_fields=["current_company", "updated_at"])
 
+        invalidate_company_access(request.user.id, request=request)
         return Response(self._build_session_info(request, request.user), status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=["post"], url_path="attach-existing-company")
@@ -562,6 +568,7 @@ class SessionViewSet(viewsets.ViewSet):
             access.current_company = company
             access.save(update_fields=["current_company", "updated_at"])
 
+        invalidate_company_access(request.user.id, request=request)
         return Response(self._build_session_info(request, request.user), status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["post"], url_path="logout")
@@ -1,7 +1,7 @@
 from .shared import *
 
 
-class AccountingSettingsViewSet(viewsets.ModelViewSet):
+class AccountingSettingsViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = AccountingSettings.objects.select_related(
         "company",
         "fiscal_localization_country",
@@ -37,6 +37,21 @@ class AccountingSettingsViewSet(viewsets.ModelViewSet):
         queryset = apply_company_filter(queryset, self.request, "company_id")
         return queryset
 
+    def _configuration_validators(self, request, company):
+        settings_count, settings_modified = get_queryset_validators(
+            AccountingSettings.objects.filter(company_id=company.id), self.get_serializer_class()
+        )
+        currency_count, currency_modified = get_queryset_validators(
+            CountryCurrency.objects.filter(country_id=company.country_id, is_default=True, active=True),
+            CountryCurrencySerializer,
+        )
+        candidates = [settings_modified, currency_modified, company.updated_at]
+        if company.country_id:
+            candidates.append(company.country.updated_at)
+        last_modified = max(value for value in candidates if value is not None)
+        key_parts = ("configuration", company.id, settings_count, currency_count)
+        return conditional_get_response(request, key_parts, last_modified)
+
     def _build_configuration_payload(self, company):
         settings_obj = (
             AccountingSettings.objects.select_related(
@@ -108,8 +123,11 @@ class AccountingSettingsViewSet(viewsets.ModelViewSet):
         if not company:
             return Response({"detail": "Company not found."}, status=status.HTTP_404_NOT_FOUND)
 
+        not_modified, headers = self._configuration_validators(request, company)
+        if not_modified is not None:
+            return not_modified
         payload = self._build_configuration_payload(company)
-        return Response(payload, status=status.HTTP_200_OK)
+        return Response(payload, status=status.HTTP_200_OK, headers=headers)
 
     @action(detail=False, methods=["get"], url_path="my-configuration")
     def my_configuration(self, request):
@@ -151,8 +169,11 @@ class AccountingSettingsViewSet(viewsets.ModelViewSet):
         if not company:
             return Response({"detail": "Company not found."}, status=status.HTTP_404_NOT_FOUND)
 
+        not_modified, headers = self._configuration_validators(request, company)
+        if not_modified is not None:
+            return not_modified
         payload = self._build_configuration_payload(company)
-        return Response(payload, status=status.HTTP_200_OK)
+        return Response(payload, status=status.HTTP_200_OK, headers=headers)
 
     @action(detail=False, methods=["post"], url_path="upsert-by-company")
     def upsert_by_company(self, request):
@@ -232,7 +253,7 @@ class AccountingSettingsViewSet(viewsets.ModelViewSet):
         return Response(self.get_serializer(settings_obj).data, status=status.HTTP_200_OK)
 
 
-class FollowupLevelViewSet(viewsets.ModelViewSet):
+class FollowupLevelViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = FollowupLevel.objects.select_related("company").all().order_by("company_id", "delay_days", "id")
     serializer_class = FollowupLevelSerializer
 
@@ -242,7 +263,7 @@ class FollowupLevelViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class BankAccountViewSet(viewsets.ModelViewSet):
+class BankAccountViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = BankAccount.objects.select_related("company", "journal").all().order_by("company_id", "id")
     serializer_class = BankAccountSerializer
 
@@ -255,7 +276,7 @@ class BankAccountViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class ReconciliationModelViewSet(viewsets.ModelViewSet):
+class ReconciliationModelViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = ReconciliationModel.objects.select_related("company", "journal").all().order_by("company_id", "name")
     serializer_class = ReconciliationModelSerializer
 
@@ -268,7 +289,7 @@ class ReconciliationModelViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class ReconciliationModelLineViewSet(viewsets.ModelViewSet):
+class ReconciliationModelLineViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = ReconciliationModelLine.objects.select_related("reconciliation_model", "account", "tax").all().order_by(
         "reconciliation_model_id", "sequence", "id"
     )
@@ -283,7 +304,7 @@ class ReconciliationModelLineViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class FiscalPositionViewSet(viewsets.ModelViewSet):
+class FiscalPositionViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = FiscalPosition.objects.select_related("company", "country").all().order_by("company_id", "name")
     serializer_class = FiscalPositionSerializer
 
@@ -296,7 +317,7 @@ class FiscalPositionViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class FiscalPositionTaxMapViewSet(viewsets.ModelViewSet):
+class FiscalPositionTaxMapViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = FiscalPositionTaxMap.objects.select_related("fiscal_position", "tax_src", "tax_dest").all().order_by(
         "fiscal_position_id", "id"
     )
@@ -311,7 +332,7 @@ class FiscalPositionTaxMapViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class FiscalPositionAccountMapViewSet(viewsets.ModelViewSet):
+class FiscalPositionAccountMapViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = FiscalPositionAccountMap.objects.select_related("fiscal_position", "account_src", "account_dest").all().order_by(
         "fiscal_position_id", "id"
     )
@@ -326,7 +347,7 @@ class FiscalPositionAccountMapViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class LedgerViewSet(viewsets.ModelViewSet):
+class LedgerViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = Ledger.objects.select_related("company", "currency").all().order_by("company_id", "code")
     serializer_class = LedgerSerializer
 
@@ -339,7 +360,7 @@ class LedgerViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class FinancialBudgetViewSet(viewsets.ModelViewSet):
+class FinancialBudgetViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = FinancialBudget.objects.select_related("company").all().order_by("company_id", "-date_from", "-id")
     serializer_class = FinancialBudgetSerializer
 
@@ -352,7 +373,7 @@ class FinancialBudgetViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class FinancialBudgetLineViewSet(viewsets.ModelViewSet):
+class FinancialBudgetLineViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = FinancialBudgetLine.objects.select_related("budget", "account").all().order_by("budget_id", "id")
     serializer_class = FinancialBudgetLineSerializer
 
@@ -365,7 +386,7 @@ class FinancialBudgetLineViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class AssetModelViewSet(viewsets.ModelViewSet):
+class AssetModelViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = AssetModel.objects.select_related(
         "company",
         "account_asset",
@@ -384,7 +405,7 @@ class AssetModelViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class DisallowedExpenseCategoryViewSet(viewsets.ModelViewSet):
+class DisallowedExpenseCategoryViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = DisallowedExpenseCategory.objects.select_related("company", "expense_account").all().order_by("company_id", "name")
     serializer_class = DisallowedExpenseCategorySerializer
 
@@ -397,7 +418,7 @@ class DisallowedExpenseCategoryViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class PaymentProviderViewSet(viewsets.ModelViewSet):
+class PaymentProviderViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = PaymentProvider.objects.select_related("company", "journal").all().order_by("company_id", "name")
     serializer_class = PaymentProviderSerializer
 
@@ -413,7 +434,7 @@ class PaymentProviderViewSet(viewsets.ModelViewSet):
         return queryset
 
 
-class PaymentProviderMethodViewSet(viewsets.ModelViewSet):
+class PaymentProviderMethodViewSet(RelatedNamesQuerysetMixin, viewsets.ModelViewSet):
     queryset = PaymentProviderMethod.objects.select_related("provider", "payment_method").all().order_by("provider_id", "id")
     serializer_class = PaymentProviderMethodSerializer
 
@@ -1,15 +1,29 @@
-from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db.models import Count, DecimalField, F, Q, Sum, Value
+import hashlib
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, DecimalField, F, Max, Q, QuerySet, Sum, Value
+from django.db.models.deletion import ProtectedError, RestrictedError
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.db.models.functions import Coalesce
-from rest_framework import filters, status, viewsets
+from rest_framework import filters, mixins, serializers, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.exceptions import MethodNotAllowed, ValidationError as DRFValidationError
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework.response import Response
+from rest_framework.utils import model_meta
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
 
-from accounting.api.pagination import StandardListPagination
+from accounting.api.pagination import KeysetListPagination, StandardListPagination, iter_keyset_chunks
 from accounting.models import (
     Move,
     MoveLine,
+    MoveLineAnalyticDistribution,
     AnalyticLine,
     AnalyticAccount,
     AnalyticDistributionModel,
@@ -62,6 +76,13 @@ from accounting.models import (
     TransferModelLine,
     UserCompanyAccess,
 )
+from accounting.services.analytic_service import bulk_save_analytic_lines
+from accounting.services.asset_import_service import (
+    import_assets,
+    iter_json_asset_rows,
+    open_text_stream,
+    read_asset_rows,
+)
 from accounting.services.asset_service import (
     cancel_asset,
     close_asset,
@@ -72,18 +93,32 @@ from accounting.services.asset_service import (
     set_asset_running,
 )
 from accounting.services.chart_template_service import apply_chart_template_to_company
+from accounting.services.company_access_service import get_company_access, invalidate_company_access
+from accounting.services.company_service import clone_company
 from accounting.services.invoice_service import (
     create_debit_note_from_invoice,
     generate_journal_lines_and_post_invoice,
     reverse_invoice_to_credit_note,
 )
-from accounting.services.move_service import cancel_move, post_move, reverse_move, set_move_to_draft
+from accounting.services.move_service import (
+    cancel_move,
+    perform_auto_transfer,
+    post_move,
+    reverse_move,
+    run_auto_transfers,
+    set_move_to_draft,
+)
 from accounting.services.payment_service import post_payment
+from accounting.services.report_service import invalidate_depreciation_forecast
+from accounting.services.search_service import SEARCH_MAX_LIMIT, search_ids
 
 from ..serializers import (
+    RELATED_OBJECTS_CONTEXT_KEY,
+    collect_related_objects,
     AccountGroupTemplateSerializer,
     AccountTemplateSerializer,
     ApplyChartTemplateSerializer,
+    CloneCompanySerializer,
     CreateDebitNoteSerializer,
     JournalEntryLineSerializer,
     JournalEntrySerializer,
@@ -149,6 +184,64 @@ def _handle_validation(exc: DjangoValidationError) -> Response:
     return Response(payload, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _validation_detail(exc: DjangoValidationError):
+    return exc.message_dict if hasattr(exc, "message_dict") else exc.messages
+
+
+def _split_many_to_many(model, validated_data: dict) -> tuple[dict, dict]:
+    relations = model_meta.get_field_info(model).relations
+    many_to_many = {
+        name: validated_data[name]
+        for name in list(validated_data)
+        if name in relations and relations[name].to_many
+    }
+    values = {name: value for name, value in validated_data.items() if name not in many_to_many}
+    return values, many_to_many
+
+
+def cleans_after_write(model) -> bool:
+    """Whether ``model.clean()`` must run again once the row and its relations exist.
+
+    Models with many-to-many fields check those relations (and need a pk
+    to read them) in ``clean()``, e.g. ``UserCompanyAccess``.
+    """
+    return bool(model._meta.many_to_many)
+
+
+def save_validated(serializer, **kwargs):
+    """Create the serializer's instance with ``full_clean()`` before one single write.
+
+    Models that clean after the write (see ``cleans_after_write``) are
+    cleaned again once saved, and serializers with their own ``create()``
+    only then; both inside a transaction, so a failing ``full_clean()``
+    leaves nothing behind.
+    """
+    if type(serializer).create is not serializers.ModelSerializer.create:
+        with transaction.atomic():
+            instance = serializer.save(**kwargs)
+            try:
+                instance.full_clean()
+            except DjangoValidationError as exc:
+                raise DRFValidationError(_validation_detail(exc))
+        return instance
+
+    model = serializer.Meta.model
+    values, many_to_many = _split_many_to_many(model, {**serializer.validated_data, **kwargs})
+    instance = model(**values)
+    try:
+        instance.full_clean()
+        with transaction.atomic():
+            instance.save()
+            for name, value in many_to_many.items():
+                getattr(instance, name).set(value)
+            if cleans_after_write(model):
+                instance.full_clean()
+    except DjangoValidationError as exc:
+        raise DRFValidationError(_validation_detail(exc))
+    serializer.instance = instance
+    return instance
+
+
 def get_company_ids_from_request(request, required=False):
     raw_ids = []
     company_ids_raw = request.query_params.getlist("company_ids")
@@ -181,17 +274,529 @@ def get_company_ids_from_request(request, required=False):
 def apply_company_filter(queryset, request, field_lookup="company_id"):
     company_ids = get_company_ids_from_request(request, required=False)
     if not company_ids and getattr(request, "user", None) and request.user.is_authenticated:
-        access = UserCompanyAccess.objects.filter(user_id=request.user.id).first()
-        if access:
-            company_ids = list(access.active_companies.values_list("id", flat=True))
-            if not company_ids:
-                company_ids = list(access.allowed_companies.values_list("id", flat=True))
+        company_ids = get_company_access(request).default_company_ids
     if not company_ids:
         return queryset
     return queryset.filter(**{f"{field_lookup}__in": company_ids})
 
 
-class BaseModelViewSet(viewsets.ModelViewSet):
+class RelatedNamesQuerysetMixin:
+    """Join/prefetch the relations ``NameAwareModelSerializer`` labels in ``*_name`` keys."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if not isinstance(queryset, QuerySet) or not hasattr(serializer_class, "get_related_lookups"):
+            return queryset
+        if queryset.model is not getattr(serializer_class.Meta, "model", None):
+            return queryset
+        sparse_fields = None
+        request = getattr(self, "request", None)
+        if request is not None and request.method == "GET":
+            sparse_fields = serializer_class.parse_sparse_fields(request)
+        select_related, prefetch_related = serializer_class.get_related_lookups(sparse_fields)
+        if select_related and queryset.query.select_related is not True:
+            queryset = queryset.select_related(*select_related)
+        prefetched = {getattr(lookup, "prefetch_to", lookup) for lookup in queryset._prefetch_related_lookups}
+        missing = [name for name in prefetch_related if name not in prefetched]
+        if missing:
+            queryset = queryset.prefetch_related(*missing)
+        return queryset
+
+
+def _has_updated_at(model) -> bool:
+    try:
+        model._meta.get_field("updated_at")
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def get_queryset_validators(queryset, serializer_class=None, related=()):
+    """Return ``(count, last_modified)`` for ``queryset`` in one aggregate query.
+
+    ``last_modified`` also covers the related rows the serializer labels in
+    ``*_name`` keys, so renaming a journal changes the validator of the
+    accounts that show it. ``related`` names reverse relations whose rows
+    feed annotations (move lines behind a balance): their latest
+    ``updated_at`` counts too, and ``count`` becomes a tuple with their
+    row counts so a deleted line changes it.
+    """
+    aggregates = {"validator_count": Count("pk", distinct=True)}
+    for name in related:
+        aggregates[f"validator_count_{name}"] = Count(name, distinct=True)
+    if _has_updated_at(queryset.model):
+        aggregates["validator_updated"] = Max("updated_at")
+    if hasattr(serializer_class, "get_related_lookups"):
+        select_related, prefetch_related = serializer_class.get_related_lookups()
+        for index, name in enumerate(select_related + prefetch_related):
+            if _has_updated_at(queryset.model._meta.get_field(name).related_model):
+                aggregates[f"validator_updated_{index}"] = Max(f"{name}__updated_at")
+    for name in related:
+        aggregates[f"validator_updated_{name}"] = Max(f"{name}__updated_at")
+    values = queryset.order_by().aggregate(**aggregates)
+    count = values.pop("validator_count")
+    if related:
+        count = (count, *(values.pop(f"validator_count_{name}") for name in related))
+    last_modified = max((value for value in values.values() if value is not None), default=None)
+    return count, last_modified
+
+
+def conditional_get_response(request, key_parts, last_modified):
+    """Return ``(not_modified_response, headers)`` for a GET with the given validators.
+
+    ``not_modified_response`` is a 304 when the client's ``If-None-Match`` /
+    ``If-Modified-Since`` still match, otherwise ``None`` and ``headers`` must
+    be set on the full response.
+    """
+    user_id = getattr(getattr(request, "user", None), "id", None)
+    raw = "|".join(str(part) for part in (request.get_full_path(), user_id, *key_parts, last_modified))
+    headers = {"ETag": quote_etag(hashlib.sha1(raw.encode("utf-8")).hexdigest())}
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    if timestamp is not None:
+        headers["Last-Modified"] = http_date(timestamp)
+    response = get_conditional_response(
+        getattr(request, "_request", request), etag=headers["ETag"], last_modified=timestamp
+    )
+    if response is not None:
+        for name, value in headers.items():
+            response[name] = value
+    return response, headers
+
+
+class LookupViewMixin:
+    """``?view=lookup``: id/code/name rows straight from ``values_list()``.
+
+    Meant for dropdowns and autocomplete: no model instances, no serializer.
+    ``?fields=`` picks other concrete columns and ``?limit=`` caps the rows;
+    every response stops at ``lookup_view_max_limit`` rows.
+    """
+
+    lookup_view_fields = ("id", "code", "name")
+    lookup_view_max_limit = 1000
+
+    def _lookup_view_columns(self, request, model):
+        concrete = {field.attname: field.attname for field in model._meta.concrete_fields}
+        concrete.update({field.name: field.attname for field in model._meta.concrete_fields})
+        requested = request.query_params.get("fields")
+        if not requested:
+            return [concrete[name] for name in self.lookup_view_fields if name in concrete]
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in concrete]
+        if unknown:
+            raise DRFValidationError({"fields": f"Unknown field(s): {', '.join(unknown)}."})
+        return [concrete[name] for name in names]
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get("view") != "lookup":
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        columns = self._lookup_view_columns(request, queryset.model)
+        queryset = queryset.values_list(*columns)
+        limit = request.query_params.get("limit")
+        if limit in (None, ""):
+            limit = self.lookup_view_max_limit
+        else:
+            try:
+                limit = int(limit)
+            except (TypeError, ValueError) as exc:
+                raise DRFValidationError({"limit": "Must be an integer."}) from exc
+            if limit <= 0:
+                raise DRFValidationError({"limit": "Must be greater than 0."})
+        queryset = queryset[: min(limit, self.lookup_view_max_limit)]
+        rows = [dict(zip(columns, values)) for values in queryset]
+        return Response(rows, status=status.HTTP_200_OK)
+
+
+class ConditionalGetMixin:
+    """ETag/Last-Modified on list and retrieve, answered from an aggregate query.
+
+    Unchanged data returns 304 before any row is serialized. Lists of
+    views with ``conditional_list = False`` (keyset-paginated large tables)
+    skip it because the aggregate would scan the whole filtered table.
+    ``conditional_related`` lists the reverse relations behind annotated
+    values (``lines`` for a move balance), so editing a line changes the
+    validators of its move.
+    """
+
+    conditional_list = True
+    conditional_related = ()
+
+    def _conditional_get(self, request, queryset, handler, *args, **kwargs):
+        count, last_modified = get_queryset_validators(
+            queryset, self.get_serializer_class(), related=self.conditional_related
+        )
+        not_modified, headers = conditional_get_response(request, (type(self).__name__, count), last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for name, value in headers.items():
+                response[name] = value
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if not self.conditional_list or str(request.query_params.get("stream", "")).lower() in {"1", "true", "yes"}:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional_get(request, queryset, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            # Malformed lookup value: let the regular retrieve answer 404.
+            return super().retrieve(request, *args, **kwargs)
+        return self._conditional_get(request, queryset, super().retrieve, *args, **kwargs)
+
+
+class KeysetListMixin:
+    """Keyset pagination by default and ``?stream=1`` JSON lines for large tables.
+
+    Streaming walks the filtered queryset in keyset chunks, so memory stays
+    bounded by ``stream_chunk_size`` rows whatever the table size.
+    """
+
+    pagination_class = KeysetListPagination
+    stream_chunk_size = 2000
+    conditional_list = False
+
+    def list(self, request, *args, **kwargs):
+        if str(request.query_params.get("stream", "")).lower() not in {"1", "true", "yes"}:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(self._stream_lines(queryset), content_type="application/x-ndjson")
+
+    def _stream_lines(self, queryset):
+        for chunk in iter_keyset_chunks(queryset, self.stream_chunk_size):
+            for record in self.get_serializer(chunk, many=True).data:
+                yield json.dumps(record, cls=JSONEncoder) + "\n"
+
+
+class SearchMixin:
+    """``GET <list>/search/?q=`` ranked word-prefix search over ``search_source``.
+
+    Every term must prefix-match a word of one of the source's fields. Rows
+    come back best match first as ``search_fields`` values, restricted to the
+    view's queryset (and so to the requested or default companies).
+    """
+
+    search_source = ""
+    search_fields: tuple[str, ...] = ()
+    search_default_limit = 20
+
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        query = request.query_params.get("q", "")
+        try:
+            limit = int(request.query_params.get("limit", self.search_default_limit))
+        except (TypeError, ValueError) as exc:
+            raise DRFValidationError({"limit": "Must be an integer."}) from exc
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+        company_ids = get_company_ids_from_request(request)
+        if not company_ids and request.user.is_authenticated:
+            company_ids = get_company_access(request).default_company_ids
+        ids = search_ids(self.search_source, query, company_ids=company_ids, limit=limit)
+        if not ids:
+            return Response({"query": query, "results": []})
+        rows = {row["id"]: row for row in self.get_queryset().filter(id__in=ids).values(*self.search_fields)}
+        return Response({"query": query, "results": [rows[pk] for pk in ids if pk in rows]})
+
+
+def _uses_plain_save(model) -> bool:
+    return model.save is models.Model.save and not (pre_save.has_listeners(model) or post_save.has_listeners(model))
+
+
+def _without_unique_validators(serializer) -> None:
+    # Uniqueness is checked once for the whole batch by ``_bulk_unique_errors``
+    # instead of one query per row and constraint.
+    serializer.validators = [
+        validator for validator in serializer.get_validators() if not isinstance(validator, UniqueTogetherValidator)
+    ]
+    for field in serializer.fields.values():
+        field.validators = [validator for validator in field.validators if not isinstance(validator, UniqueValidator)]
+
+
+_UNIQUE_CHECK_CHUNK = 200
+
+
+def _unique_field_sets(model) -> list[tuple]:
+    field_sets = [(field,) for field in model._meta.concrete_fields if field.unique and not field.primary_key]
+    names = [tuple(together) for together in model._meta.unique_together]
+    names += [tuple(constraint.fields) for constraint in model._meta.total_unique_constraints]
+    field_sets += [tuple(model._meta.get_field(name) for name in together) for together in names]
+    return field_sets
+
+
+def _bulk_unique_errors(model, pending: list[tuple]) -> list[dict]:
+    """Per-row uniqueness errors for ``(index, instance)`` pairs, in one query per constraint."""
+    errors = {}
+    for fields in _unique_field_sets(model):
+        attnames = [field.attname for field in fields]
+        if len(fields) == 1:
+            message = {fields[0].name: [f"{model._meta.verbose_name} with this {fields[0].verbose_name} already exists."]}
+        else:
+            message = {"non_field_errors": [f"The fields {', '.join(field.name for field in fields)} must make a unique set."]}
+        keyed = []
+        seen = set()
+        for index, instance in pending:
+            key = tuple(getattr(instance, attname) for attname in attnames)
+            if any(value is None for value in key):
+                continue
+            if key in seen:
+                errors.setdefault(index, message)
+            seen.add(key)
+            keyed.append((index, instance, key))
+        if not keyed:
+            continue
+        existing = {}
+        keys = list(seen)
+        for start in range(0, len(keys), _UNIQUE_CHECK_CHUNK):
+            chunk = keys[start : start + _UNIQUE_CHECK_CHUNK]
+            if len(attnames) == 1:
+                condition = Q(**{f"{attnames[0]}__in": [key[0] for key in chunk]})
+            else:
+                condition = Q(pk__in=[])
+                for key in chunk:
+                    condition |= Q(**dict(zip(attnames, key)))
+            for row in model._base_manager.filter(condition).values_list("pk", *attnames):
+                existing[tuple(row[1:])] = row[0]
+        for index, instance, key in keyed:
+            if key in existing and existing[key] != instance.pk:
+                errors.setdefault(index, message)
+    return [{"index": index, "errors": errors[index]} for index in sorted(errors)]
+
+
+def _uses_plain_delete(model) -> bool:
+    return model.delete is models.Model.delete and not (
+        pre_delete.has_listeners(model) or post_delete.has_listeners(model)
+    )
+
+
+class BulkModelMixin:
+    """``bulk-create``, ``bulk-update`` and ``bulk-delete`` list actions.
+
+    Rows are validated by the view serializer with every referenced object
+    loaded once per related model, then written in one transaction with
+    ``bulk_create``/``bulk_update`` (or ``save()`` per row for models with a
+    custom ``save()`` or save signals). Nothing is written when a row fails.
+    Views that customize ``perform_create``/``perform_update``/
+    ``perform_destroy`` keep those rules single-object: the matching bulk
+    action answers 405.
+    """
+
+    bulk_max_items = 5000
+    bulk_batch_size = 500
+
+    def perform_create(self, serializer):
+        save_validated(serializer)
+
+    def _check_bulk_hook(self, hook: str, default) -> None:
+        if getattr(type(self), hook) is not default:
+            raise MethodNotAllowed(self.request.method, detail="Bulk writes are not available on this endpoint.")
+
+    def _bulk_rows(self, request, key: str) -> list:
+        rows = request.data if isinstance(request.data, list) else request.data.get(key)
+        if not isinstance(rows, list) or not rows:
+            raise DRFValidationError({key: "Provide a non-empty list."})
+        if len(rows) > self.bulk_max_items:
+            raise DRFValidationError({key: f"At most {self.bulk_max_items} items per request."})
+        return rows
+
+    def _bulk_serializer_context(self, rows) -> dict:
+        context = self.get_serializer_context()
+        context[RELATED_OBJECTS_CONTEXT_KEY] = collect_related_objects(self.get_serializer_class()(context=context), rows)
+        return context
+
+    @staticmethod
+    def _clean_instance(instance) -> None:
+        # Foreign keys were resolved from the database already and uniqueness
+        # was checked by the serializer validators.
+        relation_names = [field.name for field in instance._meta.concrete_fields if field.is_relation]
+        instance.full_clean(exclude=relation_names, validate_unique=False, validate_constraints=False)
+
+    @staticmethod
+    def _clean_written(items) -> list:
+        """Run ``clean()`` again on saved ``(index, instance)`` pairs; return per-row errors."""
+        errors = []
+        for index, instance in items:
+            try:
+                instance.clean()
+            except DjangoValidationError as exc:
+                errors.append({"index": index, "errors": _validation_detail(exc)})
+        return errors
+
+    @action(detail=False, methods=["post"], url_path="bulk-create")
+    def bulk_create(self, request):
+        self._check_bulk_hook("perform_create", BulkModelMixin.perform_create)
+        rows = self._bulk_rows(request, "items")
+        serializer_class = self.get_serializer_class()
+        model = serializer_class.Meta.model
+        serializer = serializer_class(context=self._bulk_serializer_context(rows))
+        _without_unique_validators(serializer)
+        clean_after = cleans_after_write(model)
+
+        results = []
+        pending = []
+        for index, row in enumerate(rows):
+            try:
+                validated = serializer.run_validation(row)
+            except serializers.ValidationError as exc:
+                results.append({"index": index, "errors": exc.detail})
+                continue
+            values, many_to_many = _split_many_to_many(model, validated)
+            instance = model(**values)
+            try:
+                self._clean_instance(instance)
+            except DjangoValidationError as exc:
+                results.append({"index": index, "errors": _validation_detail(exc)})
+                continue
+            pending.append((index, instance, many_to_many))
+        results += _bulk_unique_errors(model, [(index, instance) for index, instance, _ in pending])
+        if results:
+            results.sort(key=lambda item: item["index"])
+            return Response({"created": 0, "results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                instances = [instance for _, instance, _ in pending]
+                if _uses_plain_save(model):
+                    model._default_manager.bulk_create(instances, batch_size=self.bulk_batch_size)
+                else:
+                    for instance in instances:
+                        instance.save()
+                for _, instance, many_to_many in pending:
+                    for name, value in many_to_many.items():
+                        getattr(instance, name).set(value)
+                if clean_after:
+                    results = self._clean_written([(index, instance) for index, instance, _ in pending])
+                    if results:
+                        transaction.set_rollback(True)
+        except IntegrityError as exc:
+            return Response({"created": 0, "detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if results:
+            return Response({"created": 0, "results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [{"index": index, "id": instance.pk} for index, instance, _ in pending]
+        return Response({"created": len(results), "results": results}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["patch"], url_path="bulk-update")
+    def bulk_update(self, request):
+        self._check_bulk_hook("perform_update", mixins.UpdateModelMixin.perform_update)
+        rows = self._bulk_rows(request, "items")
+        serializer_class = self.get_serializer_class()
+        model = serializer_class.Meta.model
+        pk_field = model._meta.pk
+        ids = []
+        for row in rows:
+            try:
+                ids.append(pk_field.to_python(row.get("id")) if isinstance(row, dict) else None)
+            except DjangoValidationError:
+                ids.append(None)
+        instances = self.get_queryset().in_bulk([pk for pk in ids if pk is not None])
+        serializer = serializer_class(partial=True, context=self._bulk_serializer_context(rows))
+        _without_unique_validators(serializer)
+        clean_after = cleans_after_write(model)
+
+        results = []
+        pending = []
+        for index, (row, pk) in enumerate(zip(rows, ids)):
+            instance = instances.get(pk)
+            if instance is None:
+                results.append({"index": index, "errors": {"id": "Not found."}})
+                continue
+            serializer.instance = instance
+            try:
+                validated = serializer.run_validation({key: value for key, value in row.items() if key != "id"})
+            except serializers.ValidationError as exc:
+                results.append({"index": index, "errors": exc.detail})
+                continue
+            values, many_to_many = _split_many_to_many(model, validated)
+            for name, value in values.items():
+                setattr(instance, name, value)
+            try:
+                self._clean_instance(instance)
+            except DjangoValidationError as exc:
+                results.append({"index": index, "errors": _validation_detail(exc)})
+                continue
+            pending.append((index, instance, values, many_to_many))
+        results += _bulk_unique_errors(model, [(index, instance) for index, instance, _, _ in pending])
+        if results:
+            results.sort(key=lambda item: item["index"])
+            return Response({"updated": 0, "results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                if _uses_plain_save(model):
+                    fields = {model._meta.get_field(name).name for _, _, values, _ in pending for name in values}
+                    if fields:
+                        if any(field.name == "updated_at" for field in model._meta.concrete_fields):
+                            now = timezone.now()
+                            for _, instance, _, _ in pending:
+                                instance.updated_at = now
+                            fields.add("updated_at")
+                        model._default_manager.bulk_update(
+                            [instance for _, instance, _, _ in pending], sorted(fields), batch_size=self.bulk_batch_size
+                        )
+                else:
+                    for _, instance, _, _ in pending:
+                        instance.save()
+                for _, instance, _, many_to_many in pending:
+                    for name, value in many_to_many.items():
+                        getattr(instance, name).set(value)
+                if clean_after:
+                    results = self._clean_written([(index, instance) for index, instance, _, _ in pending])
+                    if results:
+                        transaction.set_rollback(True)
+        except IntegrityError as exc:
+            return Response({"updated": 0, "detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if results:
+            return Response({"updated": 0, "results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [{"index": index, "id": instance.pk} for index, instance, _, _ in pending]
+        return Response({"updated": len(results), "results": results}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"], url_path="bulk-delete")
+    def bulk_delete(self, request):
+        self._check_bulk_hook("perform_destroy", mixins.DestroyModelMixin.perform_destroy)
+        raw_ids = self._bulk_rows(request, "ids")
+        model = self.get_queryset().model
+        pk_field = model._meta.pk
+        results = []
+        ids = []
+        for index, raw in enumerate(raw_ids):
+            try:
+                ids.append(pk_field.to_python(raw))
+            except DjangoValidationError:
+                results.append({"index": index, "errors": {"id": "Invalid id."}})
+                ids.append(None)
+        found = set(self.get_queryset().filter(pk__in=[pk for pk in ids if pk is not None]).values_list("pk", flat=True))
+        for index, pk in enumerate(ids):
+            if pk is not None and pk not in found:
+                results.append({"index": index, "errors": {"id": "Not found."}})
+        if results:
+            results.sort(key=lambda item: item["index"])
+            return Response({"deleted": 0, "results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                if _uses_plain_delete(model):
+                    model._default_manager.filter(pk__in=found).delete()
+                else:
+                    for instance in model._default_manager.filter(pk__in=found):
+                        instance.delete()
+        except (ProtectedError, RestrictedError) as exc:
+            return Response({"deleted": 0, "detail": str(exc.args[0])}, status=status.HTTP_400_BAD_REQUEST)
+        results = [{"index": index, "id": pk} for index, pk in enumerate(ids)]
+        return Response({"deleted": len(found), "results": results}, status=status.HTTP_200_OK)
+
+
+class BaseModelViewSet(
+    BulkModelMixin, ConditionalGetMixin, LookupViewMixin, RelatedNamesQuerysetMixin, viewsets.ModelViewSet
+):
     pagination_class = StandardListPagination
     filter_backends = [filters.OrderingFilter]
     ordering_fields = "__all__"
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AccountingConfig(AppConfig):
     name = 'accounting'
+
+    def ready(self):
+        from accounting import checks, signals  # noqa: F401
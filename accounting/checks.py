@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PER_PROCESS_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """``ACCOUNTING_SHARED_CACHE = True`` must name a cache every worker reads."""
+    if not getattr(settings, "ACCOUNTING_SHARED_CACHE", False):
+        return []
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "django.core.cache.backends.locmem.LocMemCache")
+    if backend not in PER_PROCESS_CACHE_BACKENDS:
+        return []
+    return [
+        Warning(
+            "ACCOUNTING_SHARED_CACHE is set but the default cache is local to each process.",
+            hint=(
+                "Invalidations of company access, session info, analytic distribution matchers "
+                "and depreciation forecasts only reach the process that made the change; other "
+                "workers keep serving revoked access until the entries expire. Configure Redis "
+                "or Memcached in CACHES['default'], or unset ACCOUNTING_SHARED_CACHE."
+            ),
+            id="accounting.W001",
+        )
+    ]
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounting.models import MoveLine, MoveLineAnalyticDistribution
+
+
+class Command(BaseCommand):
+    help = "Rebuild the normalized analytic distribution table from MoveLine.analytic_distribution."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, help="Only backfill journal items of this company id.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of journal items synced per batch.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Run the backfill and report totals without committing database changes.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be greater than zero.")
+        dry_run = options["dry_run"]
+
+        queryset = MoveLine.objects.exclude(analytic_distribution={}).only("id", "analytic_distribution")
+        if options["company"]:
+            queryset = queryset.filter(move__company_id=options["company"])
+
+        self.stdout.write(self.style.NOTICE("Backfilling normalized analytic distributions."))
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Running in dry-run mode. No data will be committed."))
+
+        summary = {"lines": 0, "entries": 0}
+        try:
+            with transaction.atomic():
+                last_id = 0
+                while True:
+                    batch = list(queryset.filter(id__gt=last_id).order_by("id")[:batch_size])
+                    if not batch:
+                        break
+                    last_id = batch[-1].id
+                    summary["lines"] += len(batch)
+                    summary["entries"] += MoveLineAnalyticDistribution.sync_for_lines(batch)
+
+                if dry_run:
+                    raise _DryRunRollback()
+        except _DryRunRollback:
+            pass
+
+        self._print_summary(summary, dry_run)
+
+    def _print_summary(self, summary, dry_run: bool):
+        mode = "DRY RUN" if dry_run else "COMMITTED"
+        self.stdout.write(self.style.SUCCESS(f"Analytic distribution backfill finished ({mode})."))
+        self.stdout.write(f"- distributions: move_lines={summary['lines']} entries={summary['entries']}")
+
+
+class _DryRunRollback(Exception):
+    """Internal exception used to rollback transaction in dry-run mode."""
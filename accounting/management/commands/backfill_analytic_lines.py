@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from accounting.models import MoveLine
+from accounting.services.analytic_service import generate_analytic_lines
+
+
+class Command(BaseCommand):
+    help = "Create missing analytic lines for posted journal items carrying an analytic account or distribution."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, help="Only backfill journal items of this company id.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of journal items expanded and written per batch.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Run the backfill and report totals without committing database changes.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be greater than zero.")
+        dry_run = options["dry_run"]
+
+        queryset = (
+            MoveLine.objects.filter(move__state="posted", analytic_lines__isnull=True)
+            .filter(Q(analytic_account__isnull=False) | ~Q(analytic_distribution={}))
+            .select_related("move")
+        )
+        if options["company"]:
+            queryset = queryset.filter(move__company_id=options["company"])
+
+        self.stdout.write(self.style.NOTICE("Backfilling analytic lines for posted journal items."))
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Running in dry-run mode. No data will be committed."))
+
+        summary = {"move_lines": 0, "created": 0, "errors": {}}
+        try:
+            with transaction.atomic():
+                last_id = 0
+                while True:
+                    batch = list(queryset.filter(id__gt=last_id).order_by("id")[:batch_size])
+                    if not batch:
+                        break
+                    last_id = batch[-1].id
+                    stats = generate_analytic_lines(batch, replace=False, batch_size=batch_size)
+                    summary["move_lines"] += stats["move_lines"]
+                    summary["created"] += stats["created"]
+                    summary["errors"].update(stats["errors"])
+
+                if dry_run:
+                    raise _DryRunRollback()
+        except _DryRunRollback:
+            pass
+
+        self._print_summary(summary, dry_run)
+
+    def _print_summary(self, summary, dry_run: bool):
+        mode = "DRY RUN" if dry_run else "COMMITTED"
+        self.stdout.write(self.style.SUCCESS(f"Analytic line backfill finished ({mode})."))
+        self.stdout.write(
+            f"- analytic lines: move_lines={summary['move_lines']} created={summary['created']} "
+            f"skipped={len(summary['errors'])}"
+        )
+        for line_id, messages in summary["errors"].items():
+            self.stderr.write(self.style.WARNING(f"- move line {line_id}: {'; '.join(messages)}"))
+
+
+class _DryRunRollback(Exception):
+    """Internal exception used to rollback transaction in dry-run mode."""
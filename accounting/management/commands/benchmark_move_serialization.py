@@ -0,0 +1,126 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from accounting.api.serializers import MoveSerializer
+from accounting.models import Account, Company, Currency, Journal, Move, MoveLine, Partner
+
+
+class Command(BaseCommand):
+    help = (
+        "Create temporary journal entries and compare serializing them with and without the "
+        "select_related/prefetch_related plan of MoveSerializer. All data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=10000, help="Number of journal entries to serialize.")
+        parser.add_argument(
+            "--lines",
+            type=int,
+            default=2,
+            help="Journal items created per entry (they feed the balance column).",
+        )
+        parser.add_argument(
+            "--skip-naive",
+            action="store_true",
+            help="Only run the planned queryset (the naive run issues several queries per entry).",
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        if count <= 0:
+            raise CommandError("--count must be greater than zero.")
+        lines_per_move = max(options["lines"], 0)
+
+        self.stdout.write(self.style.NOTICE(f"Benchmarking MoveSerializer on {count} journal entries."))
+        results = []
+        try:
+            with transaction.atomic():
+                move_ids = self._create_fixtures(count, lines_per_move)
+                base = Move.objects.filter(id__in=move_ids).order_by("id")
+                if not options["skip_naive"]:
+                    results.append(("naive", self._measure(base)))
+                select_related, prefetch_related = MoveSerializer.get_related_lookups()
+                planned = base.with_balance().select_related(*select_related).prefetch_related(*prefetch_related)
+                results.append(("planned", self._measure(planned)))
+                raise _BenchmarkRollback()
+        except _BenchmarkRollback:
+            pass
+
+        self._print_summary(results)
+
+    def _create_fixtures(self, count: int, lines_per_move: int) -> list[int]:
+        currency, _ = Currency.objects.get_or_create(code="BMK", defaults={"name": "Benchmark"})
+        company = Company.objects.create(code="BENCHMARK", name="Serialization benchmark")
+        journal = Journal.objects.create(
+            company=company, code="BMK", name="Benchmark", journal_type="general", currency=currency
+        )
+        accounts = [
+            Account.objects.create(company=company, code=code, name=f"Benchmark {code}", account_type=account_type)
+            for code, account_type in (("BMK1", "asset"), ("BMK2", "income"))
+        ]
+        partner = Partner.objects.create(company=company, name="Benchmark partner")
+
+        start = date.today()
+        moves = Move.objects.bulk_create(
+            [
+                Move(
+                    company=company,
+                    journal=journal,
+                    currency=currency,
+                    partner=partner if index % 2 else None,
+                    name=f"BMK/{index:06d}",
+                    date=start - timedelta(days=index % 365),
+                )
+                for index in range(count)
+            ],
+            batch_size=2000,
+        )
+        lines = []
+        for move in moves:
+            for line_index in range(lines_per_move):
+                debit = Decimal("10") if line_index % 2 == 0 else Decimal("0")
+                lines.append(
+                    MoveLine(
+                        move=move,
+                        account=accounts[line_index % 2],
+                        name=move.name,
+                        date=move.date,
+                        debit=debit,
+                        credit=Decimal("10") - debit,
+                    )
+                )
+        MoveLine.objects.bulk_create(lines, batch_size=5000)
+        return [move.id for move in moves]
+
+    def _measure(self, queryset) -> dict:
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            started = time.perf_counter()
+            data = MoveSerializer(list(queryset), many=True).data
+            elapsed = time.perf_counter() - started
+        return {"rows": len(data), "seconds": elapsed, "queries": queries}
+
+    def _print_summary(self, results):
+        self.stdout.write(self.style.SUCCESS("Serialization benchmark finished (ROLLED BACK)."))
+        for label, stats in results:
+            per_instance_us = stats["seconds"] / max(stats["rows"], 1) * 1_000_000
+            self.stdout.write(
+                f"- {label}: rows={stats['rows']} queries={stats['queries']} "
+                f"total={stats['seconds']:.3f}s per_instance={per_instance_us:.1f}us"
+            )
+        plan = MoveSerializer.get_representation_plan()
+        self.stdout.write(f"- plan: {', '.join(entry[0] for entry in plan)}")
+
+
+class _BenchmarkRollback(Exception):
+    """Internal exception used to discard the benchmark fixtures."""
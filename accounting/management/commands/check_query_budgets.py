@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from accounting.models import Company
+from accounting.query_budgets import DEFAULT_QUERY_BUDGET, check_query_budgets
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every argument-free GET endpoint of the API against the current (seeded) data and "
+        "fail when one issues more queries than its budget. Changes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="User to authenticate as (default: first superuser).")
+        parser.add_argument("--company-id", type=int, help="Company passed as company_id (default: first company).")
+        parser.add_argument("--default-budget", type=int, default=DEFAULT_QUERY_BUDGET)
+
+    def handle(self, *args, **options):
+        user_model = get_user_model()
+        if options.get("username"):
+            user = user_model.objects.filter(username=options["username"]).first()
+        else:
+            user = user_model.objects.filter(is_superuser=True).order_by("id").first()
+        if user is None:
+            raise CommandError("No user to authenticate as. Pass --username or create a superuser.")
+        company_id = options.get("company_id") or Company.objects.order_by("id").values_list("id", flat=True).first()
+        if company_id is None:
+            raise CommandError("No company found. Seed data first (e.g. import_localization_data).")
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        try:
+            with transaction.atomic():
+                results = check_query_budgets(
+                    client,
+                    params={"company_id": company_id},
+                    default_budget=options["default_budget"],
+                )
+                raise _BudgetRollback()
+        except _BudgetRollback:
+            pass
+
+        failures = [result for result in results if result.over_budget or result.status_code >= 500]
+        self._print_summary(results, failures)
+        if failures:
+            raise CommandError(f"{len(failures)} route(s) over their query budget.")
+
+    def _print_summary(self, results, failures):
+        self.stdout.write(self.style.SUCCESS(f"Checked {len(results)} routes (ROLLED BACK)."))
+        for result in sorted(results, key=lambda item: item.queries, reverse=True):
+            marker = "OVER" if result in failures else "ok"
+            self.stdout.write(
+                f"- {result.route}: queries={result.queries} budget={result.budget} "
+                f"status={result.status_code} {marker}"
+            )
+
+
+class _BudgetRollback(Exception):
+    """Internal exception used to discard writes made by the checked endpoints."""
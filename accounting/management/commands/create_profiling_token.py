@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from accounting.services.profiling_service import PROFILE_TOKEN_MAX_AGE, make_profiling_token
+
+
+class Command(BaseCommand):
+    help = "Print a signed X-Profile header value that turns on request profiling for one hour."
+
+    def handle(self, *args, **options):
+        token = make_profiling_token()
+        self.stdout.write(token)
+        self.stderr.write(f"Send it as 'X-Profile: <token>'; it expires in {PROFILE_TOKEN_MAX_AGE // 60} minutes.")
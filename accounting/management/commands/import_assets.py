@@ -0,0 +1,90 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounting.models import Company
+from accounting.services.asset_import_service import ASSET_IMPORT_COLUMNS, import_assets, read_asset_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import assets of a company from a CSV or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON file with one asset per row/object.")
+        parser.add_argument("--company", type=int, required=True, help="Company id the assets are imported into.")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "json"],
+            help="Input format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--generate-boards",
+            action="store_true",
+            help="Generate depreciation boards for the imported assets in the same batch.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of rows validated and inserted per chunk.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate and simulate import without committing database changes.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"]).resolve()
+        if not path.exists() or not path.is_file():
+            raise CommandError(f"Invalid path: {path}")
+        company = Company.objects.filter(id=options["company"]).first()
+        if not company:
+            raise CommandError(f"Company not found: {options['company']}")
+        chunk_size = options["chunk_size"]
+        if chunk_size <= 0:
+            raise CommandError("--chunk-size must be greater than zero.")
+        fmt = options["format"] or path.suffix.lstrip(".").lower()
+        if fmt not in {"csv", "json"}:
+            raise CommandError("Cannot infer format from file extension; pass --format csv|json.")
+        dry_run = options["dry_run"]
+
+        self.stdout.write(self.style.NOTICE(f"Importing assets for company {company} from: {path}"))
+        self.stdout.write(f"- columns: {', '.join(ASSET_IMPORT_COLUMNS)}")
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Running in dry-run mode. No data will be committed."))
+
+        try:
+            with transaction.atomic(), path.open("r", encoding="utf-8-sig", newline="") as stream:
+                summary = import_assets(
+                    company=company,
+                    rows=read_asset_rows(stream, fmt),
+                    generate_boards=options["generate_boards"],
+                    chunk_size=chunk_size,
+                )
+                if dry_run:
+                    raise _DryRunRollback()
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        except _DryRunRollback:
+            pass
+
+        self._print_summary(summary, dry_run)
+
+    def _print_summary(self, summary, dry_run: bool):
+        mode = "DRY RUN" if dry_run else "COMMITTED"
+        self.stdout.write(self.style.SUCCESS(f"Asset import finished ({mode})."))
+        self.stdout.write(
+            f"- assets: rows={summary['rows']} created={summary['created']} failed={len(summary['errors'])}"
+        )
+        self.stdout.write(
+            f"- boards: assets={summary['boards']} created_lines={summary['depreciation_lines']}"
+        )
+        for item in summary["errors"]:
+            details = "; ".join(f"{field}: {message}" for field, message in item["errors"].items())
+            self.stderr.write(self.style.WARNING(f"- row {item['row']}: {details}"))
+
+
+class _DryRunRollback(Exception):
+    """Internal exception used to rollback transaction in dry-run mode."""
@@ -1,11 +1,14 @@
 import csv
 from pathlib import Path
 
+from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from accounting.models import AccountGroupTemplate, AccountTemplate, Country
 
+BULK_BATCH_SIZE = 1000
+
 
 class Command(BaseCommand):
     help = "Import chart template CSV data (account group templates and account templates)."
@@ -56,9 +59,6 @@ class Command(BaseCommand):
         self._print_summary(summary, dry_run)
 
     def _import_groups(self, path: Path):
-        created = 0
-        updated = 0
-
         rows = list(
             self._read_csv(
                 path,
@@ -74,7 +74,6 @@ class Command(BaseCommand):
         )
 
         countries = {country.code: country for country in Country.objects.all()}
-        template_by_key = {}
 
         pending = []
         for row_number, row in rows:
@@ -106,60 +105,102 @@ class Command(BaseCommand):
                 }
             )
 
+        # Resolve the tree in memory: each level only references parents
+        # from earlier levels, so a level is one bulk upsert.
+        levels = []
+        resolved = set()
         unresolved = pending
         while unresolved:
+            level = []
             next_unresolved = []
-            progressed = False
-
             for item in unresolved:
-                parent = None
                 if item["parent_start"] or item["parent_end"]:
                     if not (item["parent_start"] and item["parent_end"]):
                         raise CommandError(
                             f"account_group_templates.csv row {item['row_number']}: parent start/end must both be set or empty"
                         )
-                    parent_key = (
-                        item["country"].id,
-                        item["parent_start"],
-                        item["parent_end"],
-                    )
-                    parent = template_by_key.get(parent_key)
-                    if parent is None:
+                    if (item["country"].id, item["parent_start"], item["parent_end"]) not in resolved:
                         next_unresolved.append(item)
                         continue
+                level.append(item)
 
-                obj, was_created = AccountGroupTemplate.objects.update_or_create(
-                    country=item["country"],
-                    code_prefix_start=item["code_start"],
-                    code_prefix_end=item["code_end"],
-                    defaults={"name": item["name"], "parent": parent},
-                )
-                obj.full_clean()
-                template_by_key[(item["country"].id, item["code_start"], item["code_end"])] = obj
-                progressed = True
-
-                if was_created:
-                    created += 1
-                else:
-                    updated += 1
-
-            if not progressed:
+            if not level:
                 bad_rows = ", ".join(str(item["row_number"]) for item in next_unresolved)
                 raise CommandError(f"Could not resolve parent templates for rows: {bad_rows}")
 
+            resolved.update((item["country"].id, item["code_start"], item["code_end"]) for item in level)
+            levels.append(level)
             unresolved = next_unresolved
 
-        return {"created": created, "updated": updated, "skipped": 0}
+        existing = {
+            (country_id, start, end): (pk, (name, parent_id))
+            for pk, country_id, start, end, name, parent_id in AccountGroupTemplate.objects.values_list(
+                "id", "country_id", "code_prefix_start", "code_prefix_end", "name", "parent_id"
+            )
+        }
+        counts = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+        for level in levels:
+            to_write = {}
+            for item in level:
+                key = (item["country"].id, item["code_start"], item["code_end"])
+                parent_id = None
+                if item["parent_start"]:
+                    parent_id = existing[(item["country"].id, item["parent_start"], item["parent_end"])][0]
+                current = existing.get(key)
+                if current and current[1] == (item["name"], parent_id):
+                    counts["unchanged"] += 1
+                    continue
+                obj = AccountGroupTemplate(
+                    country=item["country"],
+                    code_prefix_start=item["code_start"],
+                    code_prefix_end=item["code_end"],
+                    name=item["name"],
+                    parent_id=parent_id,
+                )
+                self._clean_fields(obj, "account_group_templates.csv", item["row_number"], ["country", "parent"])
+                if key not in to_write:
+                    counts["updated" if current else "created"] += 1
+                to_write[key] = obj
+
+            written = AccountGroupTemplate.objects.bulk_create(
+                list(to_write.values()),
+                batch_size=BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["country", "code_prefix_start", "code_prefix_end"],
+                update_fields=["name", "parent", "updated_at"],
+            )
+            if any(obj.pk is None for obj in written):
+                existing.update(
+                    {
+                        (country_id, start, end): (pk, (name, parent_id))
+                        for pk, country_id, start, end, name, parent_id in AccountGroupTemplate.objects.values_list(
+                            "id", "country_id", "code_prefix_start", "code_prefix_end", "name", "parent_id"
+                        )
+                    }
+                )
+            else:
+                for key, obj in zip(to_write, written):
+                    existing[key] = (obj.pk, (obj.name, obj.parent_id))
+
+        return counts
 
     def _import_accounts(self, path: Path):
-        created = 0
-        updated = 0
+        counts = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
 
         countries = {country.code: country for country in Country.objects.all()}
-        groups = {
-            (group.country_id, group.code_prefix_start, group.code_prefix_end): group
-            for group in AccountGroupTemplate.objects.all()
+        group_ids = {
+            (country_id, start, end): pk
+            for pk, country_id, start, end in AccountGroupTemplate.objects.values_list(
+                "id", "country_id", "code_prefix_start", "code_prefix_end"
+            )
+        }
+        existing = {
+            (country_id, code): values
+            for country_id, code, *values in AccountTemplate.objects.values_list(
+                "country_id", "code", "group_id", "name", "account_type", "reconcile", "deprecated"
+            )
         }
+        to_write = {}
 
         for row_number, row in self._read_csv(
             path,
@@ -190,37 +231,54 @@ class Command(BaseCommand):
             if not code or not name or not account_type:
                 raise CommandError(f"account_templates.csv row {row_number}: code, name and account_type are required")
 
-            group = None
+            group_id = None
             if group_start or group_end:
                 if not (group_start and group_end):
                     raise CommandError(
                         f"account_templates.csv row {row_number}: group start/end must both be set or empty"
                     )
-                group = groups.get((country.id, group_start, group_end))
-                if not group:
+                group_id = group_ids.get((country.id, group_start, group_end))
+                if not group_id:
                     raise CommandError(
                         f"account_templates.csv row {row_number}: group ({group_start}-{group_end}) not found for {country.code}"
                     )
 
-            obj, was_created = AccountTemplate.objects.update_or_create(
+            key = (country.id, code)
+            current = existing.get(key)
+            if current is not None and current == [group_id, name, account_type, reconcile, deprecated]:
+                counts["unchanged"] += 1
+                continue
+            obj = AccountTemplate(
                 country=country,
                 code=code,
-                defaults={
-                    "group": group,
-                    "name": name,
-                    "account_type": account_type,
-                    "reconcile": reconcile,
-                    "deprecated": deprecated,
-                },
+                group_id=group_id,
+                name=name,
+                account_type=account_type,
+                reconcile=reconcile,
+                deprecated=deprecated,
             )
-            obj.full_clean()
-
-            if was_created:
-                created += 1
-            else:
-                updated += 1
+            self._clean_fields(obj, "account_templates.csv", row_number, ["country", "group"])
+            if key not in to_write:
+                counts["updated" if current is not None else "created"] += 1
+            to_write[key] = obj
+
+        AccountTemplate.objects.bulk_create(
+            list(to_write.values()),
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["country", "code"],
+            update_fields=["group", "name", "account_type", "reconcile", "deprecated", "updated_at"],
+        )
+        return counts
 
-        return {"created": created, "updated": updated, "skipped": 0}
+    @staticmethod
+    def _clean_fields(obj, label: str, row_number: int, exclude):
+        # Foreign keys come from lookup maps and uniqueness is enforced by the
+        # upsert, so only field-level checks remain.
+        try:
+            obj.clean_fields(exclude=exclude)
+        except ValidationError as exc:
+            raise CommandError(f"{label} row {row_number}: {'; '.join(exc.messages)}") from exc
 
     @staticmethod
     def _read_csv(path: Path, required_columns):
@@ -248,9 +306,7 @@ class Command(BaseCommand):
         mode = "DRY RUN" if dry_run else "COMMITTED"
         self.stdout.write(self.style.SUCCESS(f"Chart template import finished ({mode})."))
         for section, counts in summary.items():
-            self.stdout.write(
-                f"- {section}: created={counts['created']} updated={counts['updated']} skipped={counts['skipped']}"
-            )
+            self.stdout.write(f"- {section}: " + " ".join(f"{key}={value}" for key, value in counts.items()))
 
 
 class _DryRunRollback(Exception):
@@ -1,10 +1,19 @@
 import csv
+import time
 from pathlib import Path
 
+from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
 from accounting.models import Country, CountryCity, CountryState, Currency
+from accounting.services.localization_snapshot_service import (
+    build_localization_snapshots,
+    invalidate_localization_snapshot,
+)
+from accounting.services.session_cache_service import invalidate_all_session_info
+
+BULK_BATCH_SIZE = 1000
 
 
 class Command(BaseCommand):
@@ -21,6 +30,11 @@ class Command(BaseCommand):
             action="store_true",
             help="Validate and simulate import without committing database changes.",
         )
+        parser.add_argument(
+            "--skip-snapshots",
+            action="store_true",
+            help="Do not regenerate the per-country state/city snapshots served by the API.",
+        )
 
     def handle(self, *args, **options):
         base_path = Path(options["path"]).resolve()
@@ -44,6 +58,7 @@ class Command(BaseCommand):
         if dry_run:
             self.stdout.write(self.style.WARNING("Running in dry-run mode. No data will be committed."))
 
+        started = time.perf_counter()
         try:
             with transaction.atomic():
                 summary = {
@@ -52,18 +67,34 @@ class Command(BaseCommand):
                     "states": self._import_states(files["states"]),
                     "cities": self._import_cities(files["cities"]),
                 }
+                # Bulk writes send no model signals: invalidate what the
+                # per-row save() receivers would have invalidated.
+                if summary["currencies"]["changed"] or summary["countries"]["changed"]:
+                    invalidate_all_session_info()
+                self._refresh_snapshots(summary, options["skip_snapshots"])
 
                 if dry_run:
                     raise _DryRunRollback()
         except _DryRunRollback:
             pass
 
+        for counts in summary.values():
+            counts.pop("changed", None)
+            counts.pop("country_ids", None)
+        summary["total"] = {"seconds": round(time.perf_counter() - started, 2)}
         self._print_summary(summary, dry_run)
 
     def _import_currencies(self, path: Path):
-        created = 0
-        updated = 0
-
+        upsert = _TableUpsert(
+            Currency,
+            "currencies.csv",
+            unique_fields=("code",),
+            value_fields=("name", "symbol", "decimal_places"),
+            existing={
+                (code,): (pk, tuple(values))
+                for pk, code, *values in Currency.objects.values_list("id", "code", "name", "symbol", "decimal_places")
+            },
+        )
         for row_number, row in self._read_csv(path, ["code", "name", "symbol", "decimal_places"]):
             code = row["code"].strip().upper()
             name = row["name"].strip()
@@ -73,26 +104,23 @@ class Command(BaseCommand):
             if not code or not name:
                 raise CommandError(f"currencies.csv row {row_number}: code and name are required")
 
-            obj, was_created = Currency.objects.update_or_create(
-                code=code,
-                defaults={
-                    "name": name,
-                    "symbol": symbol,
-                    "decimal_places": decimal_places,
-                },
+            upsert.add(
+                (code,), Currency(code=code, name=name, symbol=symbol, decimal_places=decimal_places), row_number
             )
-            obj.full_clean()
-            if was_created:
-                created += 1
-            else:
-                updated += 1
 
-        return {"created": created, "updated": updated, "skipped": 0}
+        return upsert.finish()
 
     def _import_countries(self, path: Path):
-        created = 0
-        updated = 0
-
+        upsert = _TableUpsert(
+            Country,
+            "countries.csv",
+            unique_fields=("code",),
+            value_fields=("name", "phone_code", "active"),
+            existing={
+                (code,): (pk, tuple(values))
+                for pk, code, *values in Country.objects.values_list("id", "code", "name", "phone_code", "active")
+            },
+        )
         for row_number, row in self._read_csv(path, ["code", "name", "phone_code", "active"]):
             code = row["code"].strip().upper()
             name = row["name"].strip()
@@ -102,28 +130,32 @@ class Command(BaseCommand):
             if not code or not name:
                 raise CommandError(f"countries.csv row {row_number}: code and name are required")
 
-            obj, was_created = Country.objects.update_or_create(
-                code=code,
-                defaults={
-                    "name": name,
-                    "phone_code": phone_code,
-                    "active": active,
-                },
-            )
-            obj.full_clean()
-            if was_created:
-                created += 1
-            else:
-                updated += 1
+            upsert.add((code,), Country(code=code, name=name, phone_code=phone_code, active=active), row_number)
 
-        return {"created": created, "updated": updated, "skipped": 0}
+        counts = upsert.finish()
+        # Country names are embedded in the state and city snapshots.
+        counts["country_ids"] = upsert.updated_pks
+        return counts
 
     def _import_states(self, path: Path):
-        created = 0
-        updated = 0
         skipped = 0
-
-        country_by_code = {country.code: country for country in Country.objects.all()}
+        country_id_by_code = dict(Country.objects.values_list("code", "id"))
+
+        # Rows with a code match on (country, code), the others on (country, name).
+        existing = {}
+        for pk, country_id, code, name, active in CountryState.objects.values_list(
+            "id", "country_id", "code", "name", "active"
+        ):
+            existing[("name", country_id, name)] = (pk, (name, code, active))
+            if code:
+                existing[("code", country_id, code)] = (pk, (name, code, active))
+        upsert = _TableUpsert(
+            CountryState,
+            "states.csv",
+            unique_fields=("country", "name"),
+            value_fields=("name", "code", "active"),
+            existing=existing,
+        )
 
         for row_number, row in self._read_csv(path, ["country_code", "code", "name", "active"]):
             country_code = row["country_code"].strip().upper()
@@ -131,8 +163,8 @@ class Command(BaseCommand):
             name = row["name"].strip()
             active = self._parse_bool(row["active"], "active", row_number)
 
-            country = country_by_code.get(country_code)
-            if not country:
+            country_id = country_id_by_code.get(country_code)
+            if not country_id:
                 skipped += 1
                 self.stderr.write(
                     self.style.WARNING(
@@ -144,33 +176,30 @@ class Command(BaseCommand):
             if not name:
                 raise CommandError(f"states.csv row {row_number}: name is required")
 
-            lookup = {"country": country, "code": state_code} if state_code else {"country": country, "name": name}
-            obj, was_created = CountryState.objects.update_or_create(
-                **lookup,
-                defaults={
-                    "name": name,
-                    "code": state_code,
-                    "active": active,
-                },
-            )
-            obj.full_clean()
-            if was_created:
-                created += 1
-            else:
-                updated += 1
+            key = ("code", country_id, state_code) if state_code else ("name", country_id, name)
+            upsert.add(key, CountryState(country_id=country_id, name=name, code=state_code, active=active), row_number)
 
-        return {"created": created, "updated": updated, "skipped": skipped}
+        return upsert.finish(skipped=skipped)
 
     def _import_cities(self, path: Path):
-        created = 0
-        updated = 0
         skipped = 0
-
-        country_by_code = {country.code: country for country in Country.objects.all()}
-        state_by_country_code = {
-            (state.country_id, state.code): state
-            for state in CountryState.objects.exclude(code="").all()
+        country_id_by_code = dict(Country.objects.values_list("code", "id"))
+        state_id_by_country_code = {
+            (country_id, code): pk
+            for pk, country_id, code in CountryState.objects.exclude(code="").values_list("id", "country_id", "code")
         }
+        upsert = _TableUpsert(
+            CountryCity,
+            "cities.csv",
+            unique_fields=("country", "state", "name"),
+            value_fields=("postal_code", "active"),
+            existing={
+                (country_id, state_id, name): (pk, tuple(values))
+                for pk, country_id, state_id, name, *values in CountryCity.objects.values_list(
+                    "id", "country_id", "state_id", "name", "postal_code", "active"
+                ).iterator(chunk_size=5000)
+            },
+        )
 
         for row_number, row in self._read_csv(path, ["country_code", "state_code", "name", "postal_code", "active"]):
             country_code = row["country_code"].strip().upper()
@@ -179,8 +208,8 @@ class Command(BaseCommand):
             postal_code = row["postal_code"].strip()
             active = self._parse_bool(row["active"], "active", row_number)
 
-            country = country_by_code.get(country_code)
-            if not country:
+            country_id = country_id_by_code.get(country_code)
+            if not country_id:
                 skipped += 1
                 self.stderr.write(
                     self.style.WARNING(
@@ -189,10 +218,10 @@ class Command(BaseCommand):
                 )
                 continue
 
-            state = None
+            state_id = None
             if state_code:
-                state = state_by_country_code.get((country.id, state_code))
-                if not state:
+                state_id = state_id_by_country_code.get((country_id, state_code))
+                if not state_id:
                     skipped += 1
                     self.stderr.write(
                         self.style.WARNING(
@@ -204,22 +233,38 @@ class Command(BaseCommand):
             if not name:
                 raise CommandError(f"cities.csv row {row_number}: name is required")
 
-            obj, was_created = CountryCity.objects.update_or_create(
-                country=country,
-                state=state,
-                name=name,
-                defaults={
-                    "postal_code": postal_code,
-                    "active": active,
-                },
+            # The state is looked up within the row's country, so the
+            # model's clean() check (state belongs to country) always holds.
+            upsert.add(
+                (country_id, state_id, name),
+                CountryCity(country_id=country_id, state_id=state_id, name=name, postal_code=postal_code, active=active),
+                row_number,
             )
-            obj.full_clean()
-            if was_created:
-                created += 1
-            else:
-                updated += 1
 
-        return {"created": created, "updated": updated, "skipped": skipped}
+        return upsert.finish(skipped=skipped)
+
+    def _refresh_snapshots(self, summary: dict, skip_snapshots: bool):
+        # State names are embedded in city rows, so state changes touch both.
+        renamed = summary["countries"]["country_ids"]
+        touched = {
+            "states": renamed | summary["states"]["country_ids"],
+            "cities": renamed | summary["states"]["country_ids"] | summary["cities"]["country_ids"],
+        }
+        if skip_snapshots:
+            for kind, country_ids in touched.items():
+                for country_id in country_ids:
+                    invalidate_localization_snapshot(country_id, kind)
+            return
+        for kind, country_ids in touched.items():
+            started = time.perf_counter()
+            # Countries without a snapshot yet are built too; the others
+            # only when their rows changed.
+            missing = set(
+                Country.objects.exclude(localization_snapshots__kind=kind).values_list("id", flat=True)
+            )
+            counts = build_localization_snapshots(country_ids=country_ids | missing, kinds=(kind,))[kind]
+            counts["seconds"] = round(time.perf_counter() - started, 2)
+            summary[f"{kind} snapshots"] = counts
 
     @staticmethod
     def _read_csv(path: Path, required_columns):
@@ -255,9 +300,111 @@ class Command(BaseCommand):
         mode = "DRY RUN" if dry_run else "COMMITTED"
         self.stdout.write(self.style.SUCCESS(f"Localization import finished ({mode})."))
         for section, counts in summary.items():
-            self.stdout.write(
-                f"- {section}: created={counts['created']} updated={counts['updated']} skipped={counts['skipped']}"
-            )
+            self.stdout.write(f"- {section}: " + " ".join(f"{key}={value}" for key, value in counts.items()))
+
+
+class _TableUpsert:
+    """Diff CSV rows against ``existing`` and write the changes in chunks.
+
+    ``existing`` maps a row key to ``(pk, values)`` where ``values`` are the
+    ``value_fields`` of the stored row. Unchanged rows cost no query.
+    Changed rows are written by pk with ``bulk_update``: the row key is not
+    always ``unique_fields`` (states match on code but are unique on name),
+    so an upsert on ``unique_fields`` could insert a duplicate. New rows go
+    through ``bulk_create(update_conflicts=True)`` on ``unique_fields``.
+    """
+
+    def __init__(self, model, label: str, *, unique_fields, value_fields, existing: dict):
+        self.model = model
+        self.label = label
+        self.unique_fields = list(unique_fields)
+        self.value_fields = list(value_fields)
+        self.existing = existing
+        self.to_upsert = {}
+        self.to_update = {}
+        self.country_ids = set()
+        self.updated_pks = set()
+        self.counts = {"created": 0, "updated": 0, "unchanged": 0}
+        self.started = time.perf_counter()
+        self._fk_names = [field.name for field in model._meta.concrete_fields if field.is_relation]
+
+    def add(self, key, instance, row_number: int):
+        values = tuple(getattr(instance, field) for field in self.value_fields)
+        if key in self.to_upsert:
+            # Repeated key before the insert was flushed: last row wins.
+            self._validate(instance, row_number)
+            self.to_upsert[key] = instance
+            return
+        current = self.existing.get(key)
+        if current is not None and current[1] == values:
+            self.counts["unchanged"] += 1
+            return
+        self._validate(instance, row_number)
+        if getattr(instance, "country_id", None):
+            self.country_ids.add(instance.country_id)
+        if current is None:
+            self.counts["created"] += 1
+            self.to_upsert[key] = instance
+        else:
+            if key not in self.to_update:
+                self.counts["updated"] += 1
+            self.existing[key] = (current[0], values)
+            self.updated_pks.add(current[0])
+            instance.pk = current[0]
+            self.to_update[key] = instance
+        if len(self.to_upsert) >= BULK_BATCH_SIZE:
+            self._flush_upserts()
+        if len(self.to_update) >= BULK_BATCH_SIZE:
+            self._flush_updates()
+
+    def _validate(self, instance, row_number: int):
+        # Field-level checks only: foreign keys come from the lookup maps and
+        # uniqueness is enforced by the upsert itself.
+        try:
+            instance.clean_fields(exclude=self._fk_names)
+        except ValidationError as exc:
+            raise CommandError(f"{self.label} row {row_number}: {'; '.join(exc.messages)}") from exc
+
+    def _flush_upserts(self):
+        if not self.to_upsert:
+            return
+        written = self.model.objects.bulk_create(
+            list(self.to_upsert.values()),
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=self.unique_fields,
+            update_fields=[*self.value_fields, "updated_at"],
+        )
+        for key, instance in zip(self.to_upsert, written):
+            if instance.pk is not None:
+                self.existing[key] = (instance.pk, tuple(getattr(instance, field) for field in self.value_fields))
+        self.to_upsert = {}
+
+    def _flush_updates(self):
+        if not self.to_update:
+            return
+        # An upsert on the primary key: every row conflicts, so this is an
+        # UPDATE by pk in one statement per batch, without the per-row CASE
+        # expressions bulk_update builds.
+        self.model.objects.bulk_create(
+            list(self.to_update.values()),
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=[*self.value_fields, "updated_at"],
+        )
+        self.to_update = {}
+
+    def finish(self, skipped: int = 0) -> dict:
+        self._flush_upserts()
+        self._flush_updates()
+        return {
+            **self.counts,
+            "skipped": skipped,
+            "seconds": round(time.perf_counter() - self.started, 2),
+            "changed": self.counts["created"] + self.counts["updated"],
+            "country_ids": self.country_ids,
+        }
 
 
 class _DryRunRollback(Exception):
@@ -0,0 +1,104 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from accounting.models import Asset, Company
+from accounting.services.asset_service import generate_depreciation_boards
+
+
+class Command(BaseCommand):
+    help = "Recompute draft depreciation boards for all assets of a company."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, required=True, help="Company id whose assets are recomputed.")
+        parser.add_argument(
+            "--state",
+            action="append",
+            choices=["draft", "running", "paused"],
+            help="Only recompute assets in this state (repeatable). Defaults to draft, running and paused.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of assets computed and written per batch; each batch commits on its own.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Compute boards and report totals without committing database changes.",
+        )
+
+    def handle(self, *args, **options):
+        company = Company.objects.filter(id=options["company"]).first()
+        if not company:
+            raise CommandError(f"Company not found: {options['company']}")
+        batch_size = options["batch_size"]
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be greater than zero.")
+        dry_run = options["dry_run"]
+        states = options["state"] or ["draft", "running", "paused"]
+
+        queryset = Asset.objects.filter(company_id=company.id, state__in=states).order_by("id")
+        self.stdout.write(self.style.NOTICE(f"Recomputing depreciation boards for company: {company}"))
+        if dry_run:
+            self.stdout.write(self.style.WARNING("Running in dry-run mode. No data will be committed."))
+
+        summary = {"assets": 0, "deleted": 0, "created": 0, "errors": {}}
+        if dry_run:
+            # One transaction for the whole run, rolled back at the end.
+            try:
+                with transaction.atomic():
+                    self._recompute(queryset, batch_size, summary, dry_run)
+                    raise _DryRunRollback()
+            except _DryRunRollback:
+                pass
+        else:
+            self._recompute(queryset, batch_size, summary, dry_run)
+
+        self._print_summary(summary, dry_run)
+
+    def _recompute(self, queryset, batch_size: int, summary, dry_run: bool):
+        batch = []
+        for asset in queryset.iterator(chunk_size=batch_size):
+            batch.append(asset)
+            if len(batch) >= batch_size:
+                self._recompute_batch(batch, batch_size, summary, dry_run)
+                batch = []
+        if batch:
+            self._recompute_batch(batch, batch_size, summary, dry_run)
+
+    def _recompute_batch(self, batch, batch_size: int, summary, dry_run: bool):
+        if dry_run:
+            self._merge(summary, generate_depreciation_boards(batch, batch_size=batch_size))
+            return
+        # generate_depreciation_boards commits each batch in its own
+        # transaction; a failing batch is retried asset by asset so one bad
+        # asset only loses its own board.
+        try:
+            self._merge(summary, generate_depreciation_boards(batch, batch_size=batch_size))
+        except (DatabaseError, ArithmeticError, ValueError):
+            for asset in batch:
+                try:
+                    self._merge(summary, generate_depreciation_boards([asset], batch_size=batch_size))
+                except (DatabaseError, ArithmeticError, ValueError) as exc:
+                    summary["errors"][str(asset.id)] = str(exc)
+
+    @staticmethod
+    def _merge(summary, stats):
+        summary["assets"] += stats["assets"]
+        summary["deleted"] += stats["deleted"]
+        summary["created"] += stats["created"]
+        summary["errors"].update(stats["errors"])
+
+    def _print_summary(self, summary, dry_run: bool):
+        mode = "DRY RUN" if dry_run else "COMMITTED"
+        self.stdout.write(self.style.SUCCESS(f"Depreciation board recompute finished ({mode})."))
+        self.stdout.write(
+            f"- boards: assets={summary['assets']} deleted_lines={summary['deleted']} created_lines={summary['created']}"
+        )
+        for asset_id, message in summary["errors"].items():
+            self.stderr.write(self.style.WARNING(f"- asset {asset_id}: {message}"))
+
+
+class _DryRunRollback(Exception):
+    """Internal exception used to rollback transaction in dry-run mode."""
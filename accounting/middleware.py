@@ -0,0 +1,101 @@
+import time
+
+from django.conf import settings
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from accounting.services.instrumentation_service import QueryCounter, record_request, resolve_route_name
+from accounting.services.metrics_service import observe_request
+from accounting.services.profiling_service import check_profiling_token, profile_call, store_profile
+
+QUERY_STATS_HEADER = "X-Query-Stats"
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class RequestInstrumentationMiddleware:
+    """Record query count, database time and total time per resolved route.
+
+    Totals feed ``/api/debug/query-stats/`` and the ``/api/metrics/``
+    histograms. The ``X-Query-Stats`` header is
+    added when ``ACCOUNTING_QUERY_STATS_HEADER`` is true (defaults to DEBUG).
+    Streaming responses are measured up to the first byte only.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "ACCOUNTING_INSTRUMENTATION", True)
+        self.add_header = getattr(settings, "ACCOUNTING_QUERY_STATS_HEADER", settings.DEBUG)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        total_seconds = time.perf_counter() - started
+
+        route = resolve_route_name(request)
+        if route is not None:
+            record_request(
+                route,
+                queries=counter.queries,
+                db_seconds=counter.db_seconds,
+                total_seconds=total_seconds,
+                status_code=response.status_code,
+            )
+            observe_request(route, request.method, response.status_code, total_seconds, counter.queries)
+        if self.add_header:
+            response[QUERY_STATS_HEADER] = (
+                f"queries={counter.queries}; db={counter.db_seconds * 1000:.1f}ms; "
+                f"total={total_seconds * 1000:.1f}ms; route={route or '-'}"
+            )
+        return response
+
+
+class RequestProfilingMiddleware:
+    """Profile single requests on demand.
+
+    A request is profiled when it carries a valid ``X-Profile`` header (see
+    ``make_profiling_token``) or ``?profile=1`` from a staff user. The
+    artifact is stored by id; ``X-Profile-Id`` names it for
+    ``/api/debug/profiles/<id>/``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self._wants_profile(request):
+            return self.get_response(request)
+        response, artifact = profile_call(
+            self.get_response, request, method=request.method, path=request.get_full_path()
+        )
+        artifact.status_code = response.status_code
+        response[PROFILE_ID_HEADER] = store_profile(artifact)
+        return response
+
+    def _wants_profile(self, request) -> bool:
+        if check_profiling_token(request.headers.get(PROFILE_HEADER)):
+            return True
+        if request.GET.get("profile", "").lower() not in {"1", "true", "yes"}:
+            return False
+        return _is_staff(request)
+
+
+def _is_staff(request) -> bool:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    # API clients authenticate in the view (JWT); resolve the user up front
+    # with the configured DRF authenticators.
+    drf_request = Request(request)
+    for authenticator_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authenticator_class().authenticate(drf_request)
+        except APIException:
+            return False
+        if result is not None:
+            return bool(result[0].is_staff)
+    return False
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 05:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0026_usercompanyaccess_active_companies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='model',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='assets', to='accounting.assetmodel'),
+        ),
+        migrations.AddIndex(
+            model_name='assetdepreciationline',
+            index=models.Index(fields=['asset', 'state', 'date'], name='ga_asset_de_asset_s_6c1f0e_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-19 05:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0027_asset_model_and_depreciation_line_state_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MoveLineAnalyticDistribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('percentage', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('analytic_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='move_line_distribution_entries', to='accounting.analyticaccount')),
+                ('move_line', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analytic_distribution_entries', to='accounting.moveline')),
+            ],
+            options={
+                'db_table': 'ga_move_line_analytic_distribution',
+                'indexes': [models.Index(fields=['analytic_account', 'move_line'], name='ga_ml_dist_account_line_idx')],
+                'unique_together': {('move_line', 'analytic_account')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-19 05:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0029_invoice_line_product_and_analytic_distribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocalizationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('states', 'States'), ('cities', 'Cities')], max_length=16)),
+                ('etag', models.CharField(max_length=64)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('content', models.BinaryField()),
+                ('content_gzip', models.BinaryField()),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='localization_snapshots', to='accounting.country')),
+            ],
+            options={
+                'db_table': 'ga_localization_snapshot',
+                'unique_together': {('country', 'kind')},
+            },
+        ),
+    ]
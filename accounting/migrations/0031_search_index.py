@@ -0,0 +1,76 @@
+from django.db import DatabaseError, migrations, transaction
+
+# (base table, search table, indexed columns)
+SEARCH_TABLES = (
+    ("ga_partner", "ga_partner_search", ("name", "email", "vat")),
+    ("ga_account", "ga_account_search", ("code", "name")),
+    ("ga_product", "ga_product_search", ("name", "default_code", "barcode")),
+)
+
+
+def _sqlite_statements(base, search, columns):
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    # External-content table: the index stores tokens only, rows are read from
+    # ``base``. Triggers run for every write path, including bulk_create,
+    # bulk_update and QuerySet.update, so the index never drifts.
+    return [
+        f"CREATE VIRTUAL TABLE {search} USING fts5({cols}, content='{base}', content_rowid='id', "
+        f"prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {search}_ai AFTER INSERT ON {base} BEGIN "
+        f"INSERT INTO {search}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {search}_ad AFTER DELETE ON {base} BEGIN "
+        f"INSERT INTO {search}({search}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {search}_au AFTER UPDATE OF {cols} ON {base} BEGIN "
+        f"INSERT INTO {search}({search}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {search}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {search}({search}) VALUES ('rebuild')",
+    ]
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        for base, search, columns in SEARCH_TABLES:
+            for statement in _sqlite_statements(base, search, columns):
+                schema_editor.execute(statement)
+    elif connection.vendor == "postgresql":
+        # Trigram indexes serve the ILIKE prefix/word lookups of the search
+        # service. The extension may need privileges the app role lacks; the
+        # search still works without the indexes, only slower.
+        try:
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                for base, search, columns in SEARCH_TABLES:
+                    for column in columns:
+                        schema_editor.execute(
+                            f"CREATE INDEX IF NOT EXISTS {search}_{column}_trgm "
+                            f"ON {base} USING gin (UPPER({column}::text) gin_trgm_ops)"
+                        )
+        except DatabaseError:
+            pass
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        for _base, search, _columns in SEARCH_TABLES:
+            for suffix in ("ai", "ad", "au"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {search}_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {search}")
+    elif connection.vendor == "postgresql":
+        for _base, search, columns in SEARCH_TABLES:
+            for column in columns:
+                schema_editor.execute(f"DROP INDEX IF EXISTS {search}_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0030_localization_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def _parse(distribution):
+    # Same rules as accounting.models.analytics.parse_analytic_distribution.
+    parsed = {}
+    if not isinstance(distribution, dict):
+        return parsed
+    for key, pct in distribution.items():
+        try:
+            parsed[int(key)] = Decimal(str(pct))
+        except (TypeError, ValueError, ArithmeticError):
+            continue
+    return parsed
+
+
+def backfill_distributions(apps, schema_editor):
+    # Journal items written before 0028 only have the JSON field; transfer
+    # models and analytic filters read the normalized table.
+    MoveLine = apps.get_model("accounting", "MoveLine")
+    AnalyticAccount = apps.get_model("accounting", "AnalyticAccount")
+    MoveLineAnalyticDistribution = apps.get_model("accounting", "MoveLineAnalyticDistribution")
+    db = schema_editor.connection.alias
+
+    existing_ids = set(AnalyticAccount.objects.using(db).values_list("id", flat=True))
+    queryset = MoveLine.objects.using(db).exclude(analytic_distribution={}).only("id", "analytic_distribution")
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by("id")[:BATCH_SIZE])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        MoveLineAnalyticDistribution.objects.using(db).filter(move_line_id__in=[line.id for line in batch]).delete()
+        MoveLineAnalyticDistribution.objects.using(db).bulk_create(
+            [
+                MoveLineAnalyticDistribution(move_line_id=line.id, analytic_account_id=account_id, percentage=pct)
+                for line in batch
+                for account_id, pct in _parse(line.analytic_distribution).items()
+                if account_id in existing_ids
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0031_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_distributions, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,7 @@ from .analytics import (
     AnalyticDistributionModel,
     AnalyticDistributionModelLine,
     AnalyticPlan,
+    MoveLineAnalyticDistribution,
 )
 from .assets import Asset, AssetDepreciationLine
 from .chart_templates import AccountGroupTemplate, AccountTemplate
@@ -37,7 +38,7 @@ from .journals import (
     TaxRepartitionLine,
 )
 from .ledger import Account, AccountGroup, AccountRoot
-from .localization import Country, CountryCity, CountryCurrency, CountryState, Currency
+from .localization import Country, CountryCity, CountryCurrency, CountryState, Currency, LocalizationSnapshot
 from .invoicing import InvoiceLine
 from .payments import FullReconcile, PartialReconcile, Payment, PaymentMethod, PaymentMethodLine
 from .products import Product, ProductCategory
@@ -51,6 +52,7 @@ __all__ = [
     "AnalyticAccount",
     "AnalyticDistributionModel",
     "AnalyticDistributionModelLine",
+    "MoveLineAnalyticDistribution",
     "Asset",
     "AssetDepreciationLine",
     "AccountGroupTemplate",
@@ -77,6 +79,7 @@ __all__ = [
     "CountryState",
     "CountryCity",
     "CountryCurrency",
+    "LocalizationSnapshot",
     "AccountRoot",
     "AccountGroup",
     "Account",
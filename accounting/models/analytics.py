@@ -35,17 +35,14 @@ class AnalyticPlanFieldsMixin:
         accounts = []
         if self.analytic_account_id:
             accounts.append(self.analytic_account)
-        distribution = self._get_analytic_distribution()
-        if isinstance(distribution, dict):
-            for key in distribution.keys():
-                try:
-                    acc_id = int(key)
-                except (TypeError, ValueError):
-                    continue
-                if not any(a.id == acc_id for a in accounts):
-                    account = AnalyticAccount.objects.filter(id=acc_id).first()
-                    if account:
-                        accounts.append(account)
+        known_ids = {a.id for a in accounts}
+        missing_ids = [
+            acc_id for acc_id in parse_analytic_distribution(self._get_analytic_distribution())
+            if acc_id not in known_ids
+        ]
+        if missing_ids:
+            found = AnalyticAccount.objects.in_bulk(missing_ids)
+            accounts.extend(found[acc_id] for acc_id in missing_ids if acc_id in found)
         return accounts
 
     def _get_distribution_key(self):
@@ -200,6 +197,82 @@ class AnalyticDistributionModelLine(AccountingBaseModel):
         return f"{self.model.name} - {self.analytic_account.name}: {self.percentage}%"
 
 
+def parse_analytic_distribution(distribution) -> dict[int, Decimal]:
+    """Return ``{analytic_account_id: percentage}`` from a distribution JSON.
+
+    Keys that are not integer ids and non-numeric percentages are ignored,
+    like every other reader of ``analytic_distribution``.
+    """
+    parsed: dict[int, Decimal] = {}
+    if not isinstance(distribution, dict):
+        return parsed
+    for key, pct in distribution.items():
+        try:
+            parsed[int(key)] = Decimal(str(pct))
+        except (TypeError, ValueError, ArithmeticError):
+            continue
+    return parsed
+
+
+class MoveLineAnalyticDistribution(AccountingBaseModel):
+    """Normalized copy of ``MoveLine.analytic_distribution``.
+
+    One row per (journal item, analytic account) so filtering and
+    aggregation by analytic account are indexed SQL instead of JSON parsing.
+    Kept in sync by ``MoveLine.save()`` and ``sync_for_lines()``.
+    """
+
+    move_line = models.ForeignKey(
+        "accounting.MoveLine",
+        on_delete=models.CASCADE,
+        related_name="analytic_distribution_entries",
+    )
+    analytic_account = models.ForeignKey(
+        "accounting.AnalyticAccount",
+        on_delete=models.CASCADE,
+        related_name="move_line_distribution_entries",
+    )
+    percentage = models.DecimalField(max_digits=18, decimal_places=6)
+
+    class Meta:
+        db_table = "ga_move_line_analytic_distribution"
+        unique_together = (("move_line", "analytic_account"),)
+        indexes = [
+            models.Index(fields=["analytic_account", "move_line"], name="ga_ml_dist_account_line_idx"),
+        ]
+
+    @classmethod
+    def sync_for_lines(cls, move_lines) -> int:
+        """Rebuild the normalized rows of ``move_lines`` from their JSON.
+
+        Uses one delete, one ``id__in`` lookup of the referenced analytic
+        accounts and one ``bulk_create``; returns the number of rows written.
+        """
+        move_lines = [line for line in move_lines if line.pk]
+        if not move_lines:
+            return 0
+        parsed = {line.pk: parse_analytic_distribution(line.analytic_distribution) for line in move_lines}
+        account_ids = {account_id for entries in parsed.values() for account_id in entries}
+        existing_ids = (
+            set(AnalyticAccount.objects.filter(id__in=account_ids).values_list("id", flat=True))
+            if account_ids
+            else set()
+        )
+
+        cls.objects.filter(move_line_id__in=list(parsed)).delete()
+        rows = [
+            cls(move_line_id=line_id, analytic_account_id=account_id, percentage=pct)
+            for line_id, entries in parsed.items()
+            for account_id, pct in entries.items()
+            if account_id in existing_ids
+        ]
+        cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    def __str__(self):
+        return f"{self.move_line_id} - {self.analytic_account_id}: {self.percentage}%"
+
+
 class AnalyticLine(AnalyticPlanFieldsMixin, AccountingBaseModel):
     company = models.ForeignKey("accounting.Company", on_delete=models.PROTECT, related_name="analytic_lines")
     name = models.CharField(max_length=255)
@@ -40,6 +40,7 @@ class Asset(AccountingBaseModel):
         related_name="assets_expense",
     )
     journal = models.ForeignKey("accounting.Journal", on_delete=models.PROTECT, null=True, blank=True, related_name="assets")
+    model = models.ForeignKey("accounting.AssetModel", on_delete=models.PROTECT, null=True, blank=True, related_name="assets")
     acquisition_date = models.DateField()
     first_depreciation_date = models.DateField(null=True, blank=True)
     original_value = models.DecimalField(max_digits=18, decimal_places=6)
@@ -81,6 +82,8 @@ class Asset(AccountingBaseModel):
             raise ValidationError("Depreciation account company must match asset company.")
         if self.expense_account_id and self.expense_account.company_id != self.company_id:
             raise ValidationError("Expense account company must match asset company.")
+        if self.model_id and self.model.company_id != self.company_id:
+            raise ValidationError("Asset model company must match asset company.")
 
 
 class AssetDepreciationLine(AccountingBaseModel):
@@ -110,6 +113,7 @@ class AssetDepreciationLine(AccountingBaseModel):
         unique_together = ("asset", "sequence")
         indexes = [
             models.Index(fields=["asset", "date"], name="ga_asset_de_asset_i_077152_idx"),
+            models.Index(fields=["asset", "state", "date"], name="ga_asset_de_asset_s_6c1f0e_idx"),
             models.Index(fields=["state"], name="ga_asset_de_state_0d2332_idx"),
         ]
 
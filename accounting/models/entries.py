@@ -2,10 +2,30 @@ from decimal import Decimal
 
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Coalesce
 
 from .base import AccountingBaseModel
 
 
+class MoveQuerySet(models.QuerySet):
+    def with_balance(self):
+        """Annotate ``lines_balance`` so ``Move.balance`` needs no query per move."""
+        lines = (
+            MoveLine.objects.filter(move_id=models.OuterRef("pk"))
+            .order_by()
+            .values("move_id")
+            .annotate(balance=models.Sum(models.F("debit") - models.F("credit")))
+            .values("balance")
+        )
+        return self.annotate(
+            lines_balance=Coalesce(
+                models.Subquery(lines),
+                models.Value(Decimal("0")),
+                output_field=models.DecimalField(max_digits=24, decimal_places=6),
+            )
+        )
+
+
 class Move(AccountingBaseModel):
     MOVE_STATE_CHOICES = (
         ("draft", "Draft"),
@@ -57,6 +77,8 @@ class Move(AccountingBaseModel):
         related_name="moves",
     )
 
+    objects = MoveQuerySet.as_manager()
+
     class Meta:
         db_table = "ga_move"
         indexes = [
@@ -78,6 +100,8 @@ class Move(AccountingBaseModel):
 
     @property
     def balance(self) -> Decimal:
+        if "lines_balance" in self.__dict__:
+            return self.lines_balance
         totals = self.lines.aggregate(
             debit=models.Sum("debit", default=Decimal("0")),
             credit=models.Sum("credit", default=Decimal("0")),
@@ -132,6 +156,31 @@ class MoveLine(AccountingBaseModel):
             raise ValidationError("Analytic distribution must be an object of analytic account percentages.")
         self._check_auto_transfer_line_ids_tax()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        distribution = instance.__dict__.get("analytic_distribution")
+        instance._loaded_analytic_distribution = dict(distribution) if isinstance(distribution, dict) else distribution
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        super().save(*args, **kwargs)
+        # Keep ga_move_line_analytic_distribution in sync, but only when the
+        # JSON actually changed (plain saves of unchanged lines cost nothing).
+        if update_fields is not None and "analytic_distribution" not in update_fields:
+            return
+        distribution = self.analytic_distribution
+        if adding and not distribution:
+            return
+        if not adding and getattr(self, "_loaded_analytic_distribution", None) == distribution:
+            return
+        from .analytics import MoveLineAnalyticDistribution
+
+        MoveLineAnalyticDistribution.sync_for_lines([self])
+        self._loaded_analytic_distribution = dict(distribution) if isinstance(distribution, dict) else distribution
+
     def _check_auto_transfer_line_ids_tax(self) -> None:
         if self.move_id and self.move.transfer_model_id and self.tax_id:
             raise ValidationError("Auto transfer journal items cannot have taxes.")
@@ -10,6 +10,14 @@ class InvoiceLine(AccountingBaseModel):
     move = models.ForeignKey("accounting.Move", on_delete=models.CASCADE, related_name="invoice_lines")
     account = models.ForeignKey("accounting.Account", on_delete=models.PROTECT, related_name="invoice_lines")
     tax = models.ForeignKey("accounting.Tax", on_delete=models.PROTECT, null=True, blank=True, related_name="invoice_lines")
+    product = models.ForeignKey(
+        "accounting.Product",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="invoice_lines",
+    )
+    analytic_distribution = models.JSONField(default=dict, blank=True)
     name = models.CharField(max_length=255)
     quantity = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal("1"))
     unit_price = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal("0"))
@@ -34,6 +42,10 @@ class InvoiceLine(AccountingBaseModel):
             raise ValidationError("Unit price cannot be negative.")
         if self.discount_percent < 0 or self.discount_percent > 100:
             raise ValidationError("Discount percent must be between 0 and 100.")
+        if self.product_id and self.product.company_id != self.move.company_id:
+            raise ValidationError("Invoice line product company must match invoice company.")
+        if self.analytic_distribution and not isinstance(self.analytic_distribution, dict):
+            raise ValidationError("Analytic distribution must be an object of analytic account percentages.")
 
     def save(self, *args, **kwargs):
         discount_factor = Decimal("1") - (self.discount_percent / Decimal("100"))
@@ -101,3 +101,28 @@ class CountryCurrency(AccountingBaseModel):
     def __str__(self) -> str:
         suffix = " (default)" if self.is_default else ""
         return f"{self.country.code} - {self.currency.code}{suffix}"
+
+
+class LocalizationSnapshot(AccountingBaseModel):
+    """Pre-rendered JSON (plain and gzip) of a country's states or cities."""
+
+    KIND_CHOICES = (
+        ("states", "States"),
+        ("cities", "Cities"),
+    )
+
+    country = models.ForeignKey(
+        "accounting.Country", on_delete=models.CASCADE, related_name="localization_snapshots"
+    )
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    etag = models.CharField(max_length=64)
+    row_count = models.PositiveIntegerField(default=0)
+    content = models.BinaryField()
+    content_gzip = models.BinaryField()
+
+    class Meta:
+        db_table = "ga_localization_snapshot"
+        unique_together = (("country", "kind"),)
+
+    def __str__(self) -> str:
+        return f"{self.country_id} - {self.kind}"
@@ -9,9 +9,17 @@ from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.utils import timezone
 
+from .analytics import MoveLineAnalyticDistribution
 from .base import AccountingBaseModel
 
 
+def _analytic_accounts_q(analytic_ids) -> models.Q:
+    """Journal items carrying any of ``analytic_ids``, directly or in their distribution."""
+    return models.Q(analytic_account_id__in=analytic_ids) | models.Q(
+        analytic_distribution_entries__analytic_account_id__in=analytic_ids
+    )
+
+
 class TransferModel(AccountingBaseModel):
     FREQUENCY_CHOICES = (
         ("month", "Monthly"),
@@ -181,11 +189,6 @@ class TransferModel(AccountingBaseModel):
         self.save(update_fields=["state", "updated_at"])
         return self
 
-    @classmethod
-    def action_cron_auto_transfer(cls):
-        for record in cls.objects.filter(state="in_progress", active=True):
-            record.action_perform_auto_transfer()
-
     def action_perform_auto_transfer(self):
         if not self.accounts.exists() or not self.lines.exists():
             return False
@@ -269,6 +272,7 @@ class TransferModel(AccountingBaseModel):
                 )
             )
         MoveLine.objects.bulk_create(move_lines)
+        MoveLineAnalyticDistribution.sync_for_lines(line for line in move_lines if line.analytic_distribution)
         self._compute_move_ids_count()
         self.save(update_fields=["move_ids_count", "updated_at"])
         return current_move
@@ -313,15 +317,15 @@ class TransferModel(AccountingBaseModel):
             qs = qs.exclude(partner_id__in=excluded_partner_ids)
         excluded_analytic_ids = {aid for aid in self.lines.values_list("analytic_accounts__id", flat=True) if aid}
         if excluded_analytic_ids:
-            qs = [ml for ml in qs if not self._line_has_any_analytic(ml, excluded_analytic_ids)]
-        else:
-            qs = list(qs)
+            qs = qs.exclude(id__in=MoveLine.objects.filter(_analytic_accounts_q(excluded_analytic_ids)).values("id"))
 
-        totals_map = {}
-        for line in qs:
-            bucket = totals_map.setdefault(line.account_id, {"debit_sum": Decimal("0"), "credit_sum": Decimal("0")})
-            bucket["debit_sum"] += Decimal(line.debit)
-            bucket["credit_sum"] += Decimal(line.credit)
+        totals_map = {
+            row["account_id"]: {"debit_sum": row["debit_sum"], "credit_sum": row["credit_sum"]}
+            for row in qs.values("account_id").order_by().annotate(
+                debit_sum=models.Sum("debit", default=Decimal("0")),
+                credit_sum=models.Sum("credit", default=Decimal("0")),
+            )
+        }
 
         values_list = []
         lines_list = list(lines)
@@ -348,20 +352,6 @@ class TransferModel(AccountingBaseModel):
             values_list.append(source_move_line)
         return values_list
 
-    @staticmethod
-    def _line_has_any_analytic(move_line, analytic_ids):
-        if move_line.analytic_account_id and move_line.analytic_account_id in analytic_ids:
-            return True
-        distribution = move_line.analytic_distribution or {}
-        if isinstance(distribution, dict):
-            for key in distribution.keys():
-                try:
-                    if int(key) in analytic_ids:
-                        return True
-                except (TypeError, ValueError):
-                    continue
-        return False
-
     def _get_non_analytic_transfer_values(self, account_id, lines, write_date, amount, is_debit):
         amount_left = Decimal(amount)
         take_the_rest = self.total_percent == Decimal("100")
@@ -420,16 +410,15 @@ class TransferModelLineQuerySet(models.QuerySet):
 
         for line in self:
             qs = MoveLine.objects.filter(line._get_move_lines_domain(start_date, end_date, already_handled_move_line_ids))
-            qs = [ml for ml in qs if line._line_matches_filters(ml)]
             totals_map = {}
-            for move_line in qs:
+            for move_line_id, account_id, debit, credit in qs.values_list("id", "account_id", "debit", "credit"):
                 bucket = totals_map.setdefault(
-                    move_line.account_id,
+                    account_id,
                     {"debit_sum": Decimal("0"), "credit_sum": Decimal("0"), "ids": []},
                 )
-                bucket["debit_sum"] += Decimal(move_line.debit)
-                bucket["credit_sum"] += Decimal(move_line.credit)
-                bucket["ids"].append(move_line.id)
+                bucket["debit_sum"] += Decimal(debit)
+                bucket["credit_sum"] += Decimal(credit)
+                bucket["ids"].append(move_line_id)
 
             for account_id, sums in totals_map.items():
                 already_handled_move_line_ids.extend(sums["ids"])
@@ -479,28 +468,10 @@ class TransferModelLine(AccountingBaseModel):
             qs = qs.exclude(id__in=avoid_move_line_ids)
         if self.partners.exists():
             qs = qs.filter(partner_id__in=self.partners.values_list("id", flat=True))
-        return models.Q(id__in=qs.values("id"))
-
-    def _line_matches_filters(self, move_line):
         analytic_ids = set(self.analytic_accounts.values_list("id", flat=True))
-        partner_ids = set(self.partners.values_list("id", flat=True))
-
-        if partner_ids and move_line.partner_id not in partner_ids:
-            return False
-
-        if not analytic_ids:
-            return True
-        if move_line.analytic_account_id and move_line.analytic_account_id in analytic_ids:
-            return True
-        distribution = move_line.analytic_distribution or {}
-        if isinstance(distribution, dict):
-            for key in distribution.keys():
-                try:
-                    if int(key) in analytic_ids:
-                        return True
-                except (TypeError, ValueError):
-                    continue
-        return False
+        if analytic_ids:
+            qs = qs.filter(_analytic_accounts_q(analytic_ids))
+        return models.Q(id__in=qs.values("id"))
 
     def _get_transfer_values(self, account_id, amount, is_debit, write_date):
         return [
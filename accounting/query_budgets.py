@@ -0,0 +1,133 @@
+"""Query budgets for the API list endpoints.
+
+``check_query_budgets`` requests every argument-free GET route of the API and
+compares its query count with ``QUERY_BUDGETS`` (``view_name:action`` keys)
+or the default budget. Use it from tests or through the
+``check_query_budgets`` management command against seeded data.
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.urls.resolvers import RegexPattern, RoutePattern
+
+from accounting.services.instrumentation_service import QueryCounter
+
+DEFAULT_QUERY_BUDGET = 12
+QUERY_BUDGETS = {
+    # Report endpoints aggregate several querysets on purpose.
+    "balance-sheet-report:get": 20,
+    "profit-and-loss-report:get": 20,
+    "trial-balance-report:get": 20,
+    "general-ledger-report:get": 25,
+    "asset-register-report:get": 20,
+    "depreciation-forecast-report:get": 20,
+    "analytic-report:get": 20,
+}
+_REGEX_LITERAL = re.compile(r"^[\w\-/.]*$")
+
+
+@dataclass(frozen=True)
+class BudgetResult:
+    route: str
+    path: str
+    status_code: int
+    queries: int
+    budget: int
+
+    @property
+    def over_budget(self) -> bool:
+        return self.queries > self.budget
+
+
+def _literal(pattern) -> str | None:
+    if isinstance(pattern, RoutePattern):
+        route = str(pattern)
+        return None if "<" in route else route
+    if isinstance(pattern, RegexPattern):
+        regex = pattern._regex.lstrip("^").rstrip("$")
+        if regex.endswith("/?"):
+            return None
+        regex = regex.replace(r"\.", ".")
+        return regex if _REGEX_LITERAL.match(regex) else None
+    return None
+
+
+def iter_get_routes(prefix: str = "/api/", urlconf=None):
+    """Yield ``(route_name, path)`` for GET endpoints under ``prefix`` without URL arguments."""
+
+    def walk(patterns, base):
+        for entry in patterns:
+            literal = _literal(entry.pattern)
+            if literal is None:
+                continue
+            if isinstance(entry, URLResolver):
+                yield from walk(entry.url_patterns, base + literal)
+            elif isinstance(entry, URLPattern) and entry.name:
+                path = "/" + base + literal
+                if not path.startswith(prefix):
+                    continue
+                actions = getattr(entry.callback, "actions", None)
+                view_class = getattr(entry.callback, "cls", None) or getattr(entry.callback, "view_class", None)
+                if actions is not None:
+                    if "get" in actions:
+                        yield f"{entry.name}:{actions['get']}", path
+                elif view_class is not None and hasattr(view_class, "get"):
+                    yield f"{entry.name}:get", path
+
+    seen = set()
+    for route, path in walk(get_resolver(urlconf).url_patterns, ""):
+        if route not in seen:
+            seen.add(route)
+            yield route, path
+
+
+def check_query_budgets(client, *, params=None, budgets=None, default_budget=DEFAULT_QUERY_BUDGET, prefix="/api/"):
+    """Request every GET route with ``client`` and return one ``BudgetResult`` per route.
+
+    A route whose view raises is recorded with status 500 instead of
+    aborting the run.
+    """
+    budgets = {**QUERY_BUDGETS, **(budgets or {})}
+    results = []
+    raise_request_exception = client.raise_request_exception
+    client.raise_request_exception = False
+    try:
+        for route, path in iter_get_routes(prefix):
+            with QueryCounter() as counter:
+                response = client.get(path, params or {})
+                status_code = response.status_code
+            if response.streaming:
+                # Drain the stream inside the counter: its queries run lazily.
+                with counter:
+                    try:
+                        b"".join(response.streaming_content)
+                    except Exception:
+                        status_code = 500
+            results.append(
+                BudgetResult(
+                    route=route,
+                    path=path,
+                    status_code=status_code,
+                    queries=counter.queries,
+                    budget=budgets.get(route, default_budget),
+                )
+            )
+    finally:
+        client.raise_request_exception = raise_request_exception
+    return results
+
+
+def assert_query_budgets(client, **kwargs) -> list[BudgetResult]:
+    """Like ``check_query_budgets`` but raise ``AssertionError`` listing every route over budget."""
+    results = check_query_budgets(client, **kwargs)
+    failures = [result for result in results if result.over_budget or result.status_code >= 500]
+    if failures:
+        lines = [
+            f"{result.route} {result.path}: {result.queries} queries (budget {result.budget}, "
+            f"status {result.status_code})"
+            for result in failures
+        ]
+        raise AssertionError("Query budget exceeded:\n" + "\n".join(lines))
+    return results
@@ -0,0 +1,628 @@
+from collections.abc import Iterable
+from decimal import ROUND_HALF_UP, Decimal
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+from django.utils import timezone
+
+from accounting.models import (
+    Account,
+    AnalyticAccount,
+    AnalyticDistributionModel,
+    AnalyticDistributionModelLine,
+    AnalyticLine,
+    Company,
+    InvoiceLine,
+    Journal,
+    MoveLine,
+    MoveLineAnalyticDistribution,
+    Partner,
+    Product,
+)
+from accounting.models.analytics import parse_analytic_distribution
+from accounting.services.cache_service import shared_cache_configured
+
+_AMOUNT_PRECISION = Decimal("0.000001")
+_HUNDRED = Decimal("100")
+_MAX_TOTAL = Decimal("100.000001")
+_DEFAULT_DISTRIBUTION_ACCOUNT_TYPES = {"income", "expense"}
+
+
+def _line_distribution(move_line: MoveLine) -> dict[int, Decimal]:
+    distribution = parse_analytic_distribution(move_line.analytic_distribution)
+    if not distribution and move_line.analytic_account_id:
+        distribution = {move_line.analytic_account_id: _HUNDRED}
+    return distribution
+
+
+def _line_errors(move_line: MoveLine, distribution: dict[int, Decimal], account_companies: dict[int, int]) -> list[str]:
+    errors = []
+    company_id = move_line.move.company_id
+    for account_id in distribution:
+        if account_companies.get(account_id) != company_id:
+            errors.append(f"Analytic account {account_id} is invalid for this company.")
+    total = sum(distribution.values(), Decimal("0"))
+    if total <= 0 or total > _MAX_TOTAL:
+        errors.append("Analytic distribution total must be > 0 and <= 100.")
+    return errors
+
+
+def build_analytic_lines(move_lines: Iterable[MoveLine]) -> tuple[list[AnalyticLine], dict[int, list[str]]]:
+    """Expand journal item distributions into unsaved ``AnalyticLine`` objects.
+
+    Every referenced analytic account is validated with a single ``id__in``
+    query. Returns ``(analytic_lines, errors)`` where ``errors`` maps move
+    line ids to messages; lines with errors produce no analytic lines.
+    Move lines must have ``move`` loaded (``select_related("move")``).
+    """
+    distributions = []
+    for move_line in move_lines:
+        distribution = _line_distribution(move_line)
+        if distribution:
+            distributions.append((move_line, distribution))
+
+    account_ids = {account_id for _, distribution in distributions for account_id in distribution}
+    account_companies = dict(
+        AnalyticAccount.objects.filter(id__in=account_ids).values_list("id", "company_id")
+    ) if account_ids else {}
+
+    analytic_lines: list[AnalyticLine] = []
+    errors: dict[int, list[str]] = {}
+    for move_line, distribution in distributions:
+        line_errors = _line_errors(move_line, distribution, account_companies)
+        if line_errors:
+            errors[move_line.id] = line_errors
+            continue
+
+        move = move_line.move
+        # Analytic amounts follow the usual sign convention: costs are negative.
+        balance = move_line.credit - move_line.debit
+        for account_id, percentage in distribution.items():
+            analytic_lines.append(
+                AnalyticLine(
+                    company_id=move.company_id,
+                    name=move_line.name or move.reference or move.name or f"Move {move.id}",
+                    date=move_line.date,
+                    amount=(balance * percentage / _HUNDRED).quantize(_AMOUNT_PRECISION, rounding=ROUND_HALF_UP),
+                    ref=move.reference,
+                    partner_id=move_line.partner_id,
+                    journal_id=move.journal_id,
+                    move_line_id=move_line.id,
+                    general_account_id=move_line.account_id,
+                    analytic_account_id=account_id,
+                    auto_account_id=account_id,
+                    analytic_distribution={str(account_id): 100.0},
+                )
+            )
+    return analytic_lines, errors
+
+
+def generate_analytic_lines(
+    move_lines: Iterable[MoveLine],
+    *,
+    replace: bool = True,
+    batch_size: int = 1000,
+) -> dict:
+    """Create the analytic lines of posted journal items in bulk.
+
+    With ``replace`` the existing analytic lines of these journal items are
+    deleted first (one query), so re-posting a move does not duplicate them.
+    Journal items whose distribution is invalid are skipped and reported.
+    """
+    move_lines = list(move_lines)
+    analytic_lines, errors = build_analytic_lines(move_lines)
+
+    deleted = 0
+    if replace and move_lines:
+        deleted, _ = AnalyticLine.objects.filter(move_line_id__in=[line.id for line in move_lines]).delete()
+    AnalyticLine.objects.bulk_create(analytic_lines, batch_size=batch_size)
+
+    return {
+        "move_lines": len(move_lines),
+        "deleted": deleted,
+        "created": len(analytic_lines),
+        "errors": {str(line_id): messages for line_id, messages in errors.items()},
+    }
+
+
+def generate_move_analytic_lines(*, move) -> dict:
+    """Analytic lines for every journal item of ``move``; invalid distributions block posting.
+
+    Journal items without analytics first receive the company's default
+    distribution (see ``apply_default_distributions_to_move_lines``).
+    """
+    move_lines = list(move.lines.select_related("account").all())
+    apply_default_distributions_to_move_lines(move_lines, company_id=move.company_id)
+    analytic_lines, errors = build_analytic_lines(move_lines)
+    if errors:
+        raise ValidationError(
+            {
+                "analytic_distribution": [
+                    f"Line {line_id}: {message}" for line_id, messages in errors.items() for message in messages
+                ]
+            }
+        )
+    deleted, _ = AnalyticLine.objects.filter(move_line__move=move).delete()
+    AnalyticLine.objects.bulk_create(analytic_lines)
+    return {"deleted": deleted, "created": len(analytic_lines)}
+
+
+def remove_move_analytic_lines(*, move) -> int:
+    deleted, _ = AnalyticLine.objects.filter(move_line__move=move).delete()
+    return deleted
+
+
+class DistributionModelMatcher:
+    """In-memory matcher compiled from a company's active distribution models.
+
+    A model applies when every criterion it sets matches the line: its
+    ``account_prefix`` is a prefix of the account code (looked up in a
+    character trie), its partner and its product category equal the line's
+    (hash maps keyed by id). Among applicable models the one setting the most
+    criteria wins, then the longest prefix, then the lowest id. Results are
+    memoized per ``(account_code, partner_id, category_id)`` key.
+    """
+
+    def __init__(self, models: Iterable[AnalyticDistributionModel]):
+        self._trie: dict = {}
+        self._any_prefix: set[int] = set()
+        self._by_partner: dict[int, set[int]] = {}
+        self._any_partner: set[int] = set()
+        self._by_category: dict[int, set[int]] = {}
+        self._any_category: set[int] = set()
+        self._rank: dict[int, tuple] = {}
+        self._distributions: dict[int, dict[str, float]] = {}
+        self._memo: dict[tuple, dict[str, float] | None] = {}
+
+        for model in models:
+            distribution = {
+                str(line.analytic_account_id): float(line.percentage) for line in model.lines.all()
+            }
+            if not distribution:
+                continue
+            self._distributions[model.id] = distribution
+
+            if model.account_prefix:
+                node = self._trie
+                for char in model.account_prefix:
+                    node = node.setdefault(char, {})
+                node.setdefault(None, set()).add(model.id)
+            else:
+                self._any_prefix.add(model.id)
+            if model.partner_id:
+                self._by_partner.setdefault(model.partner_id, set()).add(model.id)
+            else:
+                self._any_partner.add(model.id)
+            if model.product_category_id:
+                self._by_category.setdefault(model.product_category_id, set()).add(model.id)
+            else:
+                self._any_category.add(model.id)
+
+            criteria = bool(model.account_prefix) + bool(model.partner_id) + bool(model.product_category_id)
+            self._rank[model.id] = (-criteria, -len(model.account_prefix), model.id)
+
+    def __bool__(self) -> bool:
+        return bool(self._distributions)
+
+    def _prefix_matches(self, account_code: str) -> set[int]:
+        matches = set(self._any_prefix)
+        node = self._trie
+        for char in account_code or "":
+            node = node.get(char)
+            if node is None:
+                break
+            matches.update(node.get(None, ()))
+        return matches
+
+    def match(self, *, account_code: str = "", partner_id: int | None = None, category_id: int | None = None):
+        """Return a copy of the winning model's distribution, or ``None``."""
+        key = (account_code, partner_id, category_id)
+        if key not in self._memo:
+            candidates = self._prefix_matches(account_code)
+            if candidates:
+                candidates &= self._any_partner | self._by_partner.get(partner_id, set())
+            if candidates:
+                candidates &= self._any_category | self._by_category.get(category_id, set())
+            self._memo[key] = self._distributions[min(candidates, key=self._rank.__getitem__)] if candidates else None
+        distribution = self._memo[key]
+        return dict(distribution) if distribution is not None else None
+
+
+_compiled_matchers: dict[int, tuple[str, DistributionModelMatcher]] = {}
+
+
+def _matcher_version_key(company_id: int) -> str:
+    return f"accounting:analytic-distribution-matcher:version:{company_id}"
+
+
+def invalidate_distribution_matcher(company_id: int | None) -> None:
+    """Force every process to recompile the company's matcher on next use."""
+    if company_id is None:
+        return
+    cache.set(_matcher_version_key(company_id), uuid4().hex, None)
+    _compiled_matchers.pop(company_id, None)
+
+
+def _matcher_database_version(company_id: int) -> str:
+    # Without a shared cache other processes never see a rotated token: the
+    # models' row counts and latest update stand in for it.
+    values = AnalyticDistributionModel.objects.filter(company_id=company_id).aggregate(
+        model_count=Count("id", distinct=True),
+        line_count=Count("lines", distinct=True),
+        model_updated=Max("updated_at"),
+        line_updated=Max("lines__updated_at"),
+    )
+    return repr(sorted(values.items()))
+
+
+def get_distribution_matcher(company_id: int) -> DistributionModelMatcher:
+    """Compiled matcher of ``company_id``, rebuilt only after an invalidation.
+
+    The compiled object lives in process memory; a version token in the
+    shared cache tells each process when its copy is stale. Without a shared
+    cache (see ``shared_cache_configured``) the version is read from the
+    distribution model rows instead.
+    """
+    if shared_cache_configured():
+        version_key = _matcher_version_key(company_id)
+        version = cache.get(version_key)
+        if version is None:
+            version = uuid4().hex
+            cache.set(version_key, version, None)
+    else:
+        version = _matcher_database_version(company_id)
+
+    compiled = _compiled_matchers.get(company_id)
+    if compiled is not None and compiled[0] == version:
+        return compiled[1]
+
+    models = AnalyticDistributionModel.objects.filter(company_id=company_id, active=True).prefetch_related(
+        Prefetch("lines", queryset=AnalyticDistributionModelLine.objects.order_by("id"))
+    )
+    matcher = DistributionModelMatcher(models)
+    _compiled_matchers[company_id] = (version, matcher)
+    return matcher
+
+
+def apply_default_distributions_to_move_lines(
+    move_lines: Iterable[MoveLine],
+    *,
+    company_id: int,
+    save: bool = True,
+) -> list[MoveLine]:
+    """Fill ``analytic_distribution`` of journal items that have no analytics yet.
+
+    Only income and expense items are considered, so receivable, payable and
+    tax counterparts never carry a default distribution. Move lines need
+    ``account`` loaded. Returns the changed lines; with ``save`` they are
+    written with one ``bulk_update`` and the normalized distribution table
+    is resynced.
+    """
+    matcher = get_distribution_matcher(company_id)
+    if not matcher:
+        return []
+
+    changed = []
+    for move_line in move_lines:
+        if move_line.analytic_distribution or move_line.analytic_account_id:
+            continue
+        if move_line.account.account_type not in _DEFAULT_DISTRIBUTION_ACCOUNT_TYPES:
+            continue
+        distribution = matcher.match(account_code=move_line.account.code, partner_id=move_line.partner_id)
+        if distribution:
+            move_line.analytic_distribution = distribution
+            changed.append(move_line)
+
+    if save and changed:
+        MoveLine.objects.bulk_update(changed, ["analytic_distribution"], batch_size=1000)
+        MoveLineAnalyticDistribution.sync_for_lines(changed)
+    return changed
+
+
+def apply_default_distributions_to_invoice_lines(
+    invoice_lines: Iterable[InvoiceLine],
+    *,
+    company_id: int,
+    partner_id: int | None = None,
+    save: bool = True,
+) -> list[InvoiceLine]:
+    """Fill ``analytic_distribution`` of invoice lines that have none yet.
+
+    Invoice lines need ``account`` and ``product`` loaded; ``partner_id``
+    defaults to each line's invoice partner. Returns the changed lines;
+    with ``save`` they are written with one ``bulk_update``.
+    """
+    matcher = get_distribution_matcher(company_id)
+    if not matcher:
+        return []
+
+    changed = []
+    for invoice_line in invoice_lines:
+        if invoice_line.analytic_distribution:
+            continue
+        distribution = matcher.match(
+            account_code=invoice_line.account.code,
+            partner_id=partner_id if partner_id is not None else invoice_line.move.partner_id,
+            category_id=invoice_line.product.category_id if invoice_line.product_id else None,
+        )
+        if distribution:
+            invoice_line.analytic_distribution = distribution
+            changed.append(invoice_line)
+
+    if save and changed:
+        InvoiceLine.objects.bulk_update(changed, ["analytic_distribution"], batch_size=1000)
+    return changed
+
+
+# Bulk analytic items ---------------------------------------------------------
+
+ANALYTIC_LINE_SCALAR_FIELDS = ("name", "date", "amount", "unit_amount", "uom_name", "ref", "project", "task")
+ANALYTIC_LINE_RELATION_FIELDS = (
+    "company",
+    "partner",
+    "product",
+    "journal",
+    "move_line",
+    "general_account",
+    "analytic_account",
+)
+
+
+class _AnalyticLineLookups:
+    """Company/ownership maps for every id referenced by a batch, one query per model."""
+
+    def __init__(self, values_list: list[dict], company_queryset=None):
+        ids: dict[str, set[int]] = {field: set() for field in ANALYTIC_LINE_RELATION_FIELDS}
+        for values in values_list:
+            for field in ANALYTIC_LINE_RELATION_FIELDS:
+                if values.get(f"{field}_id"):
+                    ids[field].add(values[f"{field}_id"])
+            ids["analytic_account"].update(parse_analytic_distribution(values.get("analytic_distribution")))
+
+        companies = company_queryset if company_queryset is not None else Company.objects.all()
+        self.companies = set(companies.filter(id__in=ids["company"]).values_list("id", flat=True))
+        self.move_lines = {
+            row[0]: {"company_id": row[1], "account_id": row[2], "partner_id": row[3]}
+            for row in MoveLine.objects.filter(id__in=ids["move_line"]).values_list(
+                "id", "move__company_id", "account_id", "partner_id"
+            )
+        }
+        self.analytic_accounts = {
+            row[0]: {"company_id": row[1], "partner_id": row[2]}
+            for row in AnalyticAccount.objects.filter(id__in=ids["analytic_account"]).values_list(
+                "id", "company_id", "partner_id"
+            )
+        }
+        # Values computed on save (general account, partner) come from the
+        # move lines and analytic accounts loaded above.
+        for move_line in self.move_lines.values():
+            ids["general_account"].add(move_line["account_id"])
+            if move_line["partner_id"]:
+                ids["partner"].add(move_line["partner_id"])
+        for account in self.analytic_accounts.values():
+            if account["partner_id"]:
+                ids["partner"].add(account["partner_id"])
+
+        self.partners = dict(Partner.objects.filter(id__in=ids["partner"]).values_list("id", "company_id"))
+        self.products = dict(Product.objects.filter(id__in=ids["product"]).values_list("id", "company_id"))
+        self.journals = dict(Journal.objects.filter(id__in=ids["journal"]).values_list("id", "company_id"))
+        self.general_accounts = dict(
+            Account.objects.filter(id__in=ids["general_account"]).values_list("id", "company_id")
+        )
+
+
+def _parse_analytic_line_row(row: dict, base: dict) -> tuple[dict, dict]:
+    """Merge ``row`` over ``base`` field values, converting like ``full_clean`` does."""
+    values = dict(base)
+    errors: dict[str, str] = {}
+    for field_name in ANALYTIC_LINE_SCALAR_FIELDS:
+        if field_name not in row:
+            continue
+        field = AnalyticLine._meta.get_field(field_name)
+        try:
+            values[field_name] = field.clean(row[field_name], None)
+        except ValidationError as exc:
+            errors[field_name] = "; ".join(exc.messages)
+    for field_name in ANALYTIC_LINE_RELATION_FIELDS:
+        if field_name not in row:
+            continue
+        raw = row[field_name]
+        if raw in (None, ""):
+            values[f"{field_name}_id"] = None
+            continue
+        try:
+            values[f"{field_name}_id"] = int(raw)
+        except (TypeError, ValueError):
+            errors[field_name] = "Must be an id."
+    if "analytic_distribution" in row:
+        values["analytic_distribution"] = row["analytic_distribution"] if row["analytic_distribution"] is not None else {}
+    return values, errors
+
+
+def _validate_analytic_line_values(values: dict, lookups: _AnalyticLineLookups) -> dict:
+    """Apply the ``AnalyticLine.save()`` computations and ``clean()`` rules in memory."""
+    errors: dict[str, str] = {}
+    company_id = values.get("company_id")
+    if not company_id or company_id not in lookups.companies:
+        return {"company": "Company not found."}
+    if not values.get("name"):
+        errors["name"] = "This field cannot be blank."
+
+    for field, mapping in (
+        ("partner", lookups.partners),
+        ("product", lookups.products),
+        ("journal", lookups.journals),
+        ("general_account", lookups.general_accounts),
+    ):
+        related_id = values.get(f"{field}_id")
+        if related_id and related_id not in mapping:
+            errors[field] = f"Invalid pk \"{related_id}\" - object does not exist."
+    move_line = lookups.move_lines.get(values.get("move_line_id"))
+    if values.get("move_line_id") and move_line is None:
+        errors["move_line"] = f"Invalid pk \"{values['move_line_id']}\" - object does not exist."
+    analytic_account = lookups.analytic_accounts.get(values.get("analytic_account_id"))
+    if values.get("analytic_account_id") and analytic_account is None:
+        errors["analytic_account"] = f"Invalid pk \"{values['analytic_account_id']}\" - object does not exist."
+    if errors:
+        return errors
+
+    # Same order as AnalyticLine.save(): general account, partner, auto account,
+    # distribution and its inverse.
+    if move_line is not None:
+        values["general_account_id"] = move_line["account_id"]
+    if not values.get("partner_id"):
+        if move_line is not None and move_line["partner_id"]:
+            values["partner_id"] = move_line["partner_id"]
+        elif analytic_account is not None and analytic_account["partner_id"]:
+            values["partner_id"] = analytic_account["partner_id"]
+    values["auto_account_id"] = values.get("analytic_account_id")
+    distribution = values.get("analytic_distribution")
+    if values.get("analytic_account_id") and not distribution:
+        values["analytic_distribution"] = distribution = {str(values["analytic_account_id"]): 100.0}
+    if distribution and isinstance(distribution, dict) and len(distribution) == 1:
+        try:
+            values["analytic_account_id"] = int(next(iter(distribution)))
+        except (TypeError, ValueError):
+            pass
+
+    # Same rules as AnalyticLine.clean().
+    analytic_account = lookups.analytic_accounts.get(values.get("analytic_account_id"))
+    if analytic_account is not None and analytic_account["company_id"] != company_id:
+        return {"analytic_account": "Analytic account company must match analytic item company."}
+    if values.get("general_account_id") and lookups.general_accounts[values["general_account_id"]] != company_id:
+        return {"general_account": "Financial account company must match analytic item company."}
+    if move_line is not None and move_line["company_id"] != company_id:
+        return {"move_line": "Journal item company must match analytic item company."}
+    if values.get("partner_id") and lookups.partners[values["partner_id"]] != company_id:
+        return {"partner": "Partner company must match analytic item company."}
+    if values.get("product_id") and lookups.products[values["product_id"]] != company_id:
+        return {"product": "Product company must match analytic item company."}
+    if values.get("journal_id") and lookups.journals[values["journal_id"]] != company_id:
+        return {"journal": "Journal company must match analytic item company."}
+
+    if distribution and not isinstance(distribution, dict):
+        return {"analytic_distribution": "Analytic distribution must be an object."}
+    if distribution:
+        total = Decimal("0")
+        for key, pct in distribution.items():
+            try:
+                account = lookups.analytic_accounts.get(int(key))
+            except (TypeError, ValueError):
+                return {"analytic_distribution": "Analytic distribution keys must be analytic account ids."}
+            if account is None or account["company_id"] != company_id:
+                return {"analytic_distribution": "Analytic distribution contains invalid analytic account."}
+            try:
+                total += Decimal(str(pct))
+            except ArithmeticError:
+                return {"analytic_distribution": "Analytic distribution percentages must be numbers."}
+        if total <= 0 or total > _MAX_TOTAL:
+            return {"analytic_distribution": "Analytic distribution total must be > 0 and <= 100."}
+    return {}
+
+
+_ANALYTIC_LINE_DEFAULTS = {
+    "name": "",
+    "amount": Decimal("0"),
+    "unit_amount": Decimal("0"),
+    "uom_name": "",
+    "ref": "",
+    "project": "",
+    "task": "",
+    "analytic_distribution": {},
+}
+_ANALYTIC_LINE_WRITE_FIELDS = [
+    *ANALYTIC_LINE_SCALAR_FIELDS,
+    *(f"{field}_id" for field in ANALYTIC_LINE_RELATION_FIELDS),
+    "auto_account_id",
+    "analytic_distribution",
+]
+
+
+def bulk_save_analytic_lines(
+    rows: list[dict],
+    *,
+    updatable=None,
+    companies=None,
+    atomic: bool = False,
+    batch_size: int = 1000,
+) -> dict:
+    """Validate and write a batch of analytic items with bulk queries.
+
+    Rows without ``id`` are created, rows with ``id`` update that item; only
+    items in the ``updatable`` queryset can be updated and only companies in
+    the ``companies`` queryset can be written to. Every referenced
+    record is loaded once per batch, the ``AnalyticLine`` save/clean rules
+    run in memory, and valid rows are written with ``bulk_create`` /
+    ``bulk_update``. With ``atomic`` nothing is written if any row fails.
+    """
+    update_ids = set()
+    for row in rows:
+        if isinstance(row, dict) and row.get("id") not in (None, ""):
+            try:
+                update_ids.add(int(row["id"]))
+            except (TypeError, ValueError):
+                pass
+    queryset = updatable if updatable is not None else AnalyticLine.objects.all()
+    existing = queryset.in_bulk(list(update_ids)) if update_ids else {}
+
+    parsed: list[tuple[int, AnalyticLine | None, dict]] = []
+    errors: list[dict] = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({"index": index, "errors": {"non_field_errors": "Must be an object."}})
+            continue
+        instance = None
+        base = {"date": timezone.localdate(), **_ANALYTIC_LINE_DEFAULTS}
+        if row.get("id") not in (None, ""):
+            try:
+                instance = existing.get(int(row["id"]))
+            except (TypeError, ValueError):
+                instance = None
+            if instance is None:
+                errors.append({"index": index, "errors": {"id": "Analytic item not found."}})
+                continue
+            base = {field: getattr(instance, field) for field in _ANALYTIC_LINE_WRITE_FIELDS}
+        values, row_errors = _parse_analytic_line_row(row, base)
+        if row_errors:
+            errors.append({"index": index, "errors": row_errors})
+            continue
+        parsed.append((index, instance, values))
+
+    lookups = _AnalyticLineLookups([values for _, _, values in parsed], companies)
+    to_create: list[AnalyticLine] = []
+    to_update: list[AnalyticLine] = []
+    for index, instance, values in parsed:
+        row_errors = _validate_analytic_line_values(values, lookups)
+        if row_errors:
+            errors.append({"index": index, "errors": row_errors})
+            continue
+        if instance is None:
+            to_create.append(AnalyticLine(**values))
+        else:
+            for field, value in values.items():
+                setattr(instance, field, value)
+            to_update.append(instance)
+
+    errors.sort(key=lambda item: item["index"])
+    if atomic and errors:
+        return {"created": 0, "updated": 0, "ids": [], "errors": errors}
+
+    with transaction.atomic():
+        created = AnalyticLine.objects.bulk_create(to_create, batch_size=batch_size)
+        if to_update:
+            now = timezone.now()
+            for instance in to_update:
+                instance.updated_at = now
+            AnalyticLine.objects.bulk_update(
+                to_update, [*_ANALYTIC_LINE_WRITE_FIELDS, "updated_at"], batch_size=batch_size
+            )
+
+    return {
+        "created": len(created),
+        "updated": len(to_update),
+        "ids": [line.id for line in created],
+        "errors": errors,
+    }
@@ -0,0 +1,400 @@
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from accounting.models import Account, Asset, AssetModel, Company, Currency, Journal, Partner
+from accounting.services.asset_service import generate_depreciation_boards
+from accounting.services.report_service import invalidate_depreciation_forecast
+
+ASSET_IMPORT_COLUMNS = (
+    "name",
+    "code",
+    "model",
+    "acquisition_date",
+    "first_depreciation_date",
+    "original_value",
+    "salvage_value",
+    "method",
+    "method_number",
+    "method_period",
+    "prorata",
+    "asset_account",
+    "depreciation_account",
+    "expense_account",
+    "journal",
+    "currency",
+    "partner_id",
+    "state",
+    "note",
+)
+IMPORTABLE_STATES = {"draft", "running"}
+_METHODS = {choice for choice, _ in Asset.METHOD_CHOICES}
+_TRUE = {"1", "true", "yes", "y"}
+_FALSE = {"0", "false", "no", "n"}
+
+
+def read_asset_rows(stream, fmt: str) -> Iterator[tuple[int, dict]]:
+    """Yield ``(row_number, row)`` pairs from a CSV or JSON text stream.
+
+    CSV rows are read lazily and numbered like a spreadsheet (header is
+    row 1). JSON must be a list of objects, numbered from 1.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        if reader.fieldnames is None:
+            raise ValueError("CSV has no header.")
+        if "name" not in reader.fieldnames:
+            raise ValueError("CSV is missing required column: name")
+        for row_number, row in enumerate(reader, start=2):
+            yield row_number, row
+    elif fmt == "json":
+        yield from iter_json_asset_rows(json.load(stream))
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def iter_json_asset_rows(payload) -> Iterator[tuple[int, dict]]:
+    if not isinstance(payload, list):
+        raise ValueError("JSON payload must be a list of asset objects.")
+    for row_number, row in enumerate(payload, start=1):
+        yield row_number, row if isinstance(row, dict) else {"__invalid__": row}
+
+
+def open_text_stream(binary_stream) -> io.TextIOWrapper:
+    return io.TextIOWrapper(binary_stream, encoding="utf-8-sig", newline="")
+
+
+def _text(row: dict, key: str) -> str:
+    value = row.get(key)
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _parse_date(value: str, field: str, errors: dict) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        errors[field] = "Use YYYY-MM-DD format."
+        return None
+
+
+def _parse_decimal(value: str, field: str, errors: dict) -> Decimal | None:
+    if not value:
+        return None
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        errors[field] = "Must be a decimal number."
+        return None
+    if not number.is_finite():
+        errors[field] = "Must be a finite decimal number."
+        return None
+    # The model field's max_digits/decimal_places: SQLite would round
+    # silently and PostgreSQL would abort the whole import.
+    try:
+        Asset._meta.get_field(field).run_validators(number)
+    except ValidationError as exc:
+        errors[field] = " ".join(exc.messages)
+        return None
+    return number
+
+
+def _parse_positive_int(value: str, field: str, errors: dict) -> int | None:
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        errors[field] = "Must be an integer."
+        return None
+    if number <= 0:
+        errors[field] = "Must be greater than zero."
+        return None
+    return number
+
+
+def _parse_bool(value: str, field: str, errors: dict) -> bool | None:
+    normalized = value.lower()
+    if not normalized:
+        return None
+    if normalized in _TRUE:
+        return True
+    if normalized in _FALSE:
+        return False
+    errors[field] = "Must be a boolean."
+    return None
+
+
+class _ChunkLookups:
+    """Per-chunk maps of referenced records, each loaded with one query."""
+
+    def __init__(self, company: Company, rows: list[tuple[int, dict]]):
+        account_codes = set()
+        journal_codes = set()
+        currency_codes = set()
+        partner_ids = set()
+        asset_codes = set()
+        for _, row in rows:
+            for field in ("asset_account", "depreciation_account", "expense_account"):
+                if _text(row, field):
+                    account_codes.add(_text(row, field))
+            if _text(row, "journal"):
+                journal_codes.add(_text(row, "journal"))
+            if _text(row, "currency"):
+                currency_codes.add(_text(row, "currency").upper())
+            if _text(row, "partner_id").isdigit():
+                partner_ids.add(int(_text(row, "partner_id")))
+            if _text(row, "code"):
+                asset_codes.add(_text(row, "code"))
+
+        self.accounts = {
+            account.code: account
+            for account in Account.objects.filter(company=company, code__in=account_codes)
+        } if account_codes else {}
+        self.journals = {
+            journal.code: journal
+            for journal in Journal.objects.filter(company=company, code__in=journal_codes)
+        } if journal_codes else {}
+        self.currencies = {
+            currency.code: currency
+            for currency in Currency.objects.filter(code__in=currency_codes)
+        } if currency_codes else {}
+        self.partner_ids = set(
+            Partner.objects.filter(company=company, id__in=partner_ids).values_list("id", flat=True)
+        ) if partner_ids else set()
+        self.existing_codes = set(
+            Asset.objects.filter(company=company, code__in=asset_codes).values_list("code", flat=True)
+        ) if asset_codes else set()
+
+
+def _asset_models(company: Company) -> dict[str, AssetModel]:
+    """All asset models of the company keyed by id and by name, in one query."""
+    models_by_ref: dict[str, AssetModel] = {}
+    queryset = AssetModel.objects.filter(company=company).select_related(
+        "account_asset",
+        "account_depreciation",
+        "account_expense",
+        "journal",
+    )
+    for asset_model in queryset:
+        models_by_ref[str(asset_model.id)] = asset_model
+        models_by_ref[asset_model.name] = asset_model
+    return models_by_ref
+
+
+def _build_asset(
+    company: Company,
+    row: dict,
+    asset_models: dict[str, AssetModel],
+    lookups: _ChunkLookups,
+    seen_codes: set[str],
+) -> tuple[Asset | None, dict]:
+    errors: dict[str, str] = {}
+    if "__invalid__" in row:
+        return None, {"row": "Must be an object."}
+
+    name = _text(row, "name")
+    if not name:
+        errors["name"] = "This field is required."
+
+    code = _text(row, "code") or None
+    if code:
+        if code in seen_codes or code in lookups.existing_codes:
+            errors["code"] = "Asset code already exists for this company."
+
+    asset_model = None
+    model_ref = _text(row, "model")
+    if model_ref:
+        asset_model = asset_models.get(model_ref)
+        if asset_model is None:
+            errors["model"] = f"Asset model '{model_ref}' not found."
+        elif not asset_model.active:
+            errors["model"] = f"Asset model '{model_ref}' is archived."
+            asset_model = None
+
+    def account(field: str, model_attr: str):
+        ref = _text(row, field)
+        if ref:
+            resolved = lookups.accounts.get(ref)
+            if resolved is None:
+                errors[field] = f"Account '{ref}' not found."
+            return resolved
+        if asset_model is not None:
+            return getattr(asset_model, model_attr)
+        errors[field] = "This field is required when no asset model is given."
+        return None
+
+    asset_account = account("asset_account", "account_asset")
+    depreciation_account = account("depreciation_account", "account_depreciation")
+    expense_account = account("expense_account", "account_expense")
+
+    journal = asset_model.journal if asset_model is not None else None
+    journal_ref = _text(row, "journal")
+    if journal_ref:
+        journal = lookups.journals.get(journal_ref)
+        if journal is None:
+            errors["journal"] = f"Journal '{journal_ref}' not found."
+
+    currency = None
+    currency_ref = _text(row, "currency").upper()
+    if currency_ref:
+        currency = lookups.currencies.get(currency_ref)
+        if currency is None:
+            errors["currency"] = f"Currency '{currency_ref}' not found."
+
+    partner_id = None
+    partner_ref = _text(row, "partner_id")
+    if partner_ref:
+        if partner_ref.isdigit() and int(partner_ref) in lookups.partner_ids:
+            partner_id = int(partner_ref)
+        else:
+            errors["partner_id"] = f"Partner '{partner_ref}' not found."
+
+    method = _text(row, "method") or (asset_model.method if asset_model is not None else "linear")
+    if method not in _METHODS:
+        errors["method"] = f"Unknown depreciation method: '{method}'."
+
+    method_number = _parse_positive_int(_text(row, "method_number"), "method_number", errors)
+    if method_number is None and asset_model is not None:
+        method_number = asset_model.method_number
+    method_period = _parse_positive_int(_text(row, "method_period"), "method_period", errors)
+    if method_period is None and asset_model is not None:
+        method_period = asset_model.method_period_months
+    prorata = _parse_bool(_text(row, "prorata"), "prorata", errors)
+    if prorata is None:
+        prorata = asset_model.prorata if asset_model is not None else False
+
+    acquisition_date = _parse_date(_text(row, "acquisition_date"), "acquisition_date", errors)
+    if acquisition_date is None and "acquisition_date" not in errors:
+        errors["acquisition_date"] = "This field is required."
+    first_depreciation_date = _parse_date(
+        _text(row, "first_depreciation_date"), "first_depreciation_date", errors
+    )
+
+    original_value = _parse_decimal(_text(row, "original_value"), "original_value", errors)
+    if original_value is None and "original_value" not in errors:
+        errors["original_value"] = "This field is required."
+    salvage_value = _parse_decimal(_text(row, "salvage_value"), "salvage_value", errors)
+    if salvage_value is None:
+        salvage_value = Decimal("0")
+
+    state = _text(row, "state") or "draft"
+    if state not in IMPORTABLE_STATES:
+        errors["state"] = "Imported assets must be draft or running."
+
+    # Same rules as Asset.clean(); company consistency holds by construction
+    # because every lookup above is scoped to the company.
+    if original_value is not None:
+        if original_value <= 0:
+            errors["original_value"] = "Original value must be greater than zero."
+        elif salvage_value < 0:
+            errors["salvage_value"] = "Salvage value cannot be negative."
+        elif salvage_value >= original_value:
+            errors["salvage_value"] = "Salvage value must be lower than original value."
+    if first_depreciation_date and acquisition_date and first_depreciation_date < acquisition_date:
+        errors["first_depreciation_date"] = "First depreciation date cannot be before acquisition date."
+
+    if errors:
+        return None, errors
+
+    if code:
+        seen_codes.add(code)
+    asset = Asset(
+        company=company,
+        name=name,
+        code=code,
+        model=asset_model,
+        partner_id=partner_id,
+        currency=currency,
+        asset_account=asset_account,
+        depreciation_account=depreciation_account,
+        expense_account=expense_account,
+        journal=journal,
+        acquisition_date=acquisition_date,
+        first_depreciation_date=first_depreciation_date,
+        original_value=original_value,
+        salvage_value=salvage_value,
+        method=method,
+        method_number=method_number if method_number is not None else 5,
+        method_period=method_period if method_period is not None else 12,
+        prorata=prorata,
+        state=state,
+        note=_text(row, "note"),
+    )
+    return asset, {}
+
+
+def import_assets(
+    *,
+    company: Company,
+    rows: Iterable[tuple[int, dict]],
+    generate_boards: bool = False,
+    chunk_size: int = 500,
+) -> dict:
+    """Validate and bulk insert assets from ``(row_number, row)`` pairs.
+
+    Rows are processed in chunks: referenced accounts, journals, currencies,
+    partners and existing codes are loaded once per chunk, asset models once
+    per import. Invalid rows are skipped and reported with their row number;
+    valid rows are inserted with ``bulk_create``. When ``generate_boards`` is
+    set, depreciation boards of the inserted assets are generated in the same
+    batch.
+    """
+    asset_models = _asset_models(company)
+    seen_codes: set[str] = set()
+    summary = {
+        "rows": 0,
+        "created": 0,
+        "boards": 0,
+        "depreciation_lines": 0,
+        "errors": [],
+    }
+
+    iterator = iter(rows)
+    with transaction.atomic():
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            summary["rows"] += len(chunk)
+            lookups = _ChunkLookups(company, chunk)
+
+            to_create: list[Asset] = []
+            row_numbers: list[int] = []
+            for row_number, row in chunk:
+                asset, errors = _build_asset(company, row, asset_models, lookups, seen_codes)
+                if errors:
+                    summary["errors"].append({"row": row_number, "errors": errors})
+                    continue
+                to_create.append(asset)
+                row_numbers.append(row_number)
+
+            created = Asset.objects.bulk_create(to_create, batch_size=chunk_size)
+            summary["created"] += len(created)
+
+            if generate_boards and created:
+                stats = generate_depreciation_boards(created, batch_size=chunk_size)
+                summary["boards"] += stats["assets"]
+                summary["depreciation_lines"] += stats["created"]
+                row_by_asset = {str(asset.id): number for asset, number in zip(created, row_numbers)}
+                for asset_id, message in stats["errors"].items():
+                    summary["errors"].append(
+                        {"row": row_by_asset[asset_id], "errors": {"depreciation": message}}
+                    )
+
+        if summary["created"]:
+            # bulk_create skips post_save, so the forecast cache is dropped here.
+            transaction.on_commit(lambda: invalidate_depreciation_forecast(company.id))
+
+    summary["errors"].sort(key=lambda item: item["row"])
+    return summary
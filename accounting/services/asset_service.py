@@ -1,8 +1,12 @@
+from array import array
+from collections.abc import Iterable
+from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
 
 from dateutil.relativedelta import relativedelta
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Count
 
 from accounting.models import Asset, AssetDepreciationLine, Move, MoveLine
 
@@ -11,30 +15,35 @@ from accounting.models import Asset, AssetDepreciationLine, Move, MoveLine
 # HELPERS
 # ══════════════════════════════════════════════════════════════
 
+# الحسابات كلها بتتعمل بـ integers بوحدة 0.000001 (نفس دقة الـ DecimalField)
+# عشان تبقى exact ومن غير Decimal context في الـ loops.
+_MICRO = 1_000_000
+_ZERO = Decimal("0")
+
+
 def _round(value: Decimal) -> Decimal:
     """تقريب لـ 6 خانات عشرية — نفس الـ DecimalField في الموديل"""
     return value.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
 
 
-# ══════════════════════════════════════════════════════════════
-# STEP 1 — حساب جدول الإهلاك (بدون حفظ في الداتابيز)
-# ══════════════════════════════════════════════════════════════
+def _to_micro(value: Decimal) -> int:
+    return int((Decimal(value) * _MICRO).to_integral_value(rounding=ROUND_HALF_UP))
 
-def compute_depreciation_board(asset: Asset) -> list[dict]:
-    """
-    يحسب جدول الإهلاك الكامل ويرجعه كـ list of dicts.
-    مش بيحفظ أي حاجة — بس بيحسب.
 
-    يدعم:
-      - linear    : إهلاك قسط ثابت
-      - degressive: إهلاك متناقص (Double Declining Balance)
-    """
+def _from_micro(value: int) -> Decimal:
+    return Decimal(value).scaleb(-6)
+
+
+def _div_half_up(numerator: int, denominator: int) -> int:
+    """قسمة integers موجبة مع تقريب ROUND_HALF_UP — زي _round بالظبط."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def _validate_for_board(asset: Asset) -> None:
     if asset.original_value <= 0:
         raise ValidationError("Original value must be positive.")
 
-    depreciable = _round(asset.original_value - asset.salvage_value)
-
-    if depreciable <= 0:
+    if _round(asset.original_value - asset.salvage_value) <= 0:
         raise ValidationError(
             "Nothing to depreciate: original_value equals salvage_value."
         )
@@ -42,63 +51,158 @@ def compute_depreciation_board(asset: Asset) -> list[dict]:
     if asset.method_number <= 0:
         raise ValidationError("method_number must be greater than zero.")
 
-    start_date = asset.first_depreciation_date or asset.acquisition_date
-    lines: list[dict] = []
+    if asset.method not in {"linear", "degressive"}:
+        raise ValidationError(f"Unknown depreciation method: '{asset.method}'.")
 
-    # ── Linear ──────────────────────────────────────────────────
-    if asset.method == "linear":
-        amount_per = _round(depreciable / Decimal(asset.method_number))
-        depreciated_so_far = Decimal("0")
 
-        for seq in range(1, asset.method_number + 1):
-            # آخر سطر: نحط الباقي بالضبط عشان نتجنب فروق التقريب
-            if seq == asset.method_number:
-                amount = _round(depreciable - depreciated_so_far)
+def _prorata_fraction(asset: Asset, start_date: date) -> tuple[int, int]:
+    """
+    نسبة الفترة الأولى (numerator, denominator) لو prorata مفعّل.
+
+    first_depreciation_date هو نهاية الفترة الأولى، والأصل بيتهلك من
+    acquisition_date لحد التاريخ ده بس. لو مفيش first_depreciation_date
+    أو الفترة كاملة → (1, 1) يعني من غير prorata.
+    """
+    if not asset.prorata or not asset.first_depreciation_date:
+        return 1, 1
+
+    period_start = start_date - relativedelta(months=asset.method_period)
+    total_days = (start_date - period_start).days
+    used_days = (start_date - asset.acquisition_date).days + 1
+    if total_days <= 0 or used_days <= 0 or used_days >= total_days:
+        return 1, 1
+    return used_days, total_days
+
+
+def _board_amounts(
+    method: str,
+    depreciable: int,
+    method_number: int,
+    fraction: tuple[int, int],
+) -> array:
+    """
+    يحسب مبالغ الجدول كـ array('q') بوحدة micro.
+
+    - الفترة الأولى بتتضرب في نسبة الـ prorata.
+    - لو في prorata بيتزود سطر في الآخر بباقي الفترة الأولى.
+    - آخر سطر دايماً = الباقي بالظبط (rounding reconciliation).
+    """
+    frac_num, frac_den = fraction
+    partial = frac_num != frac_den
+    line_count = method_number + (1 if partial else 0)
+    amounts = array("q", [0]) * line_count
+
+    if method == "linear":
+        amount_per = _div_half_up(depreciable, method_number)
+        first = _div_half_up(amount_per * frac_num, frac_den) if partial else amount_per
+        amounts[0] = first
+        for idx in range(1, line_count - 1):
+            amounts[idx] = amount_per
+        # آخر سطر: نحط الباقي بالضبط عشان نتجنب فروق التقريب
+        amounts[line_count - 1] = depreciable - sum(amounts[: line_count - 1])
+    else:
+        # معدل = (1 / عدد الفترات) * 2 — متقرب لـ 6 خانات زي الأول
+        rate = _div_half_up(2 * _MICRO, method_number)
+        residual = depreciable
+        for idx in range(line_count - 1):
+            if idx == 0 and partial:
+                amount = _div_half_up(residual * rate * frac_num, _MICRO * frac_den)
             else:
-                amount = amount_per
+                amount = _div_half_up(residual * rate, _MICRO)
+            amount = min(amount, residual)
+            amounts[idx] = amount
+            residual -= amount
+        # آخر سطر: نمسح الباقي كله
+        amounts[line_count - 1] = residual
+
+    if any(amount < 0 for amount in amounts):
+        raise ValidationError(
+            "Depreciable value is too small for the number of depreciation periods."
+        )
+    return amounts
 
-            residual = _round(depreciable - depreciated_so_far - amount)
 
-            lines.append({
-                "sequence":          seq,
-                "date":              start_date + relativedelta(months=asset.method_period * (seq - 1)),
-                "amount":            amount,
-                "depreciated_value": _round(depreciated_so_far),
-                "residual_value":    max(residual, Decimal("0")),
-            })
+def _board_lines(asset: Asset, date_cache: dict | None = None) -> list[dict]:
+    start_date = asset.first_depreciation_date or asset.acquisition_date
+    depreciable = _to_micro(_round(asset.original_value - asset.salvage_value))
+    amounts = _board_amounts(
+        asset.method,
+        depreciable,
+        asset.method_number,
+        _prorata_fraction(asset, start_date),
+    )
 
-            depreciated_so_far += amount
+    lines: list[dict] = []
+    depreciated_so_far = 0
+    for idx, amount in enumerate(amounts):
+        # السطور اللي مبلغها صفر (مثلاً degressive خلّص بدري) مش بتتسجل
+        if amount == 0:
+            continue
+        months = asset.method_period * idx
+        if date_cache is None:
+            line_date = start_date + relativedelta(months=months)
+        else:
+            key = (start_date, months)
+            line_date = date_cache.get(key)
+            if line_date is None:
+                line_date = date_cache[key] = start_date + relativedelta(months=months)
+
+        lines.append({
+            "sequence":          len(lines) + 1,
+            "date":              line_date,
+            "amount":            _from_micro(amount),
+            "depreciated_value": _from_micro(depreciated_so_far),
+            "residual_value":    _from_micro(depreciable - depreciated_so_far - amount),
+        })
+        depreciated_so_far += amount
+    return lines
 
-    # ── Degressive (Double Declining Balance) ───────────────────
-    elif asset.method == "degressive":
-        # معدل = (1 / عدد الفترات) * 2
-        rate = _round(Decimal("2") / Decimal(asset.method_number))
-        residual = depreciable
-        depreciated_so_far = Decimal("0")
 
-        for seq in range(1, asset.method_number + 1):
-            # آخر سطر: نمسح الباقي كله
-            if seq == asset.method_number:
-                amount = _round(residual)
-            else:
-                amount = _round(residual * rate)
+def _invalidate_forecasts(company_ids: Iterable[int]) -> None:
+    # bulk_create / queryset.delete مش بيبعتوا signals، فلازم نمسح الـ cache بإيدينا
+    from accounting.services.report_service import invalidate_depreciation_forecast
 
-            residual = _round(residual - amount)
+    for company_id in set(company_ids):
+        transaction.on_commit(lambda company_id=company_id: invalidate_depreciation_forecast(company_id))
 
-            lines.append({
-                "sequence":          seq,
-                "date":              start_date + relativedelta(months=asset.method_period * (seq - 1)),
-                "amount":            amount,
-                "depreciated_value": _round(depreciated_so_far),
-                "residual_value":    max(residual, Decimal("0")),
-            })
 
-            depreciated_so_far += amount
+# ══════════════════════════════════════════════════════════════
+# STEP 1 — حساب جدول الإهلاك (بدون حفظ في الداتابيز)
+# ══════════════════════════════════════════════════════════════
 
-    else:
-        raise ValidationError(f"Unknown depreciation method: '{asset.method}'.")
+def compute_depreciation_board(asset: Asset) -> list[dict]:
+    """
+    يحسب جدول الإهلاك الكامل ويرجعه كـ list of dicts.
+    مش بيحفظ أي حاجة — بس بيحسب.
 
-    return lines
+    يدعم:
+      - linear    : إهلاك قسط ثابت
+      - degressive: إهلاك متناقص (Double Declining Balance)
+      - prorata   : الفترة الأولى بتتحسب بالأيام من acquisition_date
+    """
+    _validate_for_board(asset)
+    return _board_lines(asset)
+
+
+def compute_depreciation_boards(assets: Iterable[Asset]) -> tuple[dict[int, list[dict]], dict[int, str]]:
+    """
+    نفس compute_depreciation_board بس لمجموعة أصول في pass واحد.
+
+    بيرجع (boards, errors):
+      - boards: asset_id → list of dicts
+      - errors: asset_id → رسالة الخطأ للأصول اللي مينفعش تتحسب
+    """
+    boards: dict[int, list[dict]] = {}
+    errors: dict[int, str] = {}
+    date_cache: dict = {}
+
+    for asset in assets:
+        try:
+            _validate_for_board(asset)
+            boards[asset.id] = _board_lines(asset, date_cache)
+        except ValidationError as exc:
+            errors[asset.id] = "; ".join(exc.messages)
+    return boards, errors
 
 
 # ══════════════════════════════════════════════════════════════
@@ -128,24 +232,82 @@ def generate_depreciation_lines(asset: Asset) -> dict:
             "Reset posted lines before recomputing."
         )
 
+    # احسب الجدول قبل ما نمسح حاجة
+    board = compute_depreciation_board(asset)
+
     # امسح الـ draft القديمة بس
     deleted_count, _ = asset.depreciation_lines.filter(state="draft").delete()
 
-    # احسب الجدول
-    board = compute_depreciation_board(asset)
+    # احفظ في الداتابيز — السطور محسوبة من الـ engine فمش محتاجة full_clean
+    AssetDepreciationLine.objects.bulk_create(
+        [AssetDepreciationLine(asset=asset, state="draft", **line_data) for line_data in board]
+    )
+    _invalidate_forecasts([asset.company_id])
+
+    return {
+        "deleted": deleted_count,
+        "created": len(board),
+        "total_depreciation": str(sum((d["amount"] for d in board), _ZERO)),
+    }
+
+
+@transaction.atomic
+def generate_depreciation_boards(assets: Iterable[Asset], *, batch_size: int = 1000) -> dict:
+    """
+    نسخة الـ batch من generate_depreciation_lines:
+      - query واحدة للـ posted lines
+      - delete واحد للـ draft lines القديمة
+      - bulk_create لكل السطور الجديدة
+
+    الأصول اللي مينفعش تتحسب (closed / cancelled / عندها posted lines)
+    بتترجع في errors ومش بتوقف الباقي.
+    """
+    assets = list(assets)
+    errors: dict[int, str] = {}
+
+    posted_counts = dict(
+        AssetDepreciationLine.objects.filter(asset_id__in=[a.id for a in assets], state="posted")
+        .values("asset_id")
+        .annotate(count=Count("id"))
+        .values_list("asset_id", "count")
+    )
 
-    # احفظ في الداتابيز
-    created_count = 0
-    for line_data in board:
-        line = AssetDepreciationLine(asset=asset, state="draft", **line_data)
-        line.full_clean()
-        line.save()
-        created_count += 1
+    eligible = []
+    for asset in assets:
+        if asset.state in {"closed", "cancelled"}:
+            errors[asset.id] = "Cannot compute depreciation for a closed or cancelled asset."
+        elif posted_counts.get(asset.id):
+            errors[asset.id] = (
+                f"Asset has {posted_counts[asset.id]} posted depreciation line(s). "
+                "Reset posted lines before recomputing."
+            )
+        else:
+            eligible.append(asset)
+
+    boards, board_errors = compute_depreciation_boards(eligible)
+    errors.update(board_errors)
+
+    deleted_count = 0
+    if boards:
+        deleted_count, _ = AssetDepreciationLine.objects.filter(
+            asset_id__in=list(boards.keys()),
+            state="draft",
+        ).delete()
+
+    new_lines = [
+        AssetDepreciationLine(asset_id=asset_id, state="draft", **line_data)
+        for asset_id, board in boards.items()
+        for line_data in board
+    ]
+    AssetDepreciationLine.objects.bulk_create(new_lines, batch_size=batch_size)
+    _invalidate_forecasts({asset.company_id for asset in eligible if asset.id in boards})
 
     return {
+        "assets": len(boards),
         "deleted": deleted_count,
-        "created": created_count,
-        "total_depreciation": str(sum(d["amount"] for d in board)),
+        "created": len(new_lines),
+        "total_depreciation": str(sum((line.amount for line in new_lines), _ZERO)),
+        "errors": {str(asset_id): message for asset_id, message in errors.items()},
     }
 
 
@@ -229,6 +391,8 @@ def post_depreciation_line(line: AssetDepreciationLine) -> dict:
     line.state = "posted"
     line.full_clean()
     line.save()
+    # Depreciation lines send no forecast signal: invalidate once here.
+    _invalidate_forecasts([asset.company_id])
 
     return {
         "line_id":  line.id,
@@ -0,0 +1,24 @@
+from django.conf import settings
+
+# Backends every worker process (and host) reads from.
+SHARED_CACHE_BACKENDS = {
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+    "django_redis.cache.RedisCache",
+}
+
+
+def shared_cache_configured() -> bool:
+    """Whether the default cache is shared by every worker.
+
+    Company access, session info, analytic matcher versions and depreciation
+    forecasts are invalidated on write through the default cache, so they are
+    cached across requests only when that invalidation reaches every process:
+    a Redis or Memcached backend, or ``ACCOUNTING_SHARED_CACHE = True`` for
+    another shared one. Otherwise they are read from the database.
+    """
+    override = getattr(settings, "ACCOUNTING_SHARED_CACHE", None)
+    if override is not None:
+        return bool(override)
+    return settings.CACHES.get("default", {}).get("BACKEND") in SHARED_CACHE_BACKENDS
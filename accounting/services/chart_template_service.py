@@ -1,91 +1,207 @@
+from collections import defaultdict
+
 from django.db import transaction
+from django.db.models import Q
 
 from accounting.models import Account, AccountGroup, AccountGroupTemplate, AccountTemplate, Company, Country
 
+BULK_BATCH_SIZE = 1000
+GROUP_VALUE_FIELDS = ("name", "parent_id")
+ACCOUNT_VALUE_FIELDS = ("group_id", "name", "account_type", "reconcile", "deprecated")
 
-def apply_chart_template_to_company(*, company: Company, country: Country) -> dict:
-    """Apply country chart templates into a company chart of accounts.
 
-    The operation is idempotent by natural keys:
-    - groups: (company, code_prefix_start, code_prefix_end)
-    - accounts: (company, code)
-    """
+def group_template_levels(template_groups) -> list[list]:
+    """Split group templates into levels, parents before children.
 
-    groups_created = 0
-    groups_updated = 0
-    accounts_created = 0
-    accounts_updated = 0
+    Raises ``ValueError`` when a parent is missing or the tree has a cycle.
+    """
+    by_id = {template.id: template for template in template_groups}
+    depth = {}
+    for template in template_groups:
+        path = []
+        current = template
+        while current.id not in depth:
+            if current in path:
+                raise ValueError(f"Cycle in template group tree at template ID {current.id}.")
+            path.append(current)
+            if current.parent_id is None:
+                depth[current.id] = 0
+                break
+            parent = by_id.get(current.parent_id)
+            if parent is None:
+                unresolved_ids = ", ".join(str(item.id) for item in path)
+                raise ValueError(
+                    f"Could not resolve template group parent tree for country={template.country_id}. "
+                    f"Unresolved template IDs: {unresolved_ids}"
+                )
+            current = parent
+        for item in reversed(path):
+            if item.id not in depth:
+                depth[item.id] = depth[item.parent_id] + 1
+
+    levels = defaultdict(list)
+    for template in template_groups:
+        levels[depth[template.id]].append(template)
+    return [levels[level] for level in sorted(levels)]
+
+
+def _upsert(model, instances, unique_fields, value_fields) -> None:
+    if not instances:
+        return
+    update_fields = [field.removesuffix("_id") for field in value_fields] + ["updated_at"]
+    model.objects.bulk_create(
+        instances,
+        batch_size=BULK_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=list(unique_fields),
+        update_fields=update_fields,
+    )
+
+
+@transaction.atomic
+def apply_chart_templates(assignments) -> list[dict]:
+    """Apply country chart templates to many companies in one pass.
+
+    ``assignments`` is an iterable of ``(company, country)``. Templates and
+    the existing charts of all companies are loaded with one query per
+    table; new and changed groups are upserted one tree level at a time
+    (children need their parent's id) and accounts in chunks, so the query
+    count depends on the tree depth, not on the number of companies or rows.
+
+    Idempotent by natural keys, like ``apply_chart_template_to_company``.
+    Returns one stats dict per assignment, in order.
+    """
+    assignments = [(company, country) for company, country in assignments]
+    if not assignments:
+        return []
+    company_ids = {company.id for company, _country in assignments}
+    country_ids = {country.id for _company, country in assignments}
+
+    group_templates_by_country = defaultdict(list)
+    for template in AccountGroupTemplate.objects.filter(country_id__in=country_ids).order_by(
+        "parent_id", "code_prefix_start", "id"
+    ):
+        group_templates_by_country[template.country_id].append(template)
+    account_templates_by_country = defaultdict(list)
+    for template in AccountTemplate.objects.filter(country_id__in=country_ids).order_by("code"):
+        account_templates_by_country[template.country_id].append(template)
+    levels_by_country = {
+        country_id: group_template_levels(templates) for country_id, templates in group_templates_by_country.items()
+    }
 
-    with transaction.atomic():
-        template_groups = list(
-            AccountGroupTemplate.objects.filter(country=country)
-            .select_related("parent")
-            .order_by("parent_id", "code_prefix_start", "id")
+    existing_groups = {
+        (row[1], row[2], row[3]): (row[0], tuple(row[4:]))
+        for row in AccountGroup.objects.filter(company_id__in=company_ids).values_list(
+            "id", "company_id", "code_prefix_start", "code_prefix_end", *GROUP_VALUE_FIELDS
         )
+    }
+    existing_accounts = {
+        (row[1], row[2]): (row[0], tuple(row[3:]))
+        for row in Account.objects.filter(company_id__in=company_ids).values_list(
+            "id", "company_id", "code", *ACCOUNT_VALUE_FIELDS
+        )
+    }
 
-        template_group_to_group = {}
-        pending = template_groups[:]
-
-        while pending:
-            next_pending = []
-            progressed = False
-
-            for template_group in pending:
-                if template_group.parent_id and template_group.parent_id not in template_group_to_group:
-                    next_pending.append(template_group)
+    stats = [
+        {
+            "company_id": company.id,
+            "country_id": country.id,
+            "groups_created": 0,
+            "groups_updated": 0,
+            "accounts_created": 0,
+            "accounts_updated": 0,
+        }
+        for company, country in assignments
+    ]
+    # (company id, template group id) -> company group id
+    group_ids = {}
+
+    max_depth = max((len(levels) for levels in levels_by_country.values()), default=0)
+    for depth in range(max_depth):
+        pending = []
+        seen = set()
+        for index, (company, country) in enumerate(assignments):
+            levels = levels_by_country.get(country.id, [])
+            if depth >= len(levels):
+                continue
+            for template in levels[depth]:
+                key = (company.id, template.code_prefix_start, template.code_prefix_end)
+                if key in seen:
                     continue
-
-                parent = template_group_to_group.get(template_group.parent_id)
-                group, created = AccountGroup.objects.update_or_create(
-                    company=company,
-                    code_prefix_start=template_group.code_prefix_start,
-                    code_prefix_end=template_group.code_prefix_end,
-                    defaults={
-                        "name": template_group.name,
-                        "parent": parent,
-                    },
+                seen.add(key)
+                parent_id = group_ids.get((company.id, template.parent_id)) if template.parent_id else None
+                values = (template.name, parent_id)
+                current = existing_groups.get(key)
+                stats[index]["groups_updated" if current else "groups_created"] += 1
+                if current and current[1] == values:
+                    group_ids[(company.id, template.id)] = current[0]
+                    continue
+                group = AccountGroup(
+                    company_id=company.id,
+                    code_prefix_start=template.code_prefix_start,
+                    code_prefix_end=template.code_prefix_end,
+                    name=template.name,
+                    parent_id=parent_id,
                 )
-                template_group_to_group[template_group.id] = group
-                progressed = True
-
-                if created:
-                    groups_created += 1
-                else:
-                    groups_updated += 1
+                pending.append((template.id, key, group))
 
-            if not progressed:
-                unresolved_ids = ", ".join(str(item.id) for item in next_pending)
-                raise ValueError(
-                    f"Could not resolve template group parent tree for country={country.code}. "
-                    f"Unresolved template IDs: {unresolved_ids}"
+        _upsert(
+            AccountGroup,
+            [group for _template_id, _key, group in pending],
+            ("company", "code_prefix_start", "code_prefix_end"),
+            GROUP_VALUE_FIELDS,
+        )
+        missing = [item for item in pending if item[2].pk is None]
+        if missing:
+            # Backends that cannot return ids from an upsert: read them back.
+            lookup = Q()
+            for _template_id, (company_id, start, end), _group in missing:
+                lookup |= Q(company_id=company_id, code_prefix_start=start, code_prefix_end=end)
+            found = {
+                (row[1], row[2], row[3]): row[0]
+                for row in AccountGroup.objects.filter(lookup).values_list(
+                    "id", "company_id", "code_prefix_start", "code_prefix_end"
+                )
+            }
+            for _template_id, key, group in missing:
+                group.pk = found[key]
+        for template_id, key, group in pending:
+            group_ids[(key[0], template_id)] = group.pk
+
+    pending_accounts = []
+    seen = set()
+    for index, (company, country) in enumerate(assignments):
+        for template in account_templates_by_country.get(country.id, []):
+            key = (company.id, template.code)
+            if key in seen:
+                continue
+            seen.add(key)
+            group_id = group_ids.get((company.id, template.group_id)) if template.group_id else None
+            values = (group_id, template.name, template.account_type, template.reconcile, template.deprecated)
+            current = existing_accounts.get(key)
+            stats[index]["accounts_updated" if current else "accounts_created"] += 1
+            if current and current[1] == values:
+                continue
+            pending_accounts.append(
+                Account(
+                    company_id=company.id,
+                    code=template.code,
+                    group_id=group_id,
+                    name=template.name,
+                    account_type=template.account_type,
+                    reconcile=template.reconcile,
+                    deprecated=template.deprecated,
                 )
-
-            pending = next_pending
-
-        for template_account in AccountTemplate.objects.filter(country=country).select_related("group").order_by("code"):
-            group = template_group_to_group.get(template_account.group_id)
-            account, created = Account.objects.update_or_create(
-                company=company,
-                code=template_account.code,
-                defaults={
-                    "group": group,
-                    "name": template_account.name,
-                    "account_type": template_account.account_type,
-                    "reconcile": template_account.reconcile,
-                    "deprecated": template_account.deprecated,
-                },
             )
+    _upsert(Account, pending_accounts, ("company", "code"), ACCOUNT_VALUE_FIELDS)
+    return stats
 
-            if created:
-                accounts_created += 1
-            else:
-                accounts_updated += 1
-
-    return {
-        "company_id": company.id,
-        "country_id": country.id,
-        "groups_created": groups_created,
-        "groups_updated": groups_updated,
-        "accounts_created": accounts_created,
-        "accounts_updated": accounts_updated,
-    }
+
+def apply_chart_template_to_company(*, company: Company, country: Country) -> dict:
+    """Apply country chart templates into a company chart of accounts.
+
+    The operation is idempotent by natural keys:
+    - groups: (company, code_prefix_start, code_prefix_end)
+    - accounts: (company, code)
+    """
+    return apply_chart_templates([(company, country)])[0]
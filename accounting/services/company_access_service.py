@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db import transaction
+
+from accounting.models import UserCompanyAccess
+from accounting.services.cache_service import shared_cache_configured
+
+COMPANY_ACCESS_CACHE_TIMEOUT = 60
+_REQUEST_ATTR = "_accounting_company_access"
+
+
+@dataclass(frozen=True)
+class CompanyAccess:
+    """Company ids a user may see, as stored on ``UserCompanyAccess``."""
+
+    exists: bool = False
+    current_company_id: int | None = None
+    active_company_ids: tuple[int, ...] = ()
+    allowed_company_ids: tuple[int, ...] = ()
+
+    @property
+    def default_company_ids(self) -> list[int]:
+        """Companies used when a request does not pass ``company_id(s)``."""
+        return list(self.active_company_ids or self.allowed_company_ids)
+
+
+def _cache_key(user_id: int) -> str:
+    return f"accounting:company-access:{user_id}"
+
+
+def _load_company_access(user_id: int) -> CompanyAccess:
+    access = UserCompanyAccess.objects.filter(user_id=user_id).only("id", "current_company_id").first()
+    if access is None:
+        return CompanyAccess()
+    through = UserCompanyAccess.active_companies.through
+    active_ids = through.objects.filter(usercompanyaccess_id=access.id).values_list("company_id", flat=True)
+    allowed_through = UserCompanyAccess.allowed_companies.through
+    allowed_ids = allowed_through.objects.filter(usercompanyaccess_id=access.id).values_list("company_id", flat=True)
+    return CompanyAccess(
+        exists=True,
+        current_company_id=access.current_company_id,
+        active_company_ids=tuple(sorted(active_ids)),
+        allowed_company_ids=tuple(sorted(allowed_ids)),
+    )
+
+
+def get_company_access(request, user=None) -> CompanyAccess:
+    """Return the company access of ``user`` (default: the request user).
+
+    Memoized on the request. With a shared cache (see
+    ``shared_cache_configured``) it is also kept across requests for
+    ``COMPANY_ACCESS_CACHE_TIMEOUT`` seconds.
+    """
+    user = user if user is not None else getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return CompanyAccess()
+
+    # Store on the underlying HttpRequest so DRF request wrappers share it.
+    http_request = getattr(request, "_request", request)
+    memo = getattr(http_request, _REQUEST_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(http_request, _REQUEST_ATTR, memo)
+    if user.id in memo:
+        return memo[user.id]
+
+    if not shared_cache_configured():
+        access = _load_company_access(user.id)
+    else:
+        access = cache.get(_cache_key(user.id))
+        if access is None:
+            access = _load_company_access(user.id)
+            cache.set(_cache_key(user.id), access, COMPANY_ACCESS_CACHE_TIMEOUT)
+    memo[user.id] = access
+    return access
+
+
+def share_company_access(source_request, target_request) -> None:
+    """Let ``target_request`` reuse the company access memoized on ``source_request``."""
+    source = getattr(source_request, "_request", source_request)
+    memo = getattr(source, _REQUEST_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(source, _REQUEST_ATTR, memo)
+    setattr(getattr(target_request, "_request", target_request), _REQUEST_ATTR, memo)
+
+
+def invalidate_company_access(user_id: int | None, *, request=None) -> None:
+    """Drop the cached company access of ``user_id``, now and after commit."""
+    if user_id is None:
+        return
+    if request is not None:
+        memo = getattr(getattr(request, "_request", request), _REQUEST_ATTR, None)
+        if memo:
+            memo.pop(user_id, None)
+    key = _cache_key(user_id)
+    cache.delete(key)
+    # A concurrent request may re-cache the old rows before this transaction
+    # commits; deleting again on commit closes that window.
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,224 @@
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounting.models import (
+    Account,
+    AccountGroup,
+    AccountingSettings,
+    AccountRoot,
+    Company,
+    Country,
+    Currency,
+    FiscalPosition,
+    FiscalPositionAccountMap,
+    FiscalPositionTaxMap,
+    Journal,
+    JournalGroup,
+    PaymentTerm,
+    PaymentTermLine,
+    Tax,
+    TaxGroup,
+    TaxRepartitionLine,
+)
+from accounting.services.chart_template_service import apply_chart_templates
+from accounting.services.session_cache_service import (
+    invalidate_all_session_info,
+    invalidate_company_session_info,
+)
+
+
+# Configuration copied by clone_company, in dependency order, with the
+# lookup from each model to its company.
+CLONE_PLAN = (
+    (AccountRoot, "company"),
+    (AccountGroup, "company"),
+    (Account, "company"),
+    (JournalGroup, "company"),
+    (Journal, "company"),
+    (PaymentTerm, "company"),
+    (PaymentTermLine, "payment_term__company"),
+    (TaxGroup, "company"),
+    (Tax, "company"),
+    (TaxRepartitionLine, "tax__company"),
+    (FiscalPosition, "company"),
+    (FiscalPositionTaxMap, "fiscal_position__company"),
+    (FiscalPositionAccountMap, "fiscal_position__company"),
+    (AccountingSettings, "company"),
+)
+# Company fields that are not copied to a clone.
+CLONE_COMPANY_EXCLUDE = {"id", "name", "code", "legal_name", "vat", "lock_date", "created_at", "updated_at"}
+CLONE_BATCH_SIZE = 1000
+
+
+@dataclass
+class CompanySpec:
+    name: str
+    country: Country | None = None
+    currency: Currency | None = None
+
+
+def unique_company_name(base_name: str, taken: set[str]) -> str:
+    name = (base_name or "").strip() or "New Company"
+    if name not in taken:
+        return name
+    index = 2
+    while f"{name} {index}" in taken:
+        index += 1
+    return f"{name} {index}"
+
+
+def unique_company_code(company_name: str, taken: set[str]) -> str:
+    normalized = "".join(ch for ch in (company_name or "").upper() if ch.isalnum())
+    base = normalized[:8] or "COMP"
+    code = base
+    index = 1
+    while code in taken:
+        suffix = str(index)
+        code = f"{base[: max(1, 8 - len(suffix))]}{suffix}"
+        index += 1
+    return code
+
+
+@transaction.atomic
+def provision_companies(specs, *, apply_chart_template: bool = False) -> list[Company]:
+    """Create companies with their accounting settings in one pass.
+
+    Names and codes are made unique against existing companies and against
+    each other, then companies and settings are bulk inserted. With
+    ``apply_chart_template`` the chart of each company's country is applied
+    through ``apply_chart_templates`` for all companies at once.
+    """
+    specs = list(specs)
+    if not specs:
+        return []
+    taken_names = set()
+    taken_codes = set()
+    for name, code in Company.objects.values_list("name", "code"):
+        taken_names.add(name)
+        taken_codes.add(code)
+
+    companies = []
+    for spec in specs:
+        name = unique_company_name(spec.name, taken_names)
+        code = unique_company_code(name, taken_codes)
+        taken_names.add(name)
+        taken_codes.add(code)
+        companies.append(Company(name=name, code=code, legal_name=name, country=spec.country))
+    Company.objects.bulk_create(companies)
+    if any(company.pk is None for company in companies):
+        ids_by_code = dict(Company.objects.filter(code__in=[c.code for c in companies]).values_list("code", "id"))
+        for company in companies:
+            company.pk = ids_by_code[company.code]
+
+    settings_objs = [
+        AccountingSettings(
+            company=company,
+            country_code=(spec.country.code if spec.country else ""),
+            fiscal_localization_country=spec.country,
+            chart_template_country=spec.country,
+            account_fiscal_country=spec.country,
+            currency=spec.currency,
+        )
+        for company, spec in zip(companies, specs)
+    ]
+    AccountingSettings.objects.bulk_create(settings_objs)
+
+    if apply_chart_template:
+        stats = apply_chart_templates([(company, company.country) for company in companies if company.country])
+        charted_ids = [item["company_id"] for item in stats if item["accounts_created"] or item["accounts_updated"]]
+        if charted_ids:
+            AccountingSettings.objects.filter(company_id__in=charted_ids).update(
+                has_chart_of_accounts=True, updated_at=timezone.now()
+            )
+
+    # Bulk inserts send no post_save: do what the Company receiver would.
+    invalidate_all_session_info()
+    return companies
+
+
+def _self_reference_levels(rows, attname: str) -> list[list]:
+    # Parents before children, for models pointing at themselves.
+    ids = {row.pk for row in rows}
+    placed = set()
+    levels = []
+    remaining = rows
+    while remaining:
+        level = [row for row in remaining if getattr(row, attname) not in ids or getattr(row, attname) in placed]
+        if not level:
+            # A cycle: no order works, insert the rest together.
+            level = remaining
+        placed.update(row.pk for row in level)
+        levels.append(level)
+        remaining = [row for row in remaining if row.pk not in placed]
+    return levels
+
+
+def _clone_rows(model, rows, id_maps: dict, company_id: int) -> None:
+    relations = [field for field in model._meta.concrete_fields if field.is_relation]
+    self_refs = [field.attname for field in relations if field.related_model is model]
+    levels = _self_reference_levels(rows, self_refs[0]) if self_refs else [rows]
+    id_map = id_maps.setdefault(model, {})
+    for level in levels:
+        old_ids = []
+        for row in level:
+            old_ids.append(row.pk)
+            row.pk = None
+            for field in relations:
+                value = getattr(row, field.attname)
+                if field.related_model is Company:
+                    setattr(row, field.attname, company_id)
+                elif value is not None and field.related_model in id_maps:
+                    # Rows of the source company map to their clones; shared
+                    # rows (countries, currencies) keep their id.
+                    setattr(row, field.attname, id_maps[field.related_model].get(value))
+        if connection.features.can_return_rows_from_bulk_insert:
+            model.objects.bulk_create(level, batch_size=CLONE_BATCH_SIZE)
+        else:
+            for row in level:
+                row.save(force_insert=True)
+        id_map.update(zip(old_ids, (row.pk for row in level)))
+
+
+@transaction.atomic
+def clone_company(source: Company, *, name: str, code: str | None = None) -> tuple[Company, dict]:
+    """Create a company with the configuration of ``source``.
+
+    Chart of accounts, journals, payment terms, taxes, fiscal positions and
+    accounting settings are copied in ``CLONE_PLAN`` order: each model is
+    read with one query and bulk inserted, and foreign keys are remapped
+    through in-memory old-id -> new-id maps. Transactions (moves,
+    payments, partners, products) are not copied.
+
+    Returns the new company and ``{model label: rows copied}``.
+    """
+    taken_names = set()
+    taken_codes = set()
+    for existing_name, existing_code in Company.objects.values_list("name", "code"):
+        taken_names.add(existing_name)
+        taken_codes.add(existing_code)
+    if code and code in taken_codes:
+        raise ValueError(f"Company code {code} already exists.")
+    company_name = unique_company_name(name, taken_names)
+    company_code = code or unique_company_code(company_name, taken_codes)
+    company_values = {
+        field.attname: getattr(source, field.attname)
+        for field in Company._meta.concrete_fields
+        if field.name not in CLONE_COMPANY_EXCLUDE
+    }
+    company = Company.objects.create(name=company_name, code=company_code, legal_name=company_name, **company_values)
+
+    id_maps = {}
+    stats = {}
+    for model, company_lookup in CLONE_PLAN:
+        rows = list(model.objects.filter(**{company_lookup: source.id}).order_by("id"))
+        if rows:
+            _clone_rows(model, rows, id_maps, company.id)
+        else:
+            id_maps.setdefault(model, {})
+        stats[model._meta.model_name] = len(rows)
+
+    # Bulk inserts send no post_save: do what the settings receiver would.
+    invalidate_company_session_info(company.id)
+    return company, stats
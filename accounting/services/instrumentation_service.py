@@ -0,0 +1,99 @@
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+from django.db import connections
+
+_stats_lock = threading.Lock()
+_route_stats: dict[str, "RouteStats"] = {}
+
+
+@dataclass
+class RouteStats:
+    """Running totals for one ``view_name:action`` route."""
+
+    count: int = 0
+    queries: int = 0
+    max_queries: int = 0
+    db_seconds: float = 0.0
+    total_seconds: float = 0.0
+    max_total_seconds: float = 0.0
+    errors: int = 0
+
+    def as_dict(self, route: str) -> dict:
+        count = max(self.count, 1)
+        return {
+            "route": route,
+            "count": self.count,
+            "errors": self.errors,
+            "queries_avg": round(self.queries / count, 2),
+            "queries_max": self.max_queries,
+            "db_ms_avg": round(self.db_seconds / count * 1000, 3),
+            "total_ms_avg": round(self.total_seconds / count * 1000, 3),
+            "total_ms_max": round(self.max_total_seconds * 1000, 3),
+        }
+
+
+class QueryCounter:
+    """Count queries and database time on every connection while active."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+        return False
+
+
+def record_request(route: str, *, queries: int, db_seconds: float, total_seconds: float, status_code: int) -> None:
+    with _stats_lock:
+        stats = _route_stats.setdefault(route, RouteStats())
+        stats.count += 1
+        stats.queries += queries
+        stats.max_queries = max(stats.max_queries, queries)
+        stats.db_seconds += db_seconds
+        stats.total_seconds += total_seconds
+        stats.max_total_seconds = max(stats.max_total_seconds, total_seconds)
+        if status_code >= 500:
+            stats.errors += 1
+
+
+def get_request_stats() -> list[dict]:
+    """Per-route stats of this process, slowest average first."""
+    with _stats_lock:
+        rows = [stats.as_dict(route) for route, stats in _route_stats.items()]
+    return sorted(rows, key=lambda row: row["total_ms_avg"], reverse=True)
+
+
+def reset_request_stats() -> None:
+    with _stats_lock:
+        _route_stats.clear()
+
+
+def resolve_route_name(request) -> str | None:
+    """``view_name:action`` for the resolved view of ``request``, if any."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    method = request.method.lower()
+    actions = getattr(match.func, "actions", None)
+    action = actions.get(method, method) if actions else method
+    return f"{match.view_name or match._func_path}:{action}"
@@ -5,12 +5,15 @@ from django.db import transaction
 from django.utils import timezone
 
 from accounting.models import Move, MoveLine
+from accounting.services.analytic_service import apply_default_distributions_to_invoice_lines
+from accounting.services.metrics_service import timed_service
 from accounting.services.move_service import post_move
 
 
 INVOICE_MOVE_TYPES = {"out_invoice", "in_invoice", "out_refund", "in_refund"}
 
 
+@timed_service("generate_journal_lines_and_post_invoice")
 @transaction.atomic
 def generate_journal_lines_and_post_invoice(*, invoice: Move) -> dict:
     if invoice.move_type not in INVOICE_MOVE_TYPES:
@@ -18,9 +21,14 @@ def generate_journal_lines_and_post_invoice(*, invoice: Move) -> dict:
     if invoice.state != "draft":
         raise ValidationError("Only draft invoices can be posted.")
 
-    invoice_lines = list(invoice.invoice_lines.select_related("account", "tax", "tax__account").all())
+    invoice_lines = list(invoice.invoice_lines.select_related("account", "tax", "tax__account", "product").all())
     if not invoice_lines:
         raise ValidationError("Cannot post invoice without invoice lines.")
+    apply_default_distributions_to_invoice_lines(
+        invoice_lines,
+        company_id=invoice.company_id,
+        partner_id=invoice.partner_id,
+    )
 
     counterpart_account = invoice.journal.default_account
     if not counterpart_account:
@@ -54,6 +62,7 @@ def generate_journal_lines_and_post_invoice(*, invoice: Move) -> dict:
                 partner=invoice.partner,
                 currency=invoice.currency,
                 tax=line.tax,
+                analytic_distribution=line.analytic_distribution or {},
                 name=line.name,
                 date=invoice.date,
                 debit=debit,
@@ -137,10 +146,12 @@ def reverse_invoice_to_credit_note(*, invoice: Move, date=None, reason: str = ""
         reversed_entry=invoice,
     )
 
-    for line in invoice.invoice_lines.select_related("account", "tax").all():
+    for line in invoice.invoice_lines.select_related("account", "tax", "product").all():
         credit_note.invoice_lines.create(
             account=line.account,
             tax=line.tax,
+            product=line.product,
+            analytic_distribution=line.analytic_distribution,
             name=line.name,
             quantity=line.quantity,
             unit_price=line.unit_price,
@@ -178,10 +189,12 @@ def create_debit_note_from_invoice(*, invoice: Move, date=None, reason: str = ""
         is_debit_note=True,
     )
 
-    for line in invoice.invoice_lines.select_related("account", "tax").all():
+    for line in invoice.invoice_lines.select_related("account", "tax", "product").all():
         debit_note.invoice_lines.create(
             account=line.account,
             tax=line.tax,
+            product=line.product,
+            analytic_distribution=line.analytic_distribution,
             name=line.name,
             quantity=line.quantity,
             unit_price=line.unit_price,
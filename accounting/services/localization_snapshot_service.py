@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+from collections import defaultdict
+
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from accounting.models import Country, LocalizationSnapshot
+
+SNAPSHOT_KINDS = ("states", "cities")
+
+
+def _snapshot_rows(kind: str):
+    # Imported here: the API layer imports services, not the other way round.
+    from accounting.api.serializers import CountryCitySerializer, CountryStateSerializer
+
+    serializer_class = CountryStateSerializer if kind == "states" else CountryCitySerializer
+    model = serializer_class.Meta.model
+    select_related, prefetch_related = serializer_class.get_related_lookups()
+    queryset = (
+        model.objects.select_related(*select_related)
+        .prefetch_related(*prefetch_related)
+        .order_by("country_id", "name", "id")
+    )
+    return serializer_class, queryset
+
+
+def invalidate_localization_snapshot(country_id: int | None, kind: str) -> None:
+    """Drop a country's snapshot; the snapshot endpoint rebuilds it on demand."""
+    if country_id is not None:
+        LocalizationSnapshot.objects.filter(country_id=country_id, kind=kind).delete()
+
+
+def render_snapshot(rows: list) -> tuple[bytes, bytes, str]:
+    """Return ``(json, gzip, etag)`` for serialized ``rows``."""
+    content = JSONRenderer().render(rows)
+    # mtime=0 keeps the compressed bytes identical for identical content.
+    content_gzip = gzip.compress(content, compresslevel=9, mtime=0)
+    return content, content_gzip, hashlib.sha256(content).hexdigest()
+
+
+@transaction.atomic
+def build_localization_snapshots(*, country_ids=None, kinds=SNAPSHOT_KINDS) -> dict:
+    """Pre-render the states/cities payload of every country (or ``country_ids``).
+
+    Returns ``{kind: {"written": n, "unchanged": n}}``. Snapshots whose
+    content did not change keep their ETag and timestamp.
+    """
+    countries = Country.objects.all()
+    if country_ids is not None:
+        countries = countries.filter(id__in=country_ids)
+    country_ids = list(countries.values_list("id", flat=True))
+    summary = {}
+    for kind in kinds:
+        serializer_class, queryset = _snapshot_rows(kind)
+        rows_by_country = defaultdict(list)
+        for instance in queryset.filter(country_id__in=country_ids).iterator(chunk_size=2000):
+            rows_by_country[instance.country_id].append(instance)
+
+        existing = {
+            snapshot.country_id: snapshot
+            for snapshot in LocalizationSnapshot.objects.filter(kind=kind, country_id__in=country_ids).only(
+                "id", "country_id", "etag"
+            )
+        }
+        to_create = []
+        to_update = []
+        unchanged = 0
+        for country_id in country_ids:
+            instances = rows_by_country.get(country_id, [])
+            content, content_gzip, etag = render_snapshot(serializer_class(instances, many=True).data)
+            snapshot = existing.get(country_id)
+            if snapshot is None:
+                to_create.append(
+                    LocalizationSnapshot(
+                        country_id=country_id,
+                        kind=kind,
+                        etag=etag,
+                        row_count=len(instances),
+                        content=content,
+                        content_gzip=content_gzip,
+                    )
+                )
+            elif snapshot.etag == etag:
+                unchanged += 1
+            else:
+                snapshot.etag = etag
+                snapshot.row_count = len(instances)
+                snapshot.content = content
+                snapshot.content_gzip = content_gzip
+                to_update.append(snapshot)
+
+        # A concurrent request may have built the same snapshot since it was
+        # read above: overwrite it instead of failing on (country, kind).
+        LocalizationSnapshot.objects.bulk_create(
+            to_create,
+            batch_size=200,
+            update_conflicts=True,
+            unique_fields=["country", "kind"],
+            update_fields=["etag", "row_count", "content", "content_gzip", "updated_at"],
+        )
+        for snapshot in to_update:
+            snapshot.save(update_fields=["etag", "row_count", "content", "content_gzip", "updated_at"])
+        summary[kind] = {"written": len(to_create) + len(to_update), "unchanged": unchanged}
+    return summary
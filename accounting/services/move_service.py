@@ -5,7 +5,9 @@ from django.db import transaction
 from django.db.models import Sum
 from django.utils import timezone
 
-from accounting.models import Move, MoveLine
+from accounting.models import Move, MoveLine, TransferModel
+from accounting.services.analytic_service import generate_move_analytic_lines, remove_move_analytic_lines
+from accounting.services.metrics_service import timed_service
 
 
 def is_entry(*, move: Move) -> bool:
@@ -53,6 +55,8 @@ def _check_balanced(*, move: Move) -> dict:
     }
 
 
+@timed_service("post_move")
+@transaction.atomic
 def post_move(*, move: Move) -> dict:
     if move.state != "draft":
         raise ValidationError("Only draft moves can be posted.")
@@ -60,6 +64,7 @@ def post_move(*, move: Move) -> dict:
     _check_journal_move_type(move=move)
     _check_fiscal_lock_dates(move=move)
     balance_stats = _check_balanced(move=move)
+    analytic_stats = generate_move_analytic_lines(move=move)
 
     move.state = "posted"
     move.posted_at = timezone.now()
@@ -70,6 +75,7 @@ def post_move(*, move: Move) -> dict:
         "line_count": balance_stats["line_count"],
         "total_debit": str(balance_stats["total_debit"]),
         "total_credit": str(balance_stats["total_credit"]),
+        "analytic_lines": analytic_stats["created"],
         "state": move.state,
         "posted_at": move.posted_at,
     }
@@ -78,6 +84,7 @@ def post_move(*, move: Move) -> dict:
 def set_move_to_draft(*, move: Move) -> Move:
     if move.state == "draft":
         return move
+    remove_move_analytic_lines(move=move)
     move.state = "draft"
     move.posted_at = None
     move.save(update_fields=["state", "posted_at", "updated_at"])
@@ -87,6 +94,7 @@ def set_move_to_draft(*, move: Move) -> Move:
 def cancel_move(*, move: Move) -> Move:
     if move.state == "cancelled":
         return move
+    remove_move_analytic_lines(move=move)
     move.state = "cancelled"
     move.save(update_fields=["state", "updated_at"])
     return move
@@ -119,7 +127,7 @@ def reverse_move(*, move: Move, date=None, reason: str = "", post: bool = False)
     )
 
     lines = move.lines.select_related(
-        "account", "partner", "currency", "tax", "tax_repartition_line",
+        "account", "partner", "currency", "tax", "tax_repartition_line", "analytic_account",
     ).all()
     for line in lines:
         MoveLine.objects.create(
@@ -129,6 +137,10 @@ def reverse_move(*, move: Move, date=None, reason: str = "", post: bool = False)
             currency=line.currency,
             tax=line.tax,
             tax_repartition_line=line.tax_repartition_line,
+            # Same analytics, so posting the reversal offsets the original's
+            # analytic lines.
+            analytic_account=line.analytic_account,
+            analytic_distribution=dict(line.analytic_distribution or {}),
             name=line.name,
             date=reverse_date,
             debit=line.credit,
@@ -139,3 +151,16 @@ def reverse_move(*, move: Move, date=None, reason: str = "", post: bool = False)
     if post:
         post_move(move=reversed_move)
     return reversed_move
+
+
+@timed_service("transfer_model_auto_transfer")
+def perform_auto_transfer(*, transfer_model: TransferModel):
+    return transfer_model.action_perform_auto_transfer()
+
+
+def run_auto_transfers() -> int:
+    """Run every active, in-progress transfer model; returns how many ran."""
+    transfer_models = list(TransferModel.objects.filter(state="in_progress", active=True))
+    for transfer_model in transfer_models:
+        perform_auto_transfer(transfer_model=transfer_model)
+    return len(transfer_models)
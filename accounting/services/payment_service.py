@@ -4,9 +4,11 @@ from django.core.exceptions import ValidationError
 from django.db import transaction
 
 from accounting.models import AccountingSettings, Move, MoveLine, Payment
+from accounting.services.metrics_service import timed_service
 from accounting.services.move_service import post_move
 
 
+@timed_service("post_payment")
 @transaction.atomic
 def post_payment(*, payment: Payment) -> dict:
     if payment.state != "draft":
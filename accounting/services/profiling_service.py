@@ -0,0 +1,154 @@
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import signing
+
+PROFILE_MAX_AGE = 60 * 60
+PROFILE_TOKEN_MAX_AGE = 60 * 60
+PROFILE_TOKEN_SALT = "accounting.profiling"
+PROFILE_TOP_FUNCTIONS = 40
+
+
+@dataclass
+class ProfileArtifact:
+    """cProfile stats and peak traced memory of one profiled call."""
+
+    profile_id: str
+    method: str
+    path: str
+    status_code: int | None = None
+    duration_ms: float = 0.0
+    peak_memory_bytes: int = 0
+    created_at: float = field(default_factory=time.time)
+    stats: bytes = b""
+
+    def summary(self, limit: int = PROFILE_TOP_FUNCTIONS, sort: str = "cumulative") -> str:
+        stream = io.StringIO()
+        profile_stats = pstats.Stats(_StatsSource(self.stats), stream=stream)
+        profile_stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status_code,
+            "duration_ms": round(self.duration_ms, 3),
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "created_at": self.created_at,
+        }
+
+
+class _StatsSource:
+    # pstats.Stats accepts any object exposing ``create_stats``/``stats``.
+    def __init__(self, raw: bytes):
+        self.stats = marshal.loads(raw) if raw else {}
+
+    def create_stats(self):
+        pass
+
+
+def make_profiling_token() -> str:
+    """Signed value for the ``X-Profile`` header, valid ``PROFILE_TOKEN_MAX_AGE`` seconds."""
+    return signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).sign(uuid4().hex)
+
+
+def check_profiling_token(token: str | None) -> bool:
+    if not token:
+        return False
+    try:
+        signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).unsign(token, max_age=PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def profile_call(func, *args, method: str = "", path: str = "", **kwargs):
+    """Run ``func`` under cProfile and tracemalloc; return ``(result, artifact)``."""
+    artifact = ProfileArtifact(profile_id=uuid4().hex, method=method, path=path)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        result = profiler.runcall(func, *args, **kwargs)
+    finally:
+        artifact.duration_ms = (time.perf_counter() - started) * 1000
+        artifact.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+        profiler.create_stats()
+        artifact.stats = marshal.dumps(profiler.stats)
+    return result, artifact
+
+
+_PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def profile_dir() -> Path:
+    """Directory holding stored profiles: ``ACCOUNTING_PROFILE_DIR`` (default ``var/profiles``).
+
+    Files rather than the cache, so every worker process serves the
+    profiles of the others; point it at shared storage when the app runs
+    on several hosts.
+    """
+    return Path(getattr(settings, "ACCOUNTING_PROFILE_DIR", Path(settings.BASE_DIR) / "var" / "profiles"))
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _prune_profiles(directory: Path) -> None:
+    cutoff = time.time() - PROFILE_MAX_AGE
+    for path in directory.glob("*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.with_suffix(".prof").unlink(missing_ok=True)
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            # Pruned concurrently by another worker.
+            continue
+
+
+def store_profile(artifact: ProfileArtifact) -> str:
+    """Write ``<id>.prof`` (loadable by ``pstats``) and ``<id>.json``; drop profiles older than ``PROFILE_MAX_AGE``."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    _prune_profiles(directory)
+    meta = asdict(artifact)
+    meta.pop("stats")
+    _write_atomic(directory / f"{artifact.profile_id}.prof", artifact.stats)
+    # Metadata last: a profile is visible once its .json exists.
+    _write_atomic(directory / f"{artifact.profile_id}.json", json.dumps(meta).encode())
+    return artifact.profile_id
+
+
+def get_profile(profile_id: str) -> ProfileArtifact | None:
+    if not _PROFILE_ID_RE.match(profile_id or ""):
+        return None
+    directory = profile_dir()
+    try:
+        meta = json.loads((directory / f"{profile_id}.json").read_bytes())
+        stats = (directory / f"{profile_id}.prof").read_bytes()
+    except FileNotFoundError:
+        return None
+    if meta["created_at"] < time.time() - PROFILE_MAX_AGE:
+        return None
+    return ProfileArtifact(**meta, stats=stats)
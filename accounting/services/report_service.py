@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
-
-from django.db.models import Sum
-from django.db.models.functions import Coalesce
-
-from accounting.models import MoveLine
+from uuid import uuid4
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth, TruncQuarter, TruncYear
+
+from accounting.models import (
+    Account,
+    AnalyticAccount,
+    AnalyticLine,
+    AnalyticPlan,
+    Asset,
+    AssetDepreciationLine,
+    MoveLine,
+)
+from accounting.services.asset_service import compute_depreciation_boards
+from accounting.services.cache_service import shared_cache_configured
+from accounting.services.metrics_service import timed_service
 
 
 @dataclass(frozen=True)
@@ -45,10 +60,38 @@ class GeneralLedgerOptions:
     hide_zero_lines: bool = False
 
 
+@dataclass(frozen=True)
+class AssetRegisterOptions:
+    company_id: int
+    date_to: date
+    posted_only: bool = True
+    include_draft: bool = False
+    totals_only: bool = False
+
+
+@dataclass(frozen=True)
+class AnalyticReportOptions:
+    company_id: int
+    date_from: date
+    date_to: date
+    period: str = "month"
+    plan_id: int | None = None
+    by_general_account: bool = False
+
+
+@dataclass(frozen=True)
+class DepreciationForecastOptions:
+    company_id: int
+    date_from: date
+    years: int = 1
+    include_draft: bool = True
+
+
 def _d(value: Decimal | None) -> Decimal:
     return value or Decimal("0")
 
 
+@timed_service("build_balance_sheet")
 def build_balance_sheet(options: BalanceSheetOptions) -> dict:
     lines = MoveLine.objects.select_related("account", "move").filter(
         move__company_id=options.company_id,
@@ -145,6 +188,7 @@ def build_balance_sheet(options: BalanceSheetOptions) -> dict:
     }
 
 
+@timed_service("build_profit_and_loss")
 def build_profit_and_loss(options: ProfitAndLossOptions) -> dict:
     lines = MoveLine.objects.select_related("account", "move").filter(
         move__company_id=options.company_id,
@@ -217,6 +261,7 @@ def build_profit_and_loss(options: ProfitAndLossOptions) -> dict:
     }
 
 
+@timed_service("build_trial_balance")
 def build_trial_balance(options: TrialBalanceOptions) -> dict:
     base_lines = MoveLine.objects.select_related("account", "move").filter(
         move__company_id=options.company_id,
@@ -335,6 +380,7 @@ def build_trial_balance(options: TrialBalanceOptions) -> dict:
     }
 
 
+@timed_service("build_general_ledger")
 def build_general_ledger(options: GeneralLedgerOptions) -> dict:
     base_qs = (
         MoveLine.objects.select_related("account", "move", "partner")
@@ -480,3 +526,464 @@ def build_general_ledger(options: GeneralLedgerOptions) -> dict:
             "closing_balance": str(total_closing),
         },
     }
+
+
+ASSET_REGISTER_STATES = ("running", "paused", "closed")
+
+
+def _asset_register_queryset(options: AssetRegisterOptions):
+    states = ASSET_REGISTER_STATES + (("draft",) if options.include_draft else ())
+    line_filter = Q(depreciation_lines__date__lte=options.date_to)
+    if options.posted_only:
+        line_filter &= Q(depreciation_lines__state="posted")
+
+    return (
+        Asset.objects.filter(
+            company_id=options.company_id,
+            acquisition_date__lte=options.date_to,
+            state__in=states,
+        )
+        .values(
+            "id",
+            "code",
+            "name",
+            "state",
+            "acquisition_date",
+            "original_value",
+            "salvage_value",
+            "asset_account_id",
+            "asset_account__code",
+            "asset_account__name",
+            "model_id",
+            "model__name",
+        )
+        .annotate(accumulated=Coalesce(Sum("depreciation_lines__amount", filter=line_filter), Decimal("0")))
+        .order_by("asset_account__code", "model__name", "model_id", "code", "id")
+    )
+
+
+def _asset_register_group(row: dict) -> dict:
+    return {
+        "asset_account_id": row["asset_account_id"],
+        "asset_account_code": row["asset_account__code"],
+        "asset_account_name": row["asset_account__name"],
+        "model_id": row["model_id"],
+        "model_name": row["model__name"] or "",
+        "asset_count": 0,
+        "original_value": Decimal("0"),
+        "accumulated_depreciation": Decimal("0"),
+        "net_book_value": Decimal("0"),
+    }
+
+
+def _asset_register_totals(bucket: dict) -> dict:
+    return {
+        **bucket,
+        "original_value": str(bucket["original_value"]),
+        "accumulated_depreciation": str(bucket["accumulated_depreciation"]),
+        "net_book_value": str(bucket["net_book_value"]),
+    }
+
+
+def iter_asset_register(options: AssetRegisterOptions, chunk_size: int = 2000) -> Iterator[dict]:
+    """Yield register records in account/model order with bounded memory.
+
+    Records are tagged with ``type``: ``asset`` rows (skipped when
+    ``totals_only``), a ``group`` record after each asset account/model
+    group, and a final ``totals`` record.
+    """
+    totals = {
+        "asset_count": 0,
+        "original_value": Decimal("0"),
+        "accumulated_depreciation": Decimal("0"),
+        "net_book_value": Decimal("0"),
+    }
+    group = None
+
+    for row in _asset_register_queryset(options).iterator(chunk_size=chunk_size):
+        key = (row["asset_account_id"], row["model_id"])
+        if group is None or key != (group["asset_account_id"], group["model_id"]):
+            if group is not None:
+                yield {"type": "group", **_asset_register_totals(group)}
+            group = _asset_register_group(row)
+
+        original_value = _d(row["original_value"])
+        accumulated = _d(row["accumulated"])
+        net_book_value = original_value - accumulated
+
+        for bucket in (group, totals):
+            bucket["asset_count"] += 1
+            bucket["original_value"] += original_value
+            bucket["accumulated_depreciation"] += accumulated
+            bucket["net_book_value"] += net_book_value
+
+        if not options.totals_only:
+            yield {
+                "type": "asset",
+                "asset_id": row["id"],
+                "code": row["code"] or "",
+                "name": row["name"],
+                "state": row["state"],
+                "acquisition_date": row["acquisition_date"].isoformat(),
+                "asset_account_id": row["asset_account_id"],
+                "model_id": row["model_id"],
+                "original_value": str(original_value),
+                "salvage_value": str(_d(row["salvage_value"])),
+                "accumulated_depreciation": str(accumulated),
+                "net_book_value": str(net_book_value),
+            }
+
+    if group is not None:
+        yield {"type": "group", **_asset_register_totals(group)}
+    yield {"type": "totals", **_asset_register_totals(totals)}
+
+
+@timed_service("build_asset_register")
+def build_asset_register(options: AssetRegisterOptions) -> dict:
+    groups: list[dict] = []
+    pending_assets: list[dict] = []
+    totals: dict = {}
+
+    for record in iter_asset_register(options):
+        record_type = record.pop("type")
+        if record_type == "asset":
+            pending_assets.append(record)
+        elif record_type == "group":
+            if not options.totals_only:
+                record["assets"] = pending_assets
+            pending_assets = []
+            groups.append(record)
+        else:
+            totals = record
+
+    return {
+        "company_id": options.company_id,
+        "date_to": options.date_to.isoformat(),
+        "posted_only": options.posted_only,
+        "include_draft": options.include_draft,
+        "totals_only": options.totals_only,
+        "groups": groups,
+        "totals": totals,
+    }
+
+
+DEPRECIATION_FORECAST_CACHE_TIMEOUT = 60 * 60
+
+
+def _forecast_version_key(company_id: int) -> str:
+    return f"accounting:depreciation-forecast:version:{company_id}"
+
+
+def invalidate_depreciation_forecast(company_id: int | None) -> None:
+    """Drop every cached forecast of the company by rotating its version token."""
+    if company_id is None:
+        return
+    cache.set(_forecast_version_key(company_id), uuid4().hex, None)
+
+
+def _forecast_cache_key(options: DepreciationForecastOptions) -> str:
+    version_key = _forecast_version_key(options.company_id)
+    version = cache.get(version_key)
+    if version is None:
+        version = uuid4().hex
+        cache.set(version_key, version, None)
+    return (
+        f"accounting:depreciation-forecast:{options.company_id}:{version}:"
+        f"{options.date_from.isoformat()}:{options.years}:{int(options.include_draft)}"
+    )
+
+
+def _compute_depreciation_forecast(options: DepreciationForecastOptions) -> dict:
+    date_from = options.date_from.replace(day=1)
+    date_to = date_from + relativedelta(years=options.years, days=-1)
+    states = ("running", "draft") if options.include_draft else ("running",)
+
+    periods: list[str] = []
+    cursor = date_from
+    while cursor <= date_to:
+        periods.append(cursor.strftime("%Y-%m"))
+        cursor += relativedelta(months=1)
+
+    # (period, expense_account_id) -> amount; assets without an expense
+    # account are reported under account_id None.
+    buckets: dict[tuple[str, int | None], Decimal] = {}
+
+    # 1) Existing unposted board lines, bucketed in the database.
+    line_rows = (
+        AssetDepreciationLine.objects.filter(
+            asset__company_id=options.company_id,
+            asset__state__in=states,
+            state="draft",
+            date__gte=date_from,
+            date__lte=date_to,
+        )
+        .annotate(period=TruncMonth("date"))
+        .values("period", "asset__expense_account_id")
+        .annotate(amount=Sum("amount"))
+        .order_by()
+    )
+    for row in line_rows:
+        key = (row["period"].strftime("%Y-%m"), row["asset__expense_account_id"])
+        buckets[key] = buckets.get(key, Decimal("0")) + _d(row["amount"])
+
+    # 2) Assets without any board yet: compute it in memory, nothing is saved.
+    boardless = Asset.objects.filter(
+        company_id=options.company_id,
+        state__in=states,
+        depreciation_lines__isnull=True,
+    ).only(
+        "id",
+        "expense_account_id",
+        "acquisition_date",
+        "first_depreciation_date",
+        "original_value",
+        "salvage_value",
+        "method",
+        "method_number",
+        "method_period",
+        "prorata",
+    )
+    boardless = list(boardless)
+    boards, errors = compute_depreciation_boards(boardless)
+    expense_accounts = {asset.id: asset.expense_account_id for asset in boardless}
+    for asset_id, board in boards.items():
+        for line in board:
+            if not (date_from <= line["date"] <= date_to):
+                continue
+            key = (line["date"].strftime("%Y-%m"), expense_accounts[asset_id])
+            buckets[key] = buckets.get(key, Decimal("0")) + line["amount"]
+
+    accounts_meta = {
+        row["id"]: row
+        for row in Account.objects.filter(
+            id__in={account_id for _, account_id in buckets if account_id is not None}
+        ).values("id", "code", "name")
+    }
+    accounts_meta[None] = {"id": None, "code": "", "name": "Unassigned"}
+    # By account code, the unassigned bucket last.
+    account_ids = sorted(
+        {account_id for _, account_id in buckets},
+        key=lambda pk: (pk is None, accounts_meta[pk]["code"], pk or 0),
+    )
+    account_totals = {account_id: Decimal("0") for account_id in account_ids}
+    period_rows = []
+    grand_total = Decimal("0")
+    for period in periods:
+        period_total = Decimal("0")
+        period_accounts = []
+        for account_id in account_ids:
+            amount = buckets.get((period, account_id))
+            if amount is None:
+                continue
+            period_total += amount
+            account_totals[account_id] += amount
+            period_accounts.append({"account_id": account_id, "amount": str(amount)})
+        grand_total += period_total
+        period_rows.append({"period": period, "total": str(period_total), "accounts": period_accounts})
+
+    accounts = [
+        {
+            "account_id": account_id,
+            "account_code": accounts_meta[account_id]["code"],
+            "account_name": accounts_meta[account_id]["name"],
+            "total": str(account_totals[account_id]),
+        }
+        for account_id in account_ids
+    ]
+
+    return {
+        "company_id": options.company_id,
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "years": options.years,
+        "include_draft": options.include_draft,
+        "accounts": accounts,
+        "periods": period_rows,
+        "totals": {
+            "amount": str(grand_total),
+            "computed_assets": len(boards),
+        },
+        "errors": {str(asset_id): message for asset_id, message in errors.items()},
+    }
+
+
+@timed_service("build_depreciation_forecast")
+def build_depreciation_forecast(options: DepreciationForecastOptions) -> dict:
+    """Monthly depreciation expense per expense account, cached per company.
+
+    The cache is invalidated whenever an asset or one of its depreciation
+    lines changes (see ``invalidate_depreciation_forecast``); without a
+    shared cache the forecast is computed on every call.
+    """
+    if not shared_cache_configured():
+        return _compute_depreciation_forecast(options)
+    cache_key = _forecast_cache_key(options)
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = _compute_depreciation_forecast(options)
+        cache.set(cache_key, payload, DEPRECIATION_FORECAST_CACHE_TIMEOUT)
+    return payload
+
+
+ANALYTIC_REPORT_PERIODS = {
+    "month": TruncMonth,
+    "quarter": TruncQuarter,
+    "year": TruncYear,
+}
+
+
+def _analytic_period_label(value: date, period: str) -> str:
+    if period == "year":
+        return str(value.year)
+    if period == "quarter":
+        return f"{value.year}-Q{(value.month - 1) // 3 + 1}"
+    return value.strftime("%Y-%m")
+
+
+def _analytic_bucket(amounts: dict[str, Decimal]) -> dict:
+    return {
+        "periods": {label: str(amount) for label, amount in amounts.items()},
+        "total": str(sum(amounts.values(), Decimal("0"))),
+    }
+
+
+def _add_amounts(target: dict[str, Decimal], source: dict[str, Decimal]) -> None:
+    for label, amount in source.items():
+        target[label] = target.get(label, Decimal("0")) + amount
+
+
+@timed_service("build_analytic_report")
+def build_analytic_report(options: AnalyticReportOptions) -> dict:
+    """Analytic amounts pivoted by plan, analytic account, period and
+    optionally general account.
+
+    Amounts are summed by one grouped query; plan totals are rolled up
+    through the plan ``parent`` tree in memory from a single prefetch of
+    plans and analytic accounts.
+    """
+    trunc = ANALYTIC_REPORT_PERIODS[options.period]
+    group_fields = ["analytic_account_id", "period"]
+    if options.by_general_account:
+        group_fields.append("general_account_id")
+
+    plans = {plan.id: plan for plan in AnalyticPlan.objects.filter(company_id=options.company_id)}
+    children: dict[int | None, list[int]] = {}
+    for plan in sorted(plans.values(), key=lambda item: (item.name, item.id)):
+        parent_id = plan.parent_id if plan.parent_id in plans else None
+        children.setdefault(parent_id, []).append(plan.id)
+
+    selected_plan_ids = None
+    if options.plan_id is not None:
+        selected_plan_ids = set()
+        stack = [options.plan_id]
+        while stack:
+            plan_id = stack.pop()
+            if plan_id in plans and plan_id not in selected_plan_ids:
+                selected_plan_ids.add(plan_id)
+                stack.extend(children.get(plan_id, []))
+
+    accounts_qs = AnalyticAccount.objects.filter(company_id=options.company_id)
+    if selected_plan_ids is not None:
+        accounts_qs = accounts_qs.filter(plan_id__in=selected_plan_ids)
+    accounts = {row["id"]: row for row in accounts_qs.values("id", "plan_id", "code", "name")}
+
+    rows = (
+        AnalyticLine.objects.filter(
+            company_id=options.company_id,
+            date__gte=options.date_from,
+            date__lte=options.date_to,
+            analytic_account_id__isnull=False,
+        )
+        .annotate(period=trunc("date"))
+        .values(*group_fields)
+        .annotate(amount=Sum("amount"))
+        .order_by()
+    )
+    if selected_plan_ids is not None:
+        rows = rows.filter(analytic_account__plan_id__in=selected_plan_ids)
+
+    period_labels: set[str] = set()
+    account_amounts: dict[int, dict[str, Decimal]] = {}
+    general_amounts: dict[int, dict[int | None, dict[str, Decimal]]] = {}
+    for row in rows:
+        account_id = row["analytic_account_id"]
+        if account_id not in accounts:
+            continue
+        label = _analytic_period_label(row["period"], options.period)
+        amount = _d(row["amount"])
+        period_labels.add(label)
+        _add_amounts(account_amounts.setdefault(account_id, {}), {label: amount})
+        if options.by_general_account:
+            by_general = general_amounts.setdefault(account_id, {})
+            _add_amounts(by_general.setdefault(row["general_account_id"], {}), {label: amount})
+
+    general_meta = {}
+    if options.by_general_account:
+        general_ids = {gid for by_general in general_amounts.values() for gid in by_general if gid}
+        general_meta = {
+            row["id"]: row for row in Account.objects.filter(id__in=general_ids).values("id", "code", "name")
+        }
+
+    plan_accounts: dict[int, list[int]] = {}
+    for account_id in sorted(account_amounts, key=lambda pk: (accounts[pk]["code"], accounts[pk]["name"])):
+        plan_accounts.setdefault(accounts[account_id]["plan_id"], []).append(account_id)
+
+    plan_rows: list[dict] = []
+    grand: dict[str, Decimal] = {}
+    visited: set[int] = set()
+
+    def visit(plan_id: int, level: int) -> dict[str, Decimal]:
+        visited.add(plan_id)
+        plan = plans[plan_id]
+        row = {"plan_id": plan.id, "name": plan.name, "parent_id": plan.parent_id, "level": level}
+        plan_rows.append(row)
+        rollup: dict[str, Decimal] = {}
+        account_rows = []
+        for account_id in plan_accounts.get(plan_id, []):
+            amounts = account_amounts[account_id]
+            _add_amounts(rollup, amounts)
+            account_row = {
+                "account_id": account_id,
+                "code": accounts[account_id]["code"],
+                "name": accounts[account_id]["name"],
+                **_analytic_bucket(amounts),
+            }
+            if options.by_general_account:
+                account_row["general_accounts"] = [
+                    {
+                        "account_id": general_id,
+                        "code": general_meta.get(general_id, {}).get("code", ""),
+                        "name": general_meta.get(general_id, {}).get("name", ""),
+                        **_analytic_bucket(general),
+                    }
+                    for general_id, general in sorted(
+                        general_amounts[account_id].items(),
+                        key=lambda item: general_meta.get(item[0], {}).get("code", ""),
+                    )
+                ]
+            account_rows.append(account_row)
+        for child_id in children.get(plan_id, []):
+            if child_id not in visited:
+                _add_amounts(rollup, visit(child_id, level + 1))
+        row["accounts"] = account_rows
+        row.update(_analytic_bucket(rollup))
+        return rollup
+
+    if options.plan_id is None:
+        roots = children.get(None, [])
+    else:
+        roots = [options.plan_id] if options.plan_id in plans else []
+    for plan_id in roots:
+        _add_amounts(grand, visit(plan_id, 0))
+
+    return {
+        "company_id": options.company_id,
+        "date_from": options.date_from.isoformat(),
+        "date_to": options.date_to.isoformat(),
+        "period": options.period,
+        "plan_id": options.plan_id,
+        "by_general_account": options.by_general_account,
+        "periods": sorted(period_labels),
+        "plans": plan_rows,
+        "totals": _analytic_bucket(grand),
+    }
@@ -0,0 +1,189 @@
+"""Ranked prefix search for partners, accounts and products.
+
+On SQLite every source table has an FTS5 shadow table (external content,
+``prefix`` indexes) kept in sync by triggers created in migration 0031, so
+``bulk_create`` and ``QuerySet.update`` are indexed too. Each query term
+matches a token prefix. Rows where every term is a whole word come first,
+then the other prefix hits; both passes are ordered by weighted bm25.
+
+Other backends use the same term semantics through the ORM: every term
+must prefix-match a word of one of the fields. On PostgreSQL the migration
+adds ``pg_trgm`` GIN indexes that serve those ``ILIKE`` lookups.
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.db import DatabaseError, connection, connections
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from accounting.models import Account, Partner, Product
+
+SEARCH_MAX_LIMIT = 100
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+_fts_available: dict[str, bool] = {}
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    model: type
+    fields: tuple[str, ...]
+    # bm25 column weights: a hit in the first field counts most.
+    weights: tuple[float, ...]
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.model._meta.db_table}_search"
+
+
+SEARCH_SOURCES = {
+    "partners": SearchSource(Partner, ("name", "email", "vat"), (10.0, 4.0, 4.0)),
+    "accounts": SearchSource(Account, ("code", "name"), (10.0, 6.0)),
+    "products": SearchSource(Product, ("name", "default_code", "barcode"), (6.0, 10.0, 10.0)),
+}
+
+
+def search_terms(query: str) -> list[str]:
+    return [term.lower() for term in _TERM_RE.findall(query or "")][:8]
+
+
+def _has_fts_table(table: str) -> bool:
+    if connection.vendor != "sqlite":
+        return False
+    if table not in _fts_available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+            _fts_available[table] = cursor.fetchone() is not None
+    return _fts_available[table]
+
+
+def _fts_sql(source: SearchSource, select: str, company_ids) -> tuple[str, list]:
+    # CROSS JOIN pins the FTS table as the outer loop; with a plain JOIN the
+    # planner may walk the base table and probe the index once per row.
+    sql = (
+        f"SELECT {select} FROM {source.fts_table} "
+        f"CROSS JOIN {source.model._meta.db_table} AS base ON base.id = {source.fts_table}.rowid "
+        f"WHERE {source.fts_table} MATCH %s"
+    )
+    params = []
+    if company_ids:
+        sql += f" AND base.company_id IN ({', '.join(['%s'] * len(company_ids))})"
+        params.extend(company_ids)
+    return sql, params
+
+
+def _fts_ids(source: SearchSource, terms: list[str], company_ids, limit: int) -> list[int]:
+    weights = ", ".join(str(weight) for weight in source.weights)
+    sql, params = _fts_sql(source, "base.id", company_ids)
+    ranked_sql = f"{sql} ORDER BY bm25({source.fts_table}, {weights}), base.id LIMIT %s"
+    # Whole-word pass first: bm25 favours rows with many prefix hits, so a
+    # row named exactly "A" would otherwise rank below "Acme Apex Atlas".
+    matches = (
+        " ".join(f'"{term}"' for term in terms),
+        " ".join(f'"{term}"*' for term in terms),
+    )
+    ids = []
+    seen = set()
+    with connection.cursor() as cursor:
+        for match in matches:
+            # The prefix pass also returns the whole-word rows: skip them.
+            cursor.execute(ranked_sql, [match, *params, limit + len(ids)])
+            for (pk,) in cursor.fetchall():
+                if pk not in seen:
+                    seen.add(pk)
+                    ids.append(pk)
+            if len(ids) >= limit:
+                break
+    return ids[:limit]
+
+
+def _orm_ids(source: SearchSource, terms: list[str], company_ids, limit: int) -> list[int]:
+    queryset = source.model._default_manager.all()
+    if company_ids:
+        queryset = queryset.filter(company_id__in=company_ids)
+    for term in terms:
+        term_q = Q()
+        for field in source.fields:
+            term_q |= Q(**{f"{field}__istartswith": term}) | Q(**{f"{field}__icontains": f" {term}"})
+        queryset = queryset.filter(term_q)
+    first = terms[0]
+    rank = Case(
+        *[When(**{f"{field}__iexact": first}, then=Value(index)) for index, field in enumerate(source.fields)],
+        *[
+            When(**{f"{field}__istartswith": first}, then=Value(len(source.fields) + index))
+            for index, field in enumerate(source.fields)
+        ],
+        default=Value(2 * len(source.fields)),
+        output_field=IntegerField(),
+    )
+    queryset = queryset.annotate(search_rank=rank).order_by("search_rank", source.fields[0], "id")
+    return list(queryset.values_list("id", flat=True)[:limit])
+
+
+def search_ids(source_key: str, query: str, *, company_ids=None, limit: int = 20) -> list[int]:
+    """Ids of ``source_key`` rows matching every term of ``query`` as a word prefix, best first."""
+    source = SEARCH_SOURCES[source_key]
+    terms = search_terms(query)
+    if not terms:
+        return []
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    if _has_fts_table(source.fts_table):
+        try:
+            return _fts_ids(source, terms, company_ids, limit)
+        except DatabaseError:
+            # FTS5 missing from this SQLite build at runtime: use the ORM path.
+            _fts_available[source.fts_table] = False
+    return _orm_ids(source, terms, company_ids, limit)
+
+
+def _trigger_statements(source: SearchSource) -> list[str]:
+    base, search = source.model._meta.db_table, source.fts_table
+    cols = ", ".join(source.fields)
+    new_values = ", ".join(f"new.{field}" for field in source.fields)
+    old_values = ", ".join(f"old.{field}" for field in source.fields)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {search}_ai AFTER INSERT ON {base} BEGIN "
+        f"INSERT INTO {search}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {search}_ad AFTER DELETE ON {base} BEGIN "
+        f"INSERT INTO {search}({search}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {search}_au AFTER UPDATE OF {cols} ON {base} BEGIN "
+        f"INSERT INTO {search}({search}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {search}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def ensure_search_triggers(using: str = "default") -> list[str]:
+    """Recreate sync triggers dropped by a SQLite table rebuild and reindex those tables.
+
+    SQLite migrations that alter a column copy the table into a new one,
+    which silently drops its triggers. Returns the search tables repaired.
+    """
+    db = connections[using]
+    if db.vendor != "sqlite":
+        return []
+    repaired = []
+    with db.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        names = {row[0] for row in cursor.fetchall()}
+        for source in SEARCH_SOURCES.values():
+            search = source.fts_table
+            if search not in names:
+                continue
+            if all(f"{search}_{suffix}" in names for suffix in ("ai", "ad", "au")):
+                continue
+            for statement in _trigger_statements(source):
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {search}({search}) VALUES ('rebuild')")
+            repaired.append(search)
+    return repaired
+
+
+def rebuild_search_index() -> list[str]:
+    """Rebuild the SQLite FTS5 tables from their source tables; returns the tables rebuilt."""
+    rebuilt = []
+    for source in SEARCH_SOURCES.values():
+        if _has_fts_table(source.fts_table):
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {source.fts_table}({source.fts_table}) VALUES ('rebuild')")
+            rebuilt.append(source.fts_table)
+    return rebuilt
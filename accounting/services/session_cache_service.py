@@ -0,0 +1,66 @@
+import hashlib
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+from accounting.services.company_access_service import CompanyAccess
+
+SESSION_INFO_CACHE_TIMEOUT = 5 * 60
+_GLOBAL_VERSION_KEY = "accounting:session-info-version"
+
+
+def _user_version_key(user_id: int) -> str:
+    return f"accounting:session-info-version:user:{user_id}"
+
+
+def _company_version_key(company_id: int) -> str:
+    return f"accounting:session-info-version:company:{company_id}"
+
+
+def session_info_cache_key(user_id: int, company_id: int, access: CompanyAccess) -> str:
+    """Key of the session payload of ``user_id`` in ``company_id``.
+
+    The company access snapshot is part of the key, so switching or
+    activating companies needs no explicit invalidation. Profile, company,
+    settings and reference-data changes bump the version keys instead.
+    """
+    version_keys = [_GLOBAL_VERSION_KEY, _user_version_key(user_id), _company_version_key(company_id)]
+    versions = cache.get_many(version_keys)
+    missing = {key: uuid4().hex for key in version_keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    access_digest = hashlib.sha1(
+        repr((access.current_company_id, access.active_company_ids, access.allowed_company_ids)).encode("utf-8")
+    ).hexdigest()
+    version = hashlib.sha1("|".join(versions[key] for key in version_keys).encode("utf-8")).hexdigest()
+    return f"accounting:session-info:{user_id}:{company_id}:{access_digest}:{version}"
+
+
+def get_cached_session_info(key: str) -> dict | None:
+    return cache.get(key)
+
+
+def cache_session_info(key: str, payload: dict) -> None:
+    cache.set(key, payload, SESSION_INFO_CACHE_TIMEOUT)
+
+
+def _bump(key: str) -> None:
+    cache.set(key, uuid4().hex, None)
+    # Bump again on commit so a payload cached from pre-commit rows is dropped.
+    transaction.on_commit(lambda: cache.set(key, uuid4().hex, None))
+
+
+def invalidate_user_session_info(user_id: int | None) -> None:
+    if user_id is not None:
+        _bump(_user_version_key(user_id))
+
+
+def invalidate_company_session_info(company_id: int | None) -> None:
+    if company_id is not None:
+        _bump(_company_version_key(company_id))
+
+
+def invalidate_all_session_info() -> None:
+    _bump(_GLOBAL_VERSION_KEY)
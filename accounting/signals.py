@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from accounting.models import (
+    AnalyticDistributionModel,
+    AnalyticDistributionModelLine,
+    Asset,
+    AccountingSettings,
+    Company,
+    Country,
+    CountryCity,
+    CountryCurrency,
+    CountryState,
+    Currency,
+    UserCompanyAccess,
+)
+from accounting.services.analytic_service import invalidate_distribution_matcher
+from accounting.services.company_access_service import invalidate_company_access
+from accounting.services.localization_snapshot_service import invalidate_localization_snapshot
+from accounting.services.report_service import invalidate_depreciation_forecast
+from accounting.services.search_service import ensure_search_triggers
+from accounting.services.session_cache_service import (
+    invalidate_all_session_info,
+    invalidate_company_session_info,
+    invalidate_user_session_info,
+)
+
+
+def _invalidate_forecast_on_commit(company_id: int | None) -> None:
+    transaction.on_commit(lambda: invalidate_depreciation_forecast(company_id))
+
+
+@receiver(post_save, sender=Asset, dispatch_uid="accounting.asset_saved_forecast")
+@receiver(post_delete, sender=Asset, dispatch_uid="accounting.asset_deleted_forecast")
+def asset_changed(sender, instance, **kwargs):
+    _invalidate_forecast_on_commit(instance.company_id)
+
+
+def _invalidate_matcher_on_commit(company_id: int | None) -> None:
+    transaction.on_commit(lambda: invalidate_distribution_matcher(company_id))
+
+
+@receiver(post_save, sender=AnalyticDistributionModel, dispatch_uid="accounting.distribution_model_saved")
+@receiver(post_delete, sender=AnalyticDistributionModel, dispatch_uid="accounting.distribution_model_deleted")
+def distribution_model_changed(sender, instance, **kwargs):
+    _invalidate_matcher_on_commit(instance.company_id)
+
+
+@receiver(post_save, sender=AnalyticDistributionModelLine, dispatch_uid="accounting.distribution_model_line_saved")
+@receiver(post_delete, sender=AnalyticDistributionModelLine, dispatch_uid="accounting.distribution_model_line_deleted")
+def distribution_model_line_changed(sender, instance, **kwargs):
+    try:
+        company_id = instance.model.company_id
+    except ObjectDoesNotExist:
+        # Cascade from a deleted model: the model's own signal invalidates.
+        return
+    _invalidate_matcher_on_commit(company_id)
+
+
+@receiver(post_save, sender=UserCompanyAccess, dispatch_uid="accounting.company_access_saved")
+@receiver(post_delete, sender=UserCompanyAccess, dispatch_uid="accounting.company_access_deleted")
+def company_access_changed(sender, instance, **kwargs):
+    invalidate_company_access(instance.user_id)
+
+
+@receiver(m2m_changed, sender=UserCompanyAccess.allowed_companies.through, dispatch_uid="accounting.allowed_companies")
+@receiver(m2m_changed, sender=UserCompanyAccess.active_companies.through, dispatch_uid="accounting.active_companies")
+def company_access_companies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+    if not reverse:
+        invalidate_company_access(instance.user_id)
+        return
+    # Changed from the company side: pk_set holds access ids (unknown on clear,
+    # where the cache timeout bounds staleness).
+    for user_id in UserCompanyAccess.objects.filter(id__in=pk_set or ()).values_list("user_id", flat=True):
+        invalidate_company_access(user_id)
+
+
+@receiver(post_save, sender=AccountingSettings, dispatch_uid="accounting.settings_saved_session")
+@receiver(post_delete, sender=AccountingSettings, dispatch_uid="accounting.settings_deleted_session")
+def accounting_settings_changed(sender, instance, **kwargs):
+    invalidate_company_session_info(instance.company_id)
+
+
+@receiver(post_save, sender=get_user_model(), dispatch_uid="accounting.user_saved_session")
+def user_saved(sender, instance, **kwargs):
+    invalidate_user_session_info(instance.id)
+
+
+# Company, country and currency names appear in every user's company lists.
+@receiver(post_save, sender=Company, dispatch_uid="accounting.company_saved_session")
+@receiver(post_delete, sender=Company, dispatch_uid="accounting.company_deleted_session")
+@receiver(post_save, sender=Country, dispatch_uid="accounting.country_saved_session")
+@receiver(post_save, sender=Currency, dispatch_uid="accounting.currency_saved_session")
+@receiver(post_save, sender=CountryCurrency, dispatch_uid="accounting.country_currency_saved_session")
+@receiver(post_delete, sender=CountryCurrency, dispatch_uid="accounting.country_currency_deleted_session")
+def session_reference_data_changed(sender, **kwargs):
+    invalidate_all_session_info()
+
+
+@receiver(post_save, sender=Country, dispatch_uid="accounting.country_saved_snapshot")
+def country_saved(sender, instance, **kwargs):
+    # Country names are embedded in state and city rows.
+    invalidate_localization_snapshot(instance.id, "states")
+    invalidate_localization_snapshot(instance.id, "cities")
+
+
+@receiver(pre_save, sender=CountryState, dispatch_uid="accounting.state_presave_snapshot")
+@receiver(pre_save, sender=CountryCity, dispatch_uid="accounting.city_presave_snapshot")
+def localization_row_presave(sender, instance, **kwargs):
+    # A row moved to another country must leave the old country's snapshot too.
+    instance._snapshot_previous_country_id = (
+        sender.objects.filter(pk=instance.pk).values_list("country_id", flat=True).first() if instance.pk else None
+    )
+
+
+def _snapshot_country_ids(instance) -> set:
+    return {instance.country_id, getattr(instance, "_snapshot_previous_country_id", None)} - {None}
+
+
+@receiver(post_save, sender=CountryState, dispatch_uid="accounting.state_saved_snapshot")
+@receiver(post_delete, sender=CountryState, dispatch_uid="accounting.state_deleted_snapshot")
+def country_state_changed(sender, instance, **kwargs):
+    # State names are embedded in city rows too.
+    for country_id in _snapshot_country_ids(instance):
+        invalidate_localization_snapshot(country_id, "states")
+        invalidate_localization_snapshot(country_id, "cities")
+
+
+@receiver(post_save, sender=CountryCity, dispatch_uid="accounting.city_saved_snapshot")
+@receiver(post_delete, sender=CountryCity, dispatch_uid="accounting.city_deleted_snapshot")
+def country_city_changed(sender, instance, **kwargs):
+    for country_id in _snapshot_country_ids(instance):
+        invalidate_localization_snapshot(country_id, "cities")
+
+
+@receiver(post_migrate, dispatch_uid="accounting.search_triggers")
+def search_triggers_after_migrate(sender, using="default", **kwargs):
+    if sender.name == "accounting":
+        ensure_search_triggers(using)
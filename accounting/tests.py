@@ -1,3 +1,1663 @@
-from django.test import TestCase
+import gzip
+import json
+import pstats
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.db.models import F, Sum
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounting.models import (
+    Account,
+    AccountGroup,
+    AccountGroupTemplate,
+    AccountingSettings,
+    AccountTemplate,
+    AnalyticAccount,
+    AnalyticDistributionModel,
+    AnalyticDistributionModelLine,
+    AnalyticLine,
+    AnalyticPlan,
+    Asset,
+    AssetDepreciationLine,
+    AssetModel,
+    Company,
+    Country,
+    CountryCity,
+    CountryState,
+    Currency,
+    InvoiceLine,
+    Journal,
+    JournalGroup,
+    LocalizationSnapshot,
+    Move,
+    MoveLine,
+    MoveLineAnalyticDistribution,
+    Partner,
+    ProductCategory,
+    Tax,
+    TaxGroup,
+    TaxRepartitionLine,
+    TransferModel,
+    UserCompanyAccess,
+)
+from accounting.api.pagination import iter_keyset_chunks
+from accounting.api.serializers import TransferModelSerializer
+from accounting.api.viewsets.shared import LookupViewMixin
+from accounting.checks import shared_cache_check
+from accounting.query_budgets import assert_query_budgets
+from accounting.services.analytic_service import get_distribution_matcher
+from accounting.services.asset_import_service import import_assets, read_asset_rows
+from accounting.services.asset_service import (
+    compute_depreciation_board,
+    compute_depreciation_boards,
+    generate_depreciation_boards,
+    generate_depreciation_lines,
+    post_depreciation_line,
+)
+from accounting.services.company_access_service import CompanyAccess, get_company_access
+from accounting.services.chart_template_service import (
+    apply_chart_template_to_company,
+    apply_chart_templates,
+    group_template_levels,
+)
+from accounting.services.company_service import CompanySpec, clone_company, provision_companies
+from accounting.services.localization_snapshot_service import build_localization_snapshots
+from accounting.services.metrics_service import REGISTRY, render_prometheus
+from accounting.services.move_service import post_move, reverse_move, run_auto_transfers, set_move_to_draft
+from accounting.services.profiling_service import get_profile, make_profiling_token, profile_call, store_profile
+from accounting.services.report_service import (
+    AnalyticReportOptions,
+    AssetRegisterOptions,
+    DepreciationForecastOptions,
+    build_analytic_report,
+    build_asset_register,
+    build_depreciation_forecast,
+)
+from accounting.services.search_service import ensure_search_triggers, search_ids
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def create_company(code="QB", *, currency=None):
+    """A company with settings, four accounts and a general journal."""
+    currency = currency or Currency.objects.get_or_create(code="USD", defaults={"name": "US Dollar", "symbol": "$"})[0]
+    company = Company.objects.create(code=code, name=f"{code} Company")
+    AccountingSettings.objects.create(company=company, currency=currency)
+    accounts = {
+        code: Account.objects.create(company=company, code=code, name=f"Account {code}", account_type=kind)
+        for code, kind in (("1000", "asset"), ("1100", "asset"), ("4000", "income"), ("6100", "expense"))
+    }
+    journal = Journal.objects.create(
+        company=company, code="MISC", name="Miscellaneous", journal_type="general", currency=currency
+    )
+    return company, accounts, journal
+
+
+def create_user(username, *companies, superuser=True):
+    """A user with access to ``companies``, the first one current."""
+    if superuser:
+        user = get_user_model().objects.create_superuser(username, f"{username}@example.com", username)
+    else:
+        user = get_user_model().objects.create_user(username, f"{username}@example.com", username)
+    access = UserCompanyAccess.objects.create(user=user, current_company=companies[0])
+    access.allowed_companies.add(*companies)
+    access.active_companies.add(*companies)
+    return user
+
+
+def create_move(company, journal, lines, *, partner=None, day=date(2026, 1, 1), post=True, move_type="entry"):
+    """A move with ``lines`` as ``(account, debit, credit)``, posted by default."""
+    move = Move.objects.create(
+        company=company,
+        journal=journal,
+        partner=partner,
+        currency=journal.currency,
+        date=day,
+        move_type=move_type,
+    )
+    for account, debit, credit in lines:
+        MoveLine.objects.create(
+            move=move, account=account, partner=partner, date=day, debit=Decimal(debit), credit=Decimal(credit)
+        )
+    if post:
+        post_move(move=move)
+    return move
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class QueryBudgetTests(TestCase):
+    """Every argument-free GET route stays within its query budget on seeded data.
+
+    Several rows per table, so a per-row query (N+1) shows up as a count
+    that grows past the budget.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, accounts, journal = create_company()
+        partners = [Partner.objects.create(company=cls.company, name=f"Partner {index}") for index in range(5)]
+        for index, partner in enumerate(partners):
+            amount = 100 * (index + 1)
+            create_move(
+                cls.company,
+                journal,
+                [(accounts["6100"], amount, 0), (accounts["1000"], 0, amount)],
+                partner=partner,
+                day=date(2026, 1, index + 1),
+            )
+
+        for index, expense_account in enumerate((accounts["6100"], None)):
+            # An asset without expense account exercises the forecast's
+            # unassigned bucket.
+            Asset.objects.create(
+                company=cls.company,
+                name=f"Asset {index}",
+                asset_account=accounts["1100"],
+                depreciation_account=accounts["1100"],
+                expense_account=expense_account,
+                journal=journal,
+                acquisition_date=date(2026, 1, 1),
+                original_value=Decimal("1200"),
+                method_number=12,
+                method_period=1,
+                state="running",
+            )
+
+        cls.user = create_user("budget", cls.company)
+
+    def test_get_routes_stay_within_query_budgets(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        results = assert_query_budgets(client, params={"company_id": self.company.id})
+        self.assertTrue(results)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        cls.user = create_user("etag", cls.company)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.move = create_move(
+            self.company, self.journal, [(self.accounts["6100"], 100, 0)], post=False
+        )
+        self.url = f"/api/moves/{self.move.id}/"
+
+    def _etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"], response.data
+
+    def test_unchanged_move_is_not_modified(self):
+        etag, _ = self._etag()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_added_line_changes_the_balance_validator(self):
+        etag, data = self._etag()
+        self.assertEqual(Decimal(data["balance"]), Decimal("100"))
+        MoveLine.objects.create(
+            move=self.move, account=self.accounts["1000"], date=self.move.date, credit=Decimal("40")
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data["balance"]), Decimal("60"))
+
+    def test_edited_and_deleted_lines_change_the_validator(self):
+        line = MoveLine.objects.create(
+            move=self.move, account=self.accounts["1000"], date=self.move.date, credit=Decimal("40")
+        )
+        etag, _ = self._etag()
+        line.credit = Decimal("100")
+        line.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data["balance"]), Decimal("0"))
+
+        etag = response["ETag"]
+        line.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data["balance"]), Decimal("100"))
+
+    def test_invoice_line_changes_the_invoice_validator(self):
+        invoice = Move.objects.create(
+            company=self.company,
+            journal=self.journal,
+            currency=self.journal.currency,
+            date=date(2026, 1, 1),
+            move_type="out_invoice",
+        )
+        url = f"/api/invoices/{invoice.id}/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        InvoiceLine.objects.create(
+            move=invoice, account=self.accounts["4000"], name="Service", quantity=Decimal("2"), unit_price=Decimal("50")
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.data["amount_untaxed"]), Decimal("100"))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class LookupViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        cls.user = create_user("lookup", cls.company)
+        for index in range(5):
+            Partner.objects.create(company=cls.company, name=f"Partner {index}", email=f"p{index}@example.com")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_lookup_rows_are_capped_without_limit(self):
+        with mock.patch.object(LookupViewMixin, "lookup_view_max_limit", 3):
+            response = self.client.get("/api/partners/", {"view": "lookup"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(set(response.data[0]), {"id", "name"})
+
+    def test_lookup_limit_and_fields(self):
+        response = self.client.get("/api/partners/", {"view": "lookup", "limit": 2, "fields": "id,email"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(set(response.data[0]), {"id", "email"})
+
+        with mock.patch.object(LookupViewMixin, "lookup_view_max_limit", 3):
+            response = self.client.get("/api/partners/", {"view": "lookup", "limit": 50})
+        self.assertEqual(len(response.data), 3)
+
+    def test_lookup_rejects_bad_limit_and_unknown_fields(self):
+        self.assertEqual(self.client.get("/api/partners/", {"view": "lookup", "limit": 0}).status_code, 400)
+        self.assertEqual(self.client.get("/api/partners/", {"view": "lookup", "limit": "x"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/partners/", {"view": "lookup", "fields": "nope"}).status_code, 400)
+
+    def test_sparse_fieldsets_trim_the_representation(self):
+        response = self.client.get("/api/partners/", {"fields": "id,name"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(set(response.data[0]), {"id", "name"})
+
+
+class CompanyAccessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, _, _ = create_company()
+        cls.other, _, _ = create_company("QC")
+        cls.user = create_user("access", cls.company, cls.other)
+
+    def _request(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        return request
+
+    def test_access_is_memoized_on_the_request(self):
+        request = self._request()
+        access = get_company_access(request)
+        self.assertEqual(access.allowed_company_ids, tuple(sorted((self.company.id, self.other.id))))
+        with self.assertNumQueries(0):
+            self.assertIs(get_company_access(request), access)
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_per_process_cache_is_not_trusted_across_requests(self):
+        # A stale entry another worker would not have invalidated.
+        cache.set(f"accounting:company-access:{self.user.id}", CompanyAccess(exists=True), 60)
+        access = get_company_access(self._request())
+        self.assertEqual(access.current_company_id, self.company.id)
+
+    @override_settings(CACHES=LOCMEM_CACHE, ACCOUNTING_SHARED_CACHE=True)
+    def test_shared_cache_serves_later_requests_until_invalidated(self):
+        cache.clear()
+        get_company_access(self._request())
+        with self.assertNumQueries(0):
+            get_company_access(self._request())
+        access = UserCompanyAccess.objects.get(user=self.user)
+        access.allowed_companies.remove(self.other)
+        self.assertEqual(get_company_access(self._request()).allowed_company_ids, (self.company.id,))
+
+    @override_settings(CACHES=LOCMEM_CACHE, ACCOUNTING_SHARED_CACHE=True)
+    def test_shared_flag_on_a_per_process_cache_warns(self):
+        self.assertEqual([warning.id for warning in shared_cache_check(None)], ["accounting.W001"])
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_matcher_is_rebuilt_from_rows_without_shared_cache(self):
+        plan = AnalyticPlan.objects.create(company=self.company, name="Projects")
+        analytic = AnalyticAccount.objects.create(company=self.company, plan=plan, name="Alpha")
+        self.assertFalse(get_distribution_matcher(self.company.id))
+        # The invalidation signal runs on commit, which a TestCase never
+        # reaches: like another process, only the rows tell the change.
+        model = AnalyticDistributionModel.objects.create(company=self.company, name="Expenses", account_prefix="6")
+        AnalyticDistributionModelLine.objects.create(model=model, analytic_account=analytic, percentage=Decimal("100"))
+        matcher = get_distribution_matcher(self.company.id)
+        self.assertEqual(matcher.match(account_code="6100"), {str(analytic.id): 100.0})
+        with self.assertNumQueries(1):
+            self.assertIs(get_distribution_matcher(self.company.id), matcher)
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, _, cls.journal = create_company()
+        cls.staff = create_user("metrics", cls.company)
+        cls.clerk = create_user("clerk", cls.company, superuser=False)
+
+    def setUp(self):
+        REGISTRY.reset()
+
+    def test_metrics_are_staff_only_by_default(self):
+        client = APIClient()
+        self.assertIn(client.get("/api/metrics/").status_code, (401, 403))
+        client.force_authenticate(user=self.clerk)
+        self.assertEqual(client.get("/api/metrics/").status_code, 403)
+        client.force_authenticate(user=self.staff)
+        response = client.get("/api/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"# TYPE accounting_http_requests_total counter", response.content)
+
+    @override_settings(ACCOUNTING_METRICS_ALLOWED_IPS=("127.0.0.1",))
+    def test_listed_addresses_scrape_without_credentials(self):
+        self.assertEqual(APIClient().get("/api/metrics/", REMOTE_ADDR="127.0.0.1").status_code, 200)
+        self.assertIn(APIClient().get("/api/metrics/", REMOTE_ADDR="10.0.0.9").status_code, (401, 403))
+
+    def test_auto_transfers_are_timed_per_model(self):
+        for name in ("Rent", "Fees"):
+            TransferModel.objects.create(
+                company=self.company, journal=self.journal, name=name, date_start=date(2026, 1, 1), state="in_progress"
+            )
+        TransferModel.objects.create(
+            company=self.company, journal=self.journal, name="Paused", date_start=date(2026, 1, 1), state="disabled"
+        )
+        self.assertEqual(run_auto_transfers(), 2)
+        sample = 'accounting_service_duration_seconds_count{service="transfer_model_auto_transfer"} 2'
+        self.assertIn(sample, render_prometheus())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CloneCompanyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.source, cls.accounts, cls.journal = create_company("SRC")
+        parent = AccountGroup.objects.create(
+            company=cls.source, code_prefix_start="1", code_prefix_end="1", name="Assets"
+        )
+        child = AccountGroup.objects.create(
+            company=cls.source, code_prefix_start="10", code_prefix_end="10", name="Cash", parent=parent
+        )
+        Account.objects.filter(pk=cls.accounts["1000"].pk).update(group=child)
+        Journal.objects.filter(pk=cls.journal.pk).update(default_account=cls.accounts["1000"])
+        tax_group = TaxGroup.objects.create(company=cls.source, name="VAT", tax_payable_account=cls.accounts["4000"])
+        tax = Tax.objects.create(
+            company=cls.source, tax_group=tax_group, account=cls.accounts["4000"], name="VAT 20", amount=Decimal("20")
+        )
+        TaxRepartitionLine.objects.create(
+            tax=tax, account=cls.accounts["1100"], document_type="invoice", repartition_type="tax"
+        )
+        cls.user = create_user("cloner", cls.source)
+
+    def test_clone_remaps_foreign_keys_to_the_new_company(self):
+        company, stats = clone_company(self.source, name="Copy")
+        self.assertEqual(stats["account"], 4)
+        self.assertEqual(stats["accountgroup"], 2)
+
+        cash = Account.objects.select_related("group__parent").get(company=company, code="1000")
+        self.assertEqual(cash.group.company_id, company.id)
+        self.assertEqual(cash.group.parent.company_id, company.id)
+        self.assertEqual(cash.group.parent.name, "Assets")
+        journal = Journal.objects.get(company=company, code="MISC")
+        self.assertEqual(journal.default_account_id, cash.id)
+        # Shared reference rows keep their id.
+        self.assertEqual(journal.currency_id, self.journal.currency_id)
+
+        tax = Tax.objects.select_related("tax_group").get(company=company)
+        self.assertEqual(tax.tax_group.company_id, company.id)
+        self.assertEqual(tax.tax_group.tax_payable_account.company_id, company.id)
+        self.assertEqual(tax.account.code, "4000")
+        self.assertEqual(tax.account.company_id, company.id)
+        self.assertEqual(tax.repartition_lines.get().account.company_id, company.id)
+        self.assertEqual(AccountingSettings.objects.get(company=company).currency_id, self.journal.currency_id)
+        # The source is untouched.
+        self.assertEqual(Account.objects.filter(company=self.source).count(), 4)
+
+    def test_clone_rejects_a_taken_code(self):
+        with self.assertRaises(ValueError):
+            clone_company(self.source, name="Copy", code="SRC")
+
+    def test_clone_endpoint_requires_authentication_and_grants_access(self):
+        url = f"/api/companies/{self.source.id}/clone/"
+        self.assertEqual(APIClient().post(url, {"name": "Copy"}, format="json").status_code, 401)
+        self.assertFalse(Company.objects.filter(name="Copy").exists())
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post(url, {"name": "Copy"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        access = UserCompanyAccess.objects.get(user=self.user)
+        self.assertTrue(access.allowed_companies.filter(pk=response.data["company"]["id"]).exists())
+
+
+def create_asset(company, accounts, journal, name="Asset", *, expense_account=True, **values):
+    """A running straight-line asset of 1200 over 12 monthly periods."""
+    values = {
+        "acquisition_date": date(2026, 1, 1),
+        "original_value": Decimal("1200"),
+        "method_number": 12,
+        "method_period": 1,
+        "state": "running",
+        "currency": journal.currency,
+        **values,
+    }
+    return Asset.objects.create(
+        company=company,
+        name=name,
+        asset_account=accounts["1100"],
+        depreciation_account=accounts["1100"],
+        expense_account=accounts["6100"] if expense_account else None,
+        journal=journal,
+        **values,
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHE, ACCOUNTING_SHARED_CACHE=True)
+class DepreciationForecastTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        cls.user = create_user("forecast", cls.company)
+
+    def setUp(self):
+        cache.clear()
+
+    def _forecast(self):
+        options = DepreciationForecastOptions(company_id=self.company.id, date_from=date(2026, 1, 1))
+        return build_depreciation_forecast(options)
+
+    def test_assets_without_expense_account_are_unassigned(self):
+        create_asset(self.company, self.accounts, self.journal, "Van")
+        create_asset(self.company, self.accounts, self.journal, "Desk", expense_account=False)
+        forecast = self._forecast()
+        self.assertEqual(
+            [(row["account_code"], row["account_name"], row["total"]) for row in forecast["accounts"]],
+            [("6100", "Account 6100", "1200.000000"), ("", "Unassigned", "1200.000000")],
+        )
+        self.assertEqual(forecast["periods"][0]["total"], "200.000000")
+        self.assertEqual(forecast["totals"]["amount"], "2400.000000")
+
+    def test_posting_a_line_invalidates_the_cached_forecast(self):
+        asset = create_asset(self.company, self.accounts, self.journal, "Van")
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_depreciation_lines(asset)
+        self.assertEqual(Decimal(self._forecast()["totals"]["amount"]), Decimal("1200"))
+
+        line = asset.depreciation_lines.get(sequence=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            post_depreciation_line(line)
+        self.assertEqual(Decimal(self._forecast()["totals"]["amount"]), Decimal("1100"))
+
+    def test_editing_a_line_through_the_api_invalidates_the_cached_forecast(self):
+        asset = create_asset(self.company, self.accounts, self.journal, "Van")
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_depreciation_lines(asset)
+        self.assertEqual(Decimal(self._forecast()["totals"]["amount"]), Decimal("1200"))
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        line = asset.depreciation_lines.get(sequence=12)
+        response = client.patch(f"/api/asset-depreciation-lines/{line.id}/", {"amount": "50"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(self._forecast()["totals"]["amount"]), Decimal("1150"))
+
+    def test_saving_a_line_does_not_load_its_asset(self):
+        asset = create_asset(self.company, self.accounts, self.journal, "Van")
+        generate_depreciation_lines(asset)
+        line = AssetDepreciationLine.objects.get(asset=asset, sequence=1)
+        with self.assertNumQueries(1):
+            line.save()
+
+
+class DepreciationBoardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+
+    def _amounts(self, asset):
+        return [line["amount"] for line in compute_depreciation_board(asset)]
+
+    def test_linear_rounding_lands_on_the_last_line(self):
+        asset = create_asset(self.company, self.accounts, self.journal, original_value=Decimal("1000"), method_number=3)
+        self.assertEqual(
+            self._amounts(asset), [Decimal("333.333333"), Decimal("333.333333"), Decimal("333.333334")]
+        )
+        board = compute_depreciation_board(asset)
+        self.assertEqual(board[-1]["residual_value"], Decimal("0"))
+        self.assertEqual([line["date"] for line in board], [date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1)])
+
+    def test_prorata_splits_the_first_period_over_an_extra_line(self):
+        asset = create_asset(
+            self.company,
+            self.accounts,
+            self.journal,
+            acquisition_date=date(2026, 1, 16),
+            first_depreciation_date=date(2026, 1, 31),
+            prorata=True,
+        )
+        amounts = self._amounts(asset)
+        self.assertEqual(len(amounts), 13)
+        # 16 of the 31 days of January.
+        self.assertEqual(amounts[0], Decimal("51.612903"))
+        self.assertEqual(amounts[1:12], [Decimal("100")] * 11)
+        self.assertEqual(amounts[-1], Decimal("48.387097"))
+        self.assertEqual(sum(amounts), Decimal("1200"))
+
+    def test_degressive_board_decreases_and_depreciates_everything(self):
+        asset = create_asset(
+            self.company,
+            self.accounts,
+            self.journal,
+            method="degressive",
+            salvage_value=Decimal("200"),
+            method_number=5,
+        )
+        amounts = self._amounts(asset)
+        self.assertEqual(amounts[0], Decimal("400"))
+        self.assertTrue(all(earlier >= later for earlier, later in zip(amounts[:-2], amounts[1:-1])))
+        self.assertEqual(sum(amounts), Decimal("1000"))
+
+    def test_batch_boards_match_single_boards_and_collect_errors(self):
+        good = create_asset(self.company, self.accounts, self.journal, "Good", original_value=Decimal("999.99"))
+        bad = create_asset(self.company, self.accounts, self.journal, "Bad", method_number=0)
+        boards, errors = compute_depreciation_boards([good, bad])
+        self.assertEqual(boards[good.id], compute_depreciation_board(good))
+        self.assertEqual(errors, {bad.id: "method_number must be greater than zero."})
+
+    def test_generate_boards_keeps_posted_assets(self):
+        asset = create_asset(self.company, self.accounts, self.journal)
+        closed = create_asset(self.company, self.accounts, self.journal, "Closed", state="closed")
+        stats = generate_depreciation_boards([asset, closed])
+        self.assertEqual((stats["assets"], stats["created"]), (1, 12))
+        self.assertIn(str(closed.id), stats["errors"])
+        # A second run replaces the draft board.
+        stats = generate_depreciation_boards([asset])
+        self.assertEqual((stats["deleted"], stats["created"]), (12, 12))
+
+
+class RecomputeDepreciationBoardsCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        cls.assets = [create_asset(cls.company, cls.accounts, cls.journal, f"Asset {index}") for index in range(3)]
+
+    def _call(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "recompute_depreciation_boards", "--company", str(self.company.id), *args, stdout=stdout, stderr=stderr
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_dry_run_writes_nothing(self):
+        stdout, _ = self._call("--dry-run", "--batch-size", "2")
+        self.assertIn("created_lines=36", stdout)
+        self.assertFalse(AssetDepreciationLine.objects.exists())
+
+    def test_a_failing_asset_only_loses_its_own_board(self):
+        failing_id = self.assets[1].id
+
+        def generate(assets, **kwargs):
+            if any(asset.id == failing_id for asset in assets):
+                raise DatabaseError("lock timeout")
+            return generate_depreciation_boards(assets, **kwargs)
+
+        with mock.patch(
+            "accounting.management.commands.recompute_depreciation_boards.generate_depreciation_boards", generate
+        ):
+            stdout, stderr = self._call("--batch-size", "2")
+        self.assertIn("created_lines=24", stdout)
+        self.assertIn(f"asset {failing_id}: lock timeout", stderr)
+        self.assertEqual(
+            set(AssetDepreciationLine.objects.values_list("asset_id", flat=True)),
+            {self.assets[0].id, self.assets[2].id},
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AssetRegisterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        cls.user = create_user("register", cls.company)
+        cls.van = create_asset(cls.company, cls.accounts, cls.journal, "Van", code="A1")
+        cls.desk = create_asset(cls.company, cls.accounts, cls.journal, "Desk", code="A2")
+        cls.draft = create_asset(cls.company, cls.accounts, cls.journal, "Planned", code="A3", state="draft")
+        cls.later = create_asset(
+            cls.company, cls.accounts, cls.journal, "Later", code="A4", acquisition_date=date(2026, 6, 1)
+        )
+        generate_depreciation_boards([cls.van, cls.desk])
+        for line in cls.van.depreciation_lines.filter(sequence__lte=2):
+            post_depreciation_line(line)
+
+    def _register(self, day, **options):
+        return build_asset_register(AssetRegisterOptions(company_id=self.company.id, date_to=day, **options))
+
+    def _by_code(self, register):
+        return {asset["code"]: asset for group in register["groups"] for asset in group["assets"]}
+
+    def test_net_book_value_counts_posted_lines_up_to_the_date(self):
+        register = self._register(date(2026, 2, 28))
+        assets = self._by_code(register)
+        self.assertEqual(set(assets), {"A1", "A2"})
+        self.assertEqual(Decimal(assets["A1"]["accumulated_depreciation"]), Decimal("200"))
+        self.assertEqual(Decimal(assets["A1"]["net_book_value"]), Decimal("1000"))
+        self.assertEqual(Decimal(assets["A2"]["accumulated_depreciation"]), Decimal("0"))
+        self.assertEqual(register["totals"]["asset_count"], 2)
+        self.assertEqual(Decimal(register["totals"]["net_book_value"]), Decimal("2200"))
+
+        register = self._register(date(2026, 1, 31))
+        self.assertEqual(Decimal(self._by_code(register)["A1"]["accumulated_depreciation"]), Decimal("100"))
+
+    def test_unposted_lines_and_draft_assets_are_opt_in(self):
+        register = self._register(date(2026, 6, 30), posted_only=False, include_draft=True)
+        assets = self._by_code(register)
+        self.assertEqual(set(assets), {"A1", "A2", "A3", "A4"})
+        self.assertEqual(Decimal(assets["A1"]["accumulated_depreciation"]), Decimal("600"))
+        self.assertEqual(Decimal(assets["A2"]["accumulated_depreciation"]), Decimal("600"))
+        self.assertEqual(Decimal(assets["A3"]["net_book_value"]), Decimal("1200"))
+
+    def test_totals_only_and_stream(self):
+        register = self._register(date(2026, 2, 28), totals_only=True)
+        self.assertEqual(len(register["groups"]), 1)
+        self.assertNotIn("assets", register["groups"][0])
+        self.assertEqual(register["groups"][0]["asset_count"], 2)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get(
+            "/api/reports/asset-register/", {"company_id": self.company.id, "date_to": "2026-02-28", "stream": "1"}
+        )
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([record["type"] for record in records], ["asset", "asset", "group", "totals"])
+        self.assertEqual(Decimal(records[-1]["accumulated_depreciation"]), Decimal("200"))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AssetImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        cls.user = create_user("importer", cls.company)
+        cls.model = AssetModel.objects.create(
+            company=cls.company,
+            name="Vehicles",
+            method_number=4,
+            method_period_months=3,
+            prorata=False,
+            account_asset=cls.accounts["1100"],
+            account_depreciation=cls.accounts["1100"],
+            account_expense=cls.accounts["6100"],
+            journal=cls.journal,
+        )
+
+    def _rows(self, text):
+        return read_asset_rows(StringIO(text), "csv")
+
+    def test_invalid_rows_are_reported_by_row_number(self):
+        summary = import_assets(
+            company=self.company,
+            rows=self._rows(
+                "name,code,model,acquisition_date,original_value\n"
+                "Van,V1,Vehicles,2026-01-01,1200\n"
+                "Bad value,V2,Vehicles,2026-01-01,NaN\n"
+                "Infinite,V3,Vehicles,2026-01-01,Infinity\n"
+                "Too precise,V4,Vehicles,2026-01-01,1.1234567\n"
+                "Duplicate,V1,Vehicles,2026-01-01,100\n"
+                ",V5,Missing,2026-01-01,100\n"
+            ),
+        )
+        self.assertEqual((summary["rows"], summary["created"]), (6, 1))
+        errors = {item["row"]: item["errors"] for item in summary["errors"]}
+        self.assertEqual(sorted(errors), [3, 4, 5, 6, 7])
+        self.assertEqual(errors[3], {"original_value": "Must be a finite decimal number."})
+        self.assertEqual(errors[4], {"original_value": "Must be a finite decimal number."})
+        self.assertEqual(list(errors[5]), ["original_value"])
+        self.assertEqual(errors[6], {"code": "Asset code already exists for this company."})
+        self.assertEqual(set(errors[7]), {"name", "model", "asset_account", "depreciation_account", "expense_account"})
+
+    def test_model_defaults_and_boards(self):
+        summary = import_assets(
+            company=self.company,
+            rows=self._rows("name,model,acquisition_date,original_value,state\nVan,Vehicles,2026-01-01,1200,running\n"),
+            generate_boards=True,
+        )
+        self.assertEqual((summary["created"], summary["boards"], summary["depreciation_lines"]), (1, 1, 4))
+        asset = Asset.objects.get(company=self.company, name="Van")
+        self.assertEqual((asset.method_number, asset.method_period, asset.prorata), (4, 3, False))
+        self.assertEqual(asset.expense_account, self.accounts["6100"])
+        self.assertEqual(asset.journal, self.journal)
+        self.assertEqual(sum(line.amount for line in asset.depreciation_lines.all()), Decimal("1200"))
+
+    def test_endpoint_status_follows_the_errors(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = f"/api/assets/import/?company_id={self.company.id}"
+        row = {"name": "Van", "model": "Vehicles", "acquisition_date": "2026-01-01", "original_value": "100"}
+
+        response = client.post(url, {"rows": [row]}, format="json")
+        self.assertEqual(response.status_code, 201)
+        response = client.post(url, {"rows": [{**row, "code": "X"}, "not an object"]}, format="json")
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()["errors"], [{"row": 2, "errors": {"row": "Must be an object."}}])
+        response = client.post(url, {"rows": [{**row, "original_value": "-1"}]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AnalyticDistributionTableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        plan = AnalyticPlan.objects.create(company=cls.company, name="Projects")
+        cls.alpha = AnalyticAccount.objects.create(company=cls.company, plan=plan, name="Alpha")
+        cls.beta = AnalyticAccount.objects.create(company=cls.company, plan=plan, name="Beta")
+        move = create_move(
+            cls.company, cls.journal, [(cls.accounts["6100"], 100, 0), (cls.accounts["1000"], 0, 100)], post=False
+        )
+        cls.expense, cls.bank = move.lines.order_by("id")
+
+    def _entries(self, line):
+        return dict(
+            MoveLineAnalyticDistribution.objects.filter(move_line=line).values_list("analytic_account_id", "percentage")
+        )
+
+    def test_save_syncs_the_table_from_the_json(self):
+        self.expense.analytic_distribution = {str(self.alpha.id): 60, str(self.beta.id): "40", "x": 1, "999999": 10}
+        self.expense.save()
+        self.assertEqual(self._entries(self.expense), {self.alpha.id: Decimal("60"), self.beta.id: Decimal("40")})
+
+        line = MoveLine.objects.get(pk=self.expense.pk)
+        line.analytic_distribution = {str(self.beta.id): 100}
+        line.save()
+        self.assertEqual(self._entries(line), {self.beta.id: Decimal("100")})
+
+        line.analytic_distribution = {}
+        line.save()
+        self.assertEqual(self._entries(line), {})
+
+    def test_analytic_account_filter_reads_the_table(self):
+        self.expense.analytic_distribution = {str(self.alpha.id): 100}
+        self.expense.save()
+        client = APIClient()
+        client.force_authenticate(user=create_user("analyst", self.company))
+        response = client.get("/api/move-lines/", {"company_id": self.company.id, "analytic_account_id": self.alpha.id})
+        self.assertEqual([line["id"] for line in response.json()["results"]], [self.expense.id])
+        response = client.get("/api/move-lines/", {"company_id": self.company.id, "analytic_account_id": self.beta.id})
+        self.assertEqual(response.json()["results"], [])
+
+    def test_backfill_command_rebuilds_missing_rows(self):
+        MoveLine.objects.filter(pk=self.expense.pk).update(analytic_distribution={str(self.alpha.id): 100})
+        call_command("backfill_analytic_distributions", "--dry-run", stdout=StringIO())
+        self.assertEqual(self._entries(self.expense), {})
+
+        stdout = StringIO()
+        call_command("backfill_analytic_distributions", "--batch-size", "1", stdout=stdout)
+        self.assertIn("move_lines=1 entries=1", stdout.getvalue())
+        self.assertEqual(self._entries(self.expense), {self.alpha.id: Decimal("100")})
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AnalyticLineGenerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        plan = AnalyticPlan.objects.create(company=cls.company, name="Projects")
+        cls.alpha = AnalyticAccount.objects.create(company=cls.company, plan=plan, name="Alpha")
+        cls.beta = AnalyticAccount.objects.create(company=cls.company, plan=plan, name="Beta")
+
+    def _draft(self, distribution):
+        move = create_move(
+            self.company, self.journal, [(self.accounts["6100"], 100, 0), (self.accounts["1000"], 0, 100)], post=False
+        )
+        MoveLine.objects.filter(move=move, account=self.accounts["6100"]).update(analytic_distribution=distribution)
+        return move
+
+    def _amounts(self, move):
+        return dict(
+            AnalyticLine.objects.filter(move_line__move=move).values_list("analytic_account_id").annotate(Sum("amount"))
+        )
+
+    def test_posting_expands_the_distribution(self):
+        move = self._draft({str(self.alpha.id): 60, str(self.beta.id): 40})
+        self.assertEqual(post_move(move=move)["analytic_lines"], 2)
+        self.assertEqual(self._amounts(move), {self.alpha.id: Decimal("-60"), self.beta.id: Decimal("-40")})
+
+        set_move_to_draft(move=move)
+        self.assertEqual(self._amounts(move), {})
+
+    def test_invalid_distribution_blocks_posting(self):
+        other_company = create_company("XX")[0]
+        foreign = AnalyticAccount.objects.create(
+            company=other_company, plan=AnalyticPlan.objects.create(company=other_company, name="Other"), name="Foreign"
+        )
+        for distribution in ({str(self.alpha.id): 120}, {str(foreign.id): 100}):
+            move = self._draft(distribution)
+            with self.assertRaises(ValidationError):
+                post_move(move=move)
+            move.refresh_from_db()
+            self.assertEqual(move.state, "draft")
+            self.assertEqual(self._amounts(move), {})
+
+    def test_reversal_offsets_the_original(self):
+        move = self._draft({str(self.alpha.id): 100})
+        post_move(move=move)
+        reversal = reverse_move(move=move, date=date(2026, 1, 31), post=True)
+        self.assertEqual(self._amounts(reversal), {self.alpha.id: Decimal("100")})
+        self.assertEqual(
+            AnalyticLine.objects.filter(analytic_account=self.alpha).aggregate(total=Sum("amount"))["total"], 0
+        )
+
+    def test_backfill_command_fills_posted_lines(self):
+        move = self._draft({str(self.beta.id): 100})
+        post_move(move=move)
+        AnalyticLine.objects.all().delete()
+
+        call_command("backfill_analytic_lines", "--dry-run", stdout=StringIO())
+        self.assertEqual(self._amounts(move), {})
+        call_command("backfill_analytic_lines", stdout=StringIO())
+        self.assertEqual(self._amounts(move), {self.beta.id: Decimal("-100")})
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class DistributionMatcherTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        cls.partner = Partner.objects.create(company=cls.company, name="Customer")
+        cls.category = ProductCategory.objects.create(company=cls.company, name="Services")
+        plan = AnalyticPlan.objects.create(company=cls.company, name="Projects")
+        cls.analytics = {}
+        for name, values in (
+            ("any", {}),
+            ("six", {"account_prefix": "6"}),
+            ("six-again", {"account_prefix": "6"}),
+            ("sixty-one", {"account_prefix": "61"}),
+            ("six-partner", {"account_prefix": "6", "partner": cls.partner}),
+            ("category", {"product_category": cls.category}),
+            ("archived", {"account_prefix": "610", "active": False}),
+        ):
+            model = AnalyticDistributionModel.objects.create(company=cls.company, name=name, **values)
+            cls.analytics[name] = AnalyticAccount.objects.create(company=cls.company, plan=plan, name=name)
+            AnalyticDistributionModelLine.objects.create(
+                model=model, analytic_account=cls.analytics[name], percentage=Decimal("100")
+            )
+
+    def _winner(self, **criteria):
+        distribution = get_distribution_matcher(self.company.id).match(**criteria)
+        return next(name for name, account in self.analytics.items() if distribution == {str(account.id): 100.0})
+
+    def test_most_criteria_then_longest_prefix_then_lowest_id(self):
+        self.assertEqual(self._winner(account_code="6100", partner_id=self.partner.id), "six-partner")
+        self.assertEqual(self._winner(account_code="6100"), "sixty-one")
+        self.assertEqual(self._winner(account_code="6200"), "six")
+        self.assertEqual(self._winner(account_code="4000"), "any")
+        self.assertEqual(self._winner(account_code="4000", category_id=self.category.id), "category")
+
+    def test_matches_are_copies(self):
+        matcher = get_distribution_matcher(self.company.id)
+        matcher.match(account_code="6200").clear()
+        self.assertEqual(matcher.match(account_code="6200"), {str(self.analytics["six"].id): 100.0})
+
+    def test_posting_fills_only_income_and_expense_items(self):
+        move = create_move(
+            self.company, self.journal, [(self.accounts["6100"], 100, 0), (self.accounts["1000"], 0, 100)]
+        )
+        expense, bank = move.lines.order_by("id")
+        self.assertEqual(expense.analytic_distribution, {str(self.analytics["sixty-one"].id): 100.0})
+        self.assertEqual(bank.analytic_distribution, {})
+        self.assertEqual(
+            list(AnalyticLine.objects.filter(move_line__move=move).values_list("analytic_account_id", "amount")),
+            [(self.analytics["sixty-one"].id, Decimal("-100"))],
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AnalyticReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, _ = create_company()
+        cls.root = AnalyticPlan.objects.create(company=cls.company, name="Departments")
+        cls.child = AnalyticPlan.objects.create(company=cls.company, name="Sales", parent=cls.root)
+        cls.alpha = AnalyticAccount.objects.create(company=cls.company, plan=cls.root, name="Alpha", code="A")
+        cls.beta = AnalyticAccount.objects.create(company=cls.company, plan=cls.child, name="Beta", code="B")
+        for analytic, general, day, amount in (
+            (cls.alpha, "6100", date(2026, 1, 5), "-100"),
+            (cls.alpha, "4000", date(2026, 1, 20), "40"),
+            (cls.beta, "6100", date(2026, 2, 1), "-30"),
+            (cls.beta, "6100", date(2026, 4, 1), "-5"),
+        ):
+            AnalyticLine.objects.create(
+                company=cls.company,
+                name="Line",
+                date=day,
+                amount=Decimal(amount),
+                analytic_account=analytic,
+                general_account=cls.accounts[general],
+            )
+
+    def _report(self, **values):
+        options = {"company_id": self.company.id, "date_from": date(2026, 1, 1), "date_to": date(2026, 12, 31)}
+        return build_analytic_report(AnalyticReportOptions(**{**options, **values}))
+
+    def test_plans_roll_up_their_children(self):
+        report = self._report()
+        self.assertEqual(report["periods"], ["2026-01", "2026-02", "2026-04"])
+        root, child = report["plans"]
+        self.assertEqual((root["plan_id"], root["level"]), (self.root.id, 0))
+        self.assertEqual((child["plan_id"], child["level"]), (self.child.id, 1))
+        self.assertEqual(Decimal(root["accounts"][0]["periods"]["2026-01"]), Decimal("-60"))
+        self.assertEqual(Decimal(child["total"]), Decimal("-35"))
+        self.assertEqual(Decimal(root["total"]), Decimal("-95"))
+        self.assertEqual(Decimal(report["totals"]["total"]), Decimal("-95"))
+
+    def test_period_plan_and_general_account_options(self):
+        report = self._report(period="quarter", plan_id=self.child.id, by_general_account=True)
+        self.assertEqual(report["periods"], ["2026-Q1", "2026-Q2"])
+        self.assertEqual([plan["plan_id"] for plan in report["plans"]], [self.child.id])
+        (beta,) = report["plans"][0]["accounts"]
+        self.assertEqual([general["code"] for general in beta["general_accounts"]], ["6100"])
+        self.assertEqual(Decimal(beta["periods"]["2026-Q2"]), Decimal("-5"))
+
+        report = self._report(date_to=date(2026, 1, 31))
+        self.assertEqual(Decimal(report["totals"]["total"]), Decimal("-60"))
+
+    def test_endpoint_validates_the_period(self):
+        client = APIClient()
+        client.force_authenticate(user=create_user("analyst", self.company))
+        response = client.get("/api/reports/analytic/", {"company_id": self.company.id, "period": "week"})
+        self.assertEqual(response.status_code, 400)
+        response = client.get(
+            "/api/reports/analytic/", {"company_id": self.company.id, "date_from": "2026-01-01", "period": "year"}
+        )
+        self.assertEqual(response.json()["periods"], ["2026"])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BulkAnalyticItemTests(TestCase):
+    url = "/api/analytic-items/bulk/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        cls.other_company = create_company("XX")[0]
+        cls.partner = Partner.objects.create(company=cls.company, name="Customer")
+        plan = AnalyticPlan.objects.create(company=cls.company, name="Projects")
+        cls.alpha = AnalyticAccount.objects.create(company=cls.company, plan=plan, name="Alpha")
+        other_plan = AnalyticPlan.objects.create(company=cls.other_company, name="Other")
+        cls.foreign = AnalyticAccount.objects.create(company=cls.other_company, plan=other_plan, name="Foreign")
+        move = create_move(
+            cls.company,
+            cls.journal,
+            [(cls.accounts["6100"], 50, 0), (cls.accounts["1000"], 0, 50)],
+            partner=cls.partner,
+            post=False,
+        )
+        cls.move_line = move.lines.get(account=cls.accounts["6100"])
+        cls.user = create_user("bulk", cls.company, superuser=False)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _row(self, **values):
+        return {
+            "company": self.company.id, "name": "Time", "amount": "-10", "analytic_account": self.alpha.id, **values
+        }
+
+    def test_creates_and_updates_with_save_rules(self):
+        response = self.client.post(self.url, {"rows": [self._row(move_line=self.move_line.id)]}, format="json")
+        self.assertEqual(response.status_code, 201)
+        line = AnalyticLine.objects.get(id=response.json()["ids"][0])
+        self.assertEqual((line.general_account_id, line.partner_id), (self.accounts["6100"].id, self.partner.id))
+        self.assertEqual(line.auto_account_id, self.alpha.id)
+        self.assertEqual(line.analytic_distribution, {str(self.alpha.id): 100.0})
+
+        response = self.client.post(self.url, [{"id": line.id, "amount": "-12.5"}], format="json")
+        self.assertEqual(response.json()["updated"], 1)
+        line.refresh_from_db()
+        self.assertEqual((line.amount, line.name), (Decimal("-12.5"), "Time"))
+
+    def test_errors_are_reported_per_row_index(self):
+        rows = [
+            self._row(),
+            self._row(analytic_account=self.foreign.id),
+            self._row(name="", amount="abc"),
+            self._row(company=self.other_company.id, analytic_account=self.foreign.id),
+            {"id": 999999, "name": "Missing"},
+            "not an object",
+        ]
+        response = self.client.post(self.url, rows, format="json")
+        self.assertEqual(response.status_code, 207)
+        errors = {item["index"]: item["errors"] for item in response.json()["errors"]}
+        self.assertEqual(sorted(errors), [1, 2, 3, 4, 5])
+        self.assertIn("analytic_account", errors[1])
+        self.assertEqual(set(errors[2]), {"name", "amount"})
+        self.assertEqual(errors[3], {"company": "Company not found."})
+        self.assertEqual(errors[4], {"id": "Analytic item not found."})
+        self.assertEqual(AnalyticLine.objects.count(), 1)
+
+    def test_atomic_writes_nothing_when_a_row_fails(self):
+        rows = [self._row(), self._row(analytic_distribution={str(self.alpha.id): 150})]
+        response = self.client.post(f"{self.url}?atomic=1", rows, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["index"], 1)
+        self.assertFalse(AnalyticLine.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RelatedNameSerializationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        cls.user = create_user("names", cls.company)
+
+    def _transfer_model(self, name, *accounts):
+        transfer_model = TransferModel.objects.create(
+            company=self.company, journal=self.journal, name=name, date_start=date(2026, 1, 1)
+        )
+        transfer_model.accounts.set(accounts)
+        return transfer_model
+
+    def _list_queries(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/transfer-models/", {"company_id": self.company.id})
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def test_name_keys_and_constant_queries(self):
+        self._transfer_model("Rent", self.accounts["6100"])
+        results, single = self._list_queries()
+        self.assertEqual(results[0]["journal_name"], "Miscellaneous")
+        self.assertEqual(results[0]["company_name"], "QB Company")
+        self.assertEqual(results[0]["accounts_names"], ["Account 6100"])
+
+        for index in range(3):
+            self._transfer_model(f"Split {index}", self.accounts["4000"], self.accounts["1000"])
+        results, several = self._list_queries()
+        self.assertEqual(len(results), 4)
+        self.assertEqual(several, single)
+
+    def test_related_lookups_follow_the_serializer_fields(self):
+        select_related, prefetch_related = TransferModelSerializer.get_related_lookups()
+        self.assertEqual(set(select_related), {"journal", "company"})
+        self.assertEqual(prefetch_related, ["accounts"])
+
+    def test_annotated_move_balance_needs_no_query(self):
+        move = create_move(self.company, self.journal, [(self.accounts["6100"], 70, 0)], post=False)
+        move = Move.objects.with_balance().get(pk=move.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(move.balance, Decimal("70"))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, accounts, journal = create_company()
+        cls.user = create_user("pager", cls.company)
+        first = Partner.objects.create(company=cls.company, name="First")
+        second = Partner.objects.create(company=cls.company, name="Second")
+        for index, partner in enumerate((None, first, second, None, first)):
+            create_move(
+                cls.company,
+                journal,
+                [(accounts["6100"], 10, 0), (accounts["1000"], 0, 10)],
+                partner=partner,
+                day=date(2026, 1, 1 + index % 2),
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _walk(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row["id"] for row in response.json()["results"])
+            if response.json()["next"] is None:
+                return ids
+            response = self.client.get(response.json()["next"])
+
+    def test_cursor_pages_cover_the_ordering_once(self):
+        lines = MoveLine.objects.all()
+        params = {"company_id": self.company.id, "page_size": 3}
+        self.assertEqual(
+            self._walk("/api/move-lines/", params), list(lines.order_by("-date", "-id").values_list("id", flat=True))
+        )
+
+    def test_null_ordering_is_explicit(self):
+        lines = MoveLine.objects.all()
+        params = {"company_id": self.company.id, "page_size": 3}
+        ascending = lines.order_by(F("partner_id").asc(nulls_last=True), "id").values_list("id", flat=True)
+        descending = lines.order_by(F("partner_id").desc(nulls_first=True), "-id").values_list("id", flat=True)
+        self.assertEqual(self._walk("/api/move-lines/", {**params, "ordering": "partner"}), list(ascending))
+        self.assertEqual(self._walk("/api/move-lines/", {**params, "ordering": "-partner"}), list(descending))
+
+        chunks = list(iter_keyset_chunks(lines.order_by("partner", "date"), 4))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+        self.assertEqual(len({line.id for chunk in chunks for line in chunk}), 10)
+
+    def test_page_numbers_invalid_cursors_and_stream(self):
+        response = self.client.get("/api/moves/", {"company_id": self.company.id, "page": 1, "page_size": 2})
+        self.assertEqual(response.json()["count"], 5)
+        response = self.client.get("/api/moves/", {"company_id": self.company.id, "cursor": "bm90IGpzb24"})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get("/api/move-lines/", {"company_id": self.company.id, "stream": "1"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(records), 10)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company, cls.accounts, cls.journal = create_company()
+        cls.user = create_user("bulk", cls.company)
+        cls.existing = JournalGroup.objects.create(company=cls.company, name="Existing")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _post(self, url, payload):
+        return self.client.post(url, payload, format="json")
+
+    def test_create_update_delete(self):
+        items = [{"company": self.company.id, "name": name} for name in ("Sales", "Purchases")]
+        response = self._post("/api/journal-groups/bulk-create/", {"items": items})
+        self.assertEqual(response.status_code, 201)
+        ids = [result["id"] for result in response.json()["results"]]
+        created = JournalGroup.objects.filter(id__in=ids).order_by("id")
+        self.assertEqual(list(created.values_list("name", flat=True)), ["Sales", "Purchases"])
+
+        response = self.client.patch(
+            "/api/journal-groups/bulk-update/", {"items": [{"id": ids[0], "name": "Sales EU"}]}, format="json"
+        )
+        self.assertEqual(response.json()["updated"], 1)
+        self.assertEqual(JournalGroup.objects.get(id=ids[0]).name, "Sales EU")
+
+        response = self._post("/api/journal-groups/bulk-delete/", {"ids": ids})
+        self.assertEqual(response.json()["deleted"], 2)
+        self.assertFalse(JournalGroup.objects.filter(id__in=ids).exists())
+
+    def test_a_failing_row_writes_nothing(self):
+        items = [
+            {"company": self.company.id, "name": "Sales"},
+            {"company": self.company.id, "name": "Existing"},
+            {"company": self.company.id, "name": "Sales"},
+            {"company": 999999, "name": "Nowhere"},
+        ]
+        response = self._post("/api/journal-groups/bulk-create/", {"items": items})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result["index"] for result in response.json()["results"]], [1, 2, 3])
+        self.assertEqual(JournalGroup.objects.count(), 1)
+
+        response = self._post("/api/journal-groups/bulk-delete/", {"ids": [self.existing.id, 999999]})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(JournalGroup.objects.filter(id=self.existing.id).exists())
+
+    def test_rows_are_cleaned_after_many_to_many_writes(self):
+        transfer_model = TransferModel.objects.create(
+            company=self.company, journal=self.journal, name="Rent", date_start=date(2026, 1, 1)
+        )
+        partner = Partner.objects.create(company=self.company, name="Landlord")
+        row = {"transfer_model": transfer_model.id, "account": self.accounts["6100"].id, "partners": [partner.id]}
+        response = self._post("/api/transfer-model-lines/bulk-create/", {"items": [row, {**row, "percent": "0"}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["results"][0]["index"], 1)
+        self.assertFalse(transfer_model.lines.exists())
+
+        response = self._post("/api/transfer-model-lines/bulk-create/", {"items": [row]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(transfer_model.lines.get().partners.all()), [partner])
+
+    def test_views_with_custom_hooks_refuse_bulk_writes(self):
+        self.assertEqual(self._post("/api/accounts/bulk-delete/", {"ids": [self.accounts["1000"].id]}).status_code, 405)
+        response = self.client.patch("/api/accounts/bulk-update/", {"items": [{"id": 1}]}, format="json")
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(self._post("/api/asset-depreciation-lines/bulk-create/", {"items": [{}]}).status_code, 405)
+        self.assertEqual(self._post("/api/assets/bulk-delete/", {"ids": [1]}).status_code, 405)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BatchEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()[0]
+        cls.user = create_user("batch", cls.company)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _batch(self, requests, atomic=False):
+        response = self.client.post("/api/batch/", {"atomic": atomic, "requests": requests}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _create(self, name, operation_id=None):
+        operation = {"method": "POST", "path": "journal-groups/", "body": {"company": self.company.id, "name": name}}
+        return {**operation, "id": operation_id} if operation_id else operation
+
+    def test_operations_run_in_order(self):
+        payload = self._batch(
+            [self._create("Sales", "create"), {"id": "list", "path": f"journal-groups/?company_id={self.company.id}"}]
+        )
+        created, listed = payload["responses"]
+        self.assertEqual((created["id"], created["status"]), ("create", 201))
+        self.assertTrue(created["headers"]["Content-Type"].startswith("application/json"))
+        self.assertEqual([group["name"] for group in listed["body"]], ["Sales"])
+        self.assertTrue(payload["committed"])
+
+    def test_atomic_batches_roll_back_and_skip_the_rest(self):
+        payload = self._batch([self._create("Sales"), self._create(""), self._create("Purchases")], atomic=True)
+        self.assertEqual([entry["status"] for entry in payload["responses"]], [201, 400, 424])
+        self.assertEqual([entry["id"] for entry in payload["responses"]], [0, 1, 2])
+        self.assertFalse(payload["committed"])
+        self.assertFalse(JournalGroup.objects.exists())
+
+        payload = self._batch([self._create("Sales"), self._create("")])
+        self.assertEqual([entry["status"] for entry in payload["responses"]], [201, 400])
+        self.assertEqual(list(JournalGroup.objects.values_list("name", flat=True)), ["Sales"])
+
+    def test_invalid_operations_are_answered_per_entry(self):
+        payload = self._batch(
+            [
+                {"path": "no-such-route/"},
+                {"path": "batch/", "method": "POST"},
+                {"path": "journal-groups/", "method": "TRACE"},
+                {"path": "/admin/"},
+                "not an object",
+            ]
+        )
+        self.assertEqual([entry["status"] for entry in payload["responses"]], [404, 400, 405, 400, 400])
+        response = self.client.post("/api/batch/", {"requests": []}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RequestProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()[0]
+        cls.staff = create_user("profiler", cls.company)
+        cls.clerk = create_user("clerk", cls.company, superuser=False)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        profile_settings = self.settings(ACCOUNTING_PROFILE_DIR=directory.name)
+        profile_settings.enable()
+        self.addCleanup(profile_settings.disable)
+        self.directory = Path(directory.name)
+
+    def _client(self, user):
+        client = APIClient()
+        # The middleware sees the session user, the views the forced one.
+        client.force_login(user)
+        client.force_authenticate(user=user)
+        return client
+
+    def test_staff_profile_is_stored_and_served(self):
+        client = self._client(self.staff)
+        response = client.get("/api/journal-groups/", {"company_id": self.company.id, "profile": "1"})
+        profile_id = response["X-Profile-Id"]
+        self.assertTrue((self.directory / f"{profile_id}.json").exists())
+
+        payload = client.get(f"/api/debug/profiles/{profile_id}/", {"sort": "tottime"}).json()
+        self.assertEqual((payload["method"], payload["status"]), ("GET", 200))
+        self.assertIn("function calls", payload["top"])
+        self.assertEqual(client.get(f"/api/debug/profiles/{profile_id}/", {"sort": "name"}).status_code, 400)
+
+        response = client.get(f"/api/debug/profiles/{profile_id}/", {"download": "1"})
+        prof_path = self.directory / "download.prof"
+        prof_path.write_bytes(response.content)
+        self.assertGreater(pstats.Stats(str(prof_path)).total_calls, 0)
+
+    def test_only_staff_or_a_signed_token_trigger_profiling(self):
+        response = self._client(self.clerk).get("/api/journal-groups/", {"profile": "1"})
+        self.assertNotIn("X-Profile-Id", response)
+        response = APIClient().get("/api/journal-groups/", HTTP_X_PROFILE="forged")
+        self.assertNotIn("X-Profile-Id", response)
+        response = APIClient().get("/api/journal-groups/", HTTP_X_PROFILE=make_profiling_token())
+        self.assertIn("X-Profile-Id", response)
+        profile_url = f"/api/debug/profiles/{response['X-Profile-Id']}/"
+        self.assertEqual(self._client(self.clerk).get(profile_url).status_code, 403)
+
+    def test_expired_and_malformed_ids_are_not_found(self):
+        _, artifact = profile_call(sum, [1, 2], method="GET", path="/")
+        artifact.created_at -= 2 * 60 * 60
+        self.assertIsNone(get_profile(store_profile(artifact)))
+        self.assertIsNone(get_profile("../../settings"))
+        self.assertEqual(self._client(self.staff).get("/api/debug/profiles/0123/").status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, ACCOUNTING_SHARED_CACHE=True)
+class SessionInfoCacheTests(TestCase):
+    url = "/api/session/get-session-info/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()[0]
+        cls.other_company = create_company("XX")[0]
+        cls.user = create_user("session", cls.company, cls.other_company)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _session_info(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def test_warm_payload_needs_no_query(self):
+        payload, cold = self._session_info()
+        self.assertEqual(payload["company"]["code"], "QB")
+        cached, warm = self._session_info()
+        self.assertEqual((cached, warm), (payload, 0))
+        self.assertGreater(cold, 0)
+
+    def test_writes_bump_the_cached_payload(self):
+        self._session_info()
+        self.company.name = "Renamed"
+        self.company.save()
+        self.assertEqual(self._session_info()[0]["company"]["name"], "Renamed")
+
+        euro = Currency.objects.create(code="EUR", name="Euro", symbol="€")
+        accounting_settings = AccountingSettings.objects.get(company=self.company)
+        accounting_settings.currency = euro
+        accounting_settings.save()
+        self.assertEqual(self._session_info()[0]["company"]["currency"]["code"], "EUR")
+
+        self.user.first_name, self.user.last_name = "Ada", "Lovelace"
+        self.user.save()
+        self.assertEqual(self._session_info()[0]["name"], "Ada Lovelace")
+
+    def test_switching_company_changes_the_key(self):
+        self._session_info()
+        response = self.client.post(
+            "/api/session/switch-company/", {"company_id": self.other_company.id}, format="json"
+        )
+        self.assertEqual(response.json()["company"]["code"], "XX")
+        self.assertEqual(self._session_info()[0]["company"]["code"], "XX")
+
+    @override_settings(ACCOUNTING_SHARED_CACHE=False)
+    def test_not_cached_without_a_shared_cache(self):
+        _, cold = self._session_info()
+        self.assertEqual(self._session_info()[1], cold)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class LocalizationSnapshotTests(TestCase):
+    url = "/api/states/snapshot/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user("geo", create_company()[0])
+        cls.country = Country.objects.create(name="Belgium", code="BE")
+        cls.other_country = Country.objects.create(name="France", code="FR")
+        cls.state = CountryState.objects.create(country=cls.country, name="Brussels", code="BRU")
+        CountryState.objects.create(country=cls.country, name="Antwerp", code="VAN")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _get(self, **headers):
+        return self.client.get(self.url, {"country_id": self.country.id}, **headers)
+
+    def test_snapshot_matches_the_list_and_revalidates(self):
+        response = self._get()
+        listed = self.client.get("/api/states/", {"country_id": self.country.id}).json()
+        self.assertEqual(json.loads(response.content), listed)
+        self.assertEqual([state["name"] for state in listed], ["Antwerp", "Brussels"])
+        self.assertEqual(response["Cache-Control"], "public, max-age=86400")
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        compressed = self._get(HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", compressed["Vary"])
+        self.assertEqual(gzip.decompress(compressed.content), response.content)
+        self.assertNotEqual(compressed["ETag"], response["ETag"])
+        revalidated = self._get(HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=compressed["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_edits_drop_the_snapshot_and_unchanged_rebuilds_keep_the_etag(self):
+        etag = self._get()["ETag"]
+        summary = build_localization_snapshots(country_ids=[self.country.id])
+        self.assertEqual(summary["states"], {"written": 0, "unchanged": 1})
+        self.assertEqual(self._get()["ETag"], etag)
+
+        self.state.name = "Bruxelles"
+        self.state.save()
+        self.assertFalse(LocalizationSnapshot.objects.filter(country=self.country, kind="states").exists())
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Bruxelles", response.content)
+
+        self._get()
+        self.state.country = self.other_country
+        self.state.save()
+        self.assertFalse(LocalizationSnapshot.objects.filter(country=self.country).exists())
+
+    def test_unknown_countries_and_bad_ids(self):
+        self.assertEqual(self.client.get(self.url, {"country_id": 999999}).status_code, 404)
+        self.assertEqual(self.client.get(self.url, {"country_id": "be"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()[0]
+        cls.other_company = create_company("XX")[0]
+        cls.user = create_user("finder", cls.company)
+        cls.partners = {
+            name: Partner.objects.create(company=cls.company, name=name)
+            for name in ("Acme Apex Atlas", "A", "Zürich Insurance", "Brewery", "Apex Logistics")
+        }
+        Partner.objects.create(company=cls.other_company, name="Apex Foreign")
+
+    def _names(self, query, **kwargs):
+        ids = search_ids("partners", query, company_ids=[self.company.id], **kwargs)
+        return [Partner.objects.get(id=pk).name for pk in ids]
+
+    def test_whole_words_rank_first_and_every_term_must_match(self):
+        self.assertEqual(self._names("a")[0], "A")
+        self.assertEqual(set(self._names("apex")), {"Acme Apex Atlas", "Apex Logistics"})
+        self.assertEqual(self._names("ac ap"), ["Acme Apex Atlas"])
+        self.assertEqual(self._names("zur"), ["Zürich Insurance"])
+        self.assertEqual(self._names(" !"), [])
+        self.assertEqual(len(self._names("a", limit=2)), 2)
+
+    def test_index_follows_bulk_create_update_and_delete(self):
+        Partner.objects.bulk_create([Partner(company=self.company, name="Quokka Farms")])
+        self.assertEqual(self._names("quok"), ["Quokka Farms"])
+        Partner.objects.filter(name="Quokka Farms").update(name="Wombat Farms")
+        self.assertEqual(self._names("quok"), [])
+        self.assertEqual(self._names("wom"), ["Wombat Farms"])
+        Partner.objects.filter(name="Wombat Farms").delete()
+        self.assertEqual(self._names("farms"), [])
+
+    def test_dropped_triggers_are_recreated(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER ga_partner_search_ai")
+        self.assertEqual(ensure_search_triggers(), ["ga_partner_search"])
+        Partner.objects.create(company=self.company, name="Kiwi Traders")
+        self.assertEqual(self._names("kiwi"), ["Kiwi Traders"])
+
+    def test_orm_fallback_and_endpoint(self):
+        with mock.patch("accounting.services.search_service._has_fts_table", return_value=False):
+            self.assertEqual(self._names("ac ap"), ["Acme Apex Atlas"])
+            self.assertEqual(self._names("a")[0], "A")
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get("/api/partners/search/", {"q": "apex", "company_id": self.company.id})
+        self.assertEqual(
+            {row["name"] for row in response.json()["results"]}, {"Acme Apex Atlas", "Apex Logistics"}
+        )
+        self.assertEqual(client.get("/api/partners/search/", {"q": "apex", "limit": "x"}).status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ImportLocalizationDataTests(TestCase):
+    files = {
+        "currencies.csv": "code,name,symbol,decimal_places\nZZD,Zed Dollar,Z$,2\n",
+        "countries.csv": "code,name,phone_code,active\nZZ,Zedland,+999,true\nZY,Whyland,+998,true\n",
+        "states.csv": "country_code,code,name,active\nZZ,N,North,true\nZZ,S,South,true\nQQ,X,Nowhere,true\n",
+        "cities.csv": (
+            "country_code,state_code,name,postal_code,active\n"
+            "ZZ,N,Northtown,1000,true\nZZ,,Capital,1,true\nZY,,Whyville,2,true\n"
+        ),
+    }
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name)
+        for name, content in self.files.items():
+            (self.path / name).write_text(content, encoding="utf-8")
+
+    def _import(self, *args):
+        stdout = StringIO()
+        call_command("import_localization_data", "--path", str(self.path), *args, stdout=stdout, stderr=StringIO())
+        summary = {}
+        for line in stdout.getvalue().splitlines():
+            if line.startswith("- "):
+                section, _, counts = line[2:].partition(": ")
+                summary[section] = dict(item.split("=") for item in counts.split())
+        return summary
+
+    def test_rerun_is_a_no_op(self):
+        summary = self._import()
+        self.assertEqual((summary["states"]["created"], summary["states"]["skipped"]), ("2", "1"))
+        self.assertEqual(summary["cities"]["created"], "3")
+        city = CountryCity.objects.get(name="Northtown")
+        snapshot = LocalizationSnapshot.objects.get(country__code="ZZ", kind="cities")
+
+        summary = self._import()
+        for section in ("currencies", "countries", "states", "cities"):
+            self.assertEqual((summary[section]["created"], summary[section]["updated"]), ("0", "0"))
+        self.assertEqual(summary["cities snapshots"]["written"], "0")
+        self.assertEqual(CountryCity.objects.get(pk=city.pk).updated_at, city.updated_at)
+        self.assertEqual(LocalizationSnapshot.objects.get(pk=snapshot.pk).updated_at, snapshot.updated_at)
+
+    def test_changes_update_rows_in_place_and_their_snapshots(self):
+        self._import()
+        state = CountryState.objects.get(country__code="ZZ", code="N")
+        whyland = LocalizationSnapshot.objects.get(country__code="ZY", kind="cities")
+        (self.path / "states.csv").write_text(
+            self.files["states.csv"].replace("ZZ,N,North", "ZZ,N,Northern"), encoding="utf-8"
+        )
+        (self.path / "cities.csv").write_text(
+            self.files["cities.csv"].replace("Capital,1,", "Capital,11,"), encoding="utf-8"
+        )
+
+        summary = self._import()
+        self.assertEqual((summary["states"]["created"], summary["states"]["updated"]), ("0", "1"))
+        self.assertEqual((summary["cities"]["created"], summary["cities"]["updated"]), ("0", "1"))
+        self.assertEqual(CountryState.objects.get(pk=state.pk).name, "Northern")
+        self.assertEqual(CountryCity.objects.get(name="Capital").postal_code, "11")
+        self.assertIn(b"Northern", bytes(LocalizationSnapshot.objects.get(country__code="ZZ", kind="cities").content))
+        self.assertEqual(LocalizationSnapshot.objects.get(pk=whyland.pk).updated_at, whyland.updated_at)
+
+    def test_dry_run_and_invalid_rows(self):
+        self._import("--dry-run")
+        self.assertFalse(Country.objects.filter(code="ZZ").exists())
+
+        countries = "code,name,phone_code,active\nZZ,Zedland,+999,maybe\n"
+        (self.path / "countries.csv").write_text(countries, encoding="utf-8")
+        with self.assertRaisesMessage(CommandError, "invalid boolean for active"):
+            self._import()
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ChartTemplateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.country = Country.objects.create(name="Zedland", code="ZZ")
+        cls.currency = Currency.objects.create(code="ZZD", name="Zed Dollar", symbol="Z$")
+        cls.assets = AccountGroupTemplate.objects.create(
+            country=cls.country, code_prefix_start="1", code_prefix_end="1", name="Assets"
+        )
+        cls.cash = AccountGroupTemplate.objects.create(
+            country=cls.country, code_prefix_start="10", code_prefix_end="10", name="Cash", parent=cls.assets
+        )
+        AccountTemplate.objects.create(
+            country=cls.country, group=cls.cash, code="1000", name="Bank", account_type="asset"
+        )
+        AccountTemplate.objects.create(country=cls.country, code="4000", name="Sales", account_type="income")
+
+    def _provision(self, *names):
+        specs = [CompanySpec(name=name, country=self.country, currency=self.currency) for name in names]
+        return provision_companies(specs, apply_chart_template=True)
+
+    def test_provisioning_gives_each_company_its_own_chart(self):
+        Company.objects.create(name="Acme", code="ACME")
+        first, second = self._provision("Acme", "Acme")
+        self.assertEqual((first.name, first.code), ("Acme 2", "ACME2"))
+        self.assertEqual((second.name, second.code), ("Acme 3", "ACME3"))
+        for company in (first, second):
+            cash = AccountGroup.objects.get(company=company, code_prefix_start="10")
+            self.assertEqual(cash.parent.company_id, company.id)
+            self.assertEqual(Account.objects.get(company=company, code="1000").group_id, cash.id)
+            self.assertIsNone(Account.objects.get(company=company, code="4000").group_id)
+            accounting_settings = AccountingSettings.objects.get(company=company)
+            self.assertEqual(accounting_settings.currency_id, self.currency.id)
+            self.assertTrue(accounting_settings.has_chart_of_accounts)
+
+    def test_reapplying_writes_only_changes(self):
+        (company,) = self._provision("Acme")
+        account = Account.objects.get(company=company, code="1000")
+        stats = apply_chart_template_to_company(company=company, country=self.country)
+        self.assertEqual((stats["groups_created"], stats["accounts_created"]), (0, 0))
+        self.assertEqual(Account.objects.get(pk=account.pk).updated_at, account.updated_at)
+
+        AccountTemplate.objects.filter(code="1000").update(name="Main bank")
+        AccountGroupTemplate.objects.create(
+            country=self.country, code_prefix_start="11", code_prefix_end="11", name="Receivables", parent=self.assets
+        )
+        stats = apply_chart_templates([(company, self.country)])[0]
+        self.assertEqual((stats["groups_created"], stats["accounts_created"]), (1, 0))
+        self.assertEqual(Account.objects.get(pk=account.pk).name, "Main bank")
+        self.assertEqual(AccountGroup.objects.filter(company=company).count(), 3)
+
+    def test_template_cycles_are_rejected(self):
+        AccountGroupTemplate.objects.filter(pk=self.assets.pk).update(parent=self.cash)
+        with self.assertRaisesMessage(ValueError, "Cycle"):
+            group_template_levels(list(AccountGroupTemplate.objects.filter(country=self.country)))
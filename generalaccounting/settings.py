@@ -50,6 +50,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounting.middleware.RequestInstrumentationMiddleware',
+    'accounting.middleware.RequestProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -98,6 +100,19 @@ DATABASES = {
 }
 
 
+# Cache
+# No CACHES: Django's per-process LocMem cache. Company access, session
+# info, analytic matcher versions and depreciation forecasts are cached
+# across requests only with a shared Redis or Memcached backend (see
+# accounting.services.cache_service); otherwise they are read per request.
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#         'LOCATION': 'redis://127.0.0.1:6379',
+#     }
+# }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 